@@ -1,11 +1,23 @@
 """HTTP API server for price comparison."""
 
-from fastapi import FastAPI, HTTPException, Query
-from fastapi.responses import JSONResponse
-from typing import Optional
+from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi.responses import JSONResponse, Response
+from typing import Dict, List, Optional
 import logging
 import asyncio
-from price_comparator import PriceComparator
+import os
+import time
+from price_comparator import PriceComparator, parse_locations
+from scrapers import BrowserPool, metrics, registry, tracing
+from scrapers.cache import MemoryCache, SnapshotError
+from scrapers.barcode import normalize_ean
+from scrapers.fields import Fields, parse_fields
+from job_queue import Job, WorkerPool, create_backend
+from cache_warmer import PrewarmScheduler
+from price_history import PriceHistoryStore, summarize_history
+from product_catalog import ProductCatalog
+import profiling
+from datetime import datetime
 
 # Configure logging
 logging.basicConfig(
@@ -20,17 +32,309 @@ app = FastAPI(
     version="1.0.0"
 )
 
+# Job queue configuration
+JOB_BACKEND_URL = os.environ.get("PRICE_API_JOB_BACKEND", "memory://")
+JOB_WORKERS = int(os.environ.get("PRICE_API_JOB_WORKERS", "2"))
+JOB_WORKER_CONCURRENCY = int(os.environ.get("PRICE_API_JOB_CONCURRENCY", "2"))
+JOB_POLL_INTERVAL = 0.2
+
+# Cache configuration (in-process cache unless a Redis URL is given)
+REDIS_URL = os.environ.get("PRICE_API_REDIS_URL")
+
+# Snapshot of the in-process cache (empty to disable): restored at startup,
+# written every CACHE_SNAPSHOT_INTERVAL seconds and on shutdown
+CACHE_SNAPSHOT = os.environ.get("PRICE_API_CACHE_SNAPSHOT", "cache_snapshot.bin")
+CACHE_SNAPSHOT_INTERVAL = float(os.environ.get("PRICE_API_CACHE_SNAPSHOT_INTERVAL", "300"))
+
+# Pre-warming configuration
+PREWARM_ENABLED = os.environ.get("PRICE_API_PREWARM", "1") == "1"
+PREWARM_TOP_K = int(os.environ.get("PRICE_API_PREWARM_TOP_K", "200"))
+PREWARM_LEAD_TIME = int(os.environ.get("PRICE_API_PREWARM_LEAD_TIME", "300"))
+PREWARM_STORE_BUDGET = int(os.environ.get("PRICE_API_PREWARM_BUDGET", "60"))
+PREWARM_OFF_PEAK = os.environ.get("PRICE_API_PREWARM_OFF_PEAK")
+
+# Price history database (empty to disable)
+HISTORY_DB = os.environ.get("PRICE_API_HISTORY_DB", "price_history.db")
+
+# Local product catalog (empty to disable) and live-scrape budget in auto mode
+CATALOG_DB = os.environ.get("PRICE_API_CATALOG_DB", "product_catalog.db")
+AUTO_STORE_TIMEOUT = float(os.environ.get("PRICE_API_AUTO_TIMEOUT", "15"))
+
+SEARCH_MODES = ("live", "local", "auto")
+
+# Browser recycling (0 disables a limit): pages per reused context, pages per
+# browser and Chromium RSS, also applied by the job workers
+BROWSER_OPTIONS = {
+    "max_context_pages": int(os.environ.get("PRICE_API_CONTEXT_MAX_PAGES", "50")) or None,
+    "max_browser_pages": int(os.environ.get("PRICE_API_BROWSER_MAX_PAGES", "1000")) or None,
+    "max_rss_mb": float(os.environ.get("PRICE_API_BROWSER_MAX_RSS_MB", "2048")) or None,
+}
+
+# On-demand profiling (X-Profile header or ?profile=sample|cprofile);
+# at most PER_HOUR profiles per hour, one at a time (0 disables)
+PROFILE_DIR = os.environ.get("PRICE_API_PROFILE_DIR", "profiles")
+PROFILE_PER_HOUR = int(os.environ.get("PRICE_API_PROFILE_PER_HOUR", "12"))
+profile_limiter = profiling.ProfileLimiter(PROFILE_PER_HOUR)
+
+# Also append finished trace spans to this JSON-lines file (optional)
+TRACE_FILE = os.environ.get("PRICE_API_TRACE_FILE")
+trace_exporter = tracing.JsonLinesExporter(TRACE_FILE) if TRACE_FILE else None
+if trace_exporter:
+    tracing.add_exporter(trace_exporter)
+
+# Optional callable (cache_client) -> list of scrapers replacing the real
+# stores, set by the load-test harness (benchmarks/stub_server.py)
+SCRAPER_FACTORY = None
+
 # Initialize comparator (will be created on startup)
 comparator = None
+cache_client = None
+job_backend = None
+worker_pool = None
+prewarmer = None
+prewarm_task = None
+snapshot_task = None
+history = None
+catalog = None
 
 
 @app.on_event("startup")
 async def startup_event():
-    """Initialize the price comparator on startup."""
-    global comparator
-    # TODO: Add Redis client here if needed
-    comparator = PriceComparator(cache_client=None)
-    logger.info("Price comparator initialized")
+    """Initialize the price comparator and job workers on startup."""
+    global comparator, cache_client, job_backend, worker_pool
+    global prewarmer, prewarm_task, snapshot_task, history, catalog
+    if REDIS_URL:
+        import redis
+        cache_client = redis.Redis.from_url(REDIS_URL)
+    else:
+        cache_client = MemoryCache()
+        if CACHE_SNAPSHOT:
+            await restore_cache_snapshot()
+            snapshot_task = asyncio.create_task(snapshot_cache_periodically())
+    
+    sinks = []
+    if HISTORY_DB:
+        history = await asyncio.to_thread(PriceHistoryStore, HISTORY_DB)
+        sinks.append(history)
+    
+    if CATALOG_DB:
+        catalog = await asyncio.to_thread(ProductCatalog, CATALOG_DB)
+    
+    scrapers = SCRAPER_FACTORY(cache_client) if SCRAPER_FACTORY else None
+    comparator = PriceComparator(
+        cache_client=cache_client,
+        browser_pool=BrowserPool(**BROWSER_OPTIONS),
+        sinks=sinks,
+        catalog=catalog,
+        scrapers=scrapers,
+    )
+    logger.info(f"Price comparator initialized ({'redis' if REDIS_URL else 'memory'} cache)")
+    
+    if PREWARM_ENABLED:
+        prewarmer = PrewarmScheduler(
+            comparator,
+            cache_client,
+            top_k=PREWARM_TOP_K,
+            lead_time=PREWARM_LEAD_TIME,
+            store_budget=PREWARM_STORE_BUDGET,
+            off_peak=PREWARM_OFF_PEAK,
+        )
+        prewarm_task = asyncio.create_task(prewarmer.run())
+    
+    job_backend = await asyncio.to_thread(create_backend, JOB_BACKEND_URL)
+    if JOB_WORKERS > 0:
+        # Workers share the Redis cache (a memory cache is per process) and the sinks' databases
+        storage = {"cache_url": REDIS_URL, "history_db": HISTORY_DB or None, "catalog_db": CATALOG_DB or None}
+        worker_pool = WorkerPool(job_backend, JOB_WORKERS, JOB_WORKER_CONCURRENCY, BROWSER_OPTIONS, storage)
+        await asyncio.to_thread(worker_pool.start)
+    logger.info(f"Job backend ready: {JOB_BACKEND_URL} ({JOB_WORKERS} local workers)")
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop job workers and release browsers."""
+    if prewarm_task:
+        prewarm_task.cancel()
+    if snapshot_task:
+        snapshot_task.cancel()
+        await write_cache_snapshot()
+    if worker_pool:
+        await asyncio.to_thread(worker_pool.stop)
+    if comparator:
+        await comparator.close()
+    if history:
+        await asyncio.to_thread(history.close)
+    if catalog:
+        await asyncio.to_thread(catalog.close)
+    if trace_exporter:
+        await asyncio.to_thread(trace_exporter.close)
+
+
+async def restore_cache_snapshot() -> None:
+    """Load the cache snapshot (index only, values are read lazily) and report the time taken."""
+    if not os.path.exists(CACHE_SNAPSHOT):
+        logger.info(f"No cache snapshot at {CACHE_SNAPSHOT}, starting cold")
+        return
+    start = time.perf_counter()
+    try:
+        restored = await asyncio.to_thread(cache_client.restore, CACHE_SNAPSHOT)
+    except SnapshotError as e:
+        logger.warning(f"Ignoring cache snapshot: {e}")
+        return
+    elapsed = time.perf_counter() - start
+    metrics.CACHE_SNAPSHOT_LOAD_SECONDS.set(elapsed)
+    metrics.CACHE_SNAPSHOT_ENTRIES.set(restored, op="restore")
+    logger.info(f"Restored {restored} cache entries from {CACHE_SNAPSHOT} in {elapsed * 1000:.1f} ms")
+
+
+async def write_cache_snapshot() -> None:
+    """Write the in-process cache to CACHE_SNAPSHOT."""
+    start = time.perf_counter()
+    try:
+        written = await asyncio.to_thread(cache_client.snapshot, CACHE_SNAPSHOT)
+    except OSError as e:
+        logger.error(f"Cache snapshot failed: {e}")
+        return
+    elapsed = time.perf_counter() - start
+    metrics.CACHE_SNAPSHOT_DURATION.observe(elapsed)
+    metrics.CACHE_SNAPSHOT_ENTRIES.set(written, op="write")
+    logger.info(f"Wrote {written} cache entries to {CACHE_SNAPSHOT} in {elapsed * 1000:.0f} ms")
+
+
+async def snapshot_cache_periodically() -> None:
+    while True:
+        await asyncio.sleep(CACHE_SNAPSHOT_INTERVAL)
+        await write_cache_snapshot()
+
+
+def parse_time(value: Optional[str], name: str) -> Optional[float]:
+    """Parse an ISO date/datetime or unix timestamp query parameter."""
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    try:
+        return datetime.fromisoformat(value).timestamp()
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid {name}: {value}")
+
+
+def parse_stores(stores: Optional[str]) -> Optional[List[str]]:
+    """Validate a ?stores= selection; None selects every store."""
+    if not stores:
+        return None
+    try:
+        return comparator.resolve_stores(stores) if comparator else registry.resolve(stores)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def parse_store_locations(
+    locations: Optional[str], stores: Optional[List[str]]
+) -> Optional[Dict[str, List[str]]]:
+    """Validate a ?locations= selection against the selected stores; None keeps the defaults."""
+    if not locations:
+        return None
+    try:
+        parsed = parse_locations(locations)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    selected = stores or (comparator.stores if comparator else registry.available())
+    unknown = [store for store in parsed if store not in selected]
+    if unknown:
+        raise HTTPException(
+            status_code=400, detail=f"Location(s) given for unselected store(s): {', '.join(unknown)}"
+        )
+    return parsed
+
+
+def parse_product_fields(fields: Optional[str]) -> Fields:
+    """Validate a ?fields= selection; None returns every field."""
+    try:
+        return parse_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+async def submit_job(
+    kind: str,
+    query: str,
+    max_results: int,
+    stores: Optional[List[str]] = None,
+    locations: Optional[Dict[str, List[str]]] = None,
+    fields: Fields = None,
+) -> JSONResponse:
+    """Queue a scrape job and return its ID immediately."""
+    if not job_backend:
+        raise HTTPException(status_code=503, detail="Job queue not initialized")
+    
+    job = Job(kind, query, max_results, stores, locations, sorted(fields) if fields else None)
+    job = await asyncio.to_thread(job_backend.submit, job)
+    logger.info(f"Queued {kind} job {job.job_id}: q={query}")
+    return JSONResponse(
+        status_code=202,
+        content={
+            "job_id": job.job_id,
+            "status": job.status,
+            "poll": f"/jobs/{job.job_id}",
+            "wait": f"/jobs/{job.job_id}/wait",
+        },
+    )
+
+
+@app.middleware("http")
+async def track_requests(request: Request, call_next):
+    """Trace each request, count in-flight requests and time them per route."""
+    metrics.HTTP_REQUESTS_IN_FLIGHT.inc()
+    start = time.perf_counter()
+    status = 500
+    try:
+        with tracing.start_trace(
+            f"{request.method} {request.url.path}",
+            traceparent=request.headers.get("traceparent"),
+            query=str(request.query_params),
+        ) as root:
+            response = await call_next(request)
+            status = response.status_code
+            root.set_attribute("status", status)
+        response.headers["X-Trace-Id"] = root.trace_id
+        response.headers["traceparent"] = root.traceparent
+        return response
+    finally:
+        metrics.HTTP_REQUESTS_IN_FLIGHT.dec()
+        route = request.scope.get("route")
+        metrics.HTTP_REQUEST_DURATION.observe(
+            time.perf_counter() - start,
+            route=route.path if route else "unmatched",
+            status=str(status),
+        )
+
+
+@app.middleware("http")
+async def profile_requests(request: Request, call_next):
+    """Profile the request when asked to with X-Profile or ?profile=."""
+    mode = request.headers.get("X-Profile") or request.query_params.get("profile")
+    if not mode:
+        return await call_next(request)
+    if mode not in profiling.MODES:
+        return JSONResponse(
+            status_code=400,
+            content={"detail": f"profile must be one of: {', '.join(profiling.MODES)}"},
+        )
+    if not profile_limiter.acquire():
+        response = await call_next(request)
+        response.headers["X-Profile"] = "skipped (rate limited)"
+        return response
+    
+    try:
+        with profiling.profile(mode, f"{request.method} {request.url.path}", PROFILE_DIR) as result:
+            response = await call_next(request)
+    finally:
+        profile_limiter.release()
+    response.headers["X-Profile"] = str(result.path)
+    return response
 
 
 @app.get("/")
@@ -42,7 +346,17 @@ async def root():
         "endpoints": {
             "/search": "Search for products",
             "/compare": "Compare prices across stores",
-            "/health": "Health check"
+            "/barcode/{ean}": "Compare prices of one product by barcode",
+            "/jobs/{job_id}": "Poll an asynchronous job",
+            "/jobs/{job_id}/wait": "Wait for an asynchronous job to finish",
+            "/health": "Health check",
+            "/metrics": "Prometheus metrics",
+            "/traces/{trace_id}": "Spans of a recent request (see X-Trace-Id)",
+            "/prewarm": "Cache pre-warming statistics",
+            "/sessions": "Anti-bot challenge rate, warm browser sessions and browser memory",
+            "/selectors": "Learned selector order and layout-change alerts",
+            "/history": "Price history of a product",
+            "/history/store/{store}": "Price changes recorded for a store",
         }
     }
 
@@ -53,10 +367,68 @@ async def health():
     return {"status": "ok"}
 
 
+@app.get("/metrics")
+async def prometheus_metrics():
+    """Scrape, cache, browser and HTTP metrics in the Prometheus text format."""
+    return Response(content=metrics.REGISTRY.render(), media_type=metrics.CONTENT_TYPE)
+
+
+@app.get("/traces/{trace_id}")
+async def get_trace(trace_id: str):
+    """Spans recorded for a recent request, in start order."""
+    spans = tracing.EXPORTER.get_trace(trace_id)
+    if not spans:
+        raise HTTPException(status_code=404, detail="Trace not found (expired or unknown)")
+    root = spans[0]
+    return {
+        "trace_id": trace_id,
+        "name": root["name"],
+        "duration_ms": root["durationMs"],
+        "spans": spans,
+    }
+
+
+@app.get("/prewarm")
+async def prewarm_stats():
+    """Cache pre-warming statistics, including requests served warm."""
+    if not prewarmer:
+        return {"enabled": False}
+    return {"enabled": True, **prewarmer.stats()}
+
+
+@app.get("/sessions")
+async def session_stats():
+    """Per-store challenge rate and warm browser session lifetimes, and browser memory."""
+    if not comparator:
+        raise HTTPException(status_code=503, detail="Comparator not initialized")
+    browser_pool = comparator.browser_pool
+    return {
+        "stores": comparator.session_stats(),
+        "browser": browser_pool.stats() if hasattr(browser_pool, "stats") else None,
+    }
+
+
+@app.get("/selectors")
+async def selector_stats():
+    """Learned selector order per store and field, and fields whose selectors stopped matching."""
+    if not comparator:
+        raise HTTPException(status_code=503, detail="Comparator not initialized")
+    alerts, chains = [], {}
+    for stats in comparator.selector_stats():
+        alerts.extend(stats.alerts())
+        chains.update(stats.stats())
+    return {"alerts": alerts, "stores": chains}
+
+
 @app.get("/search")
 async def search(
     q: str = Query(..., description="Search query"),
-    max_results: int = Query(10, ge=1, le=50, description="Max results per store")
+    max_results: int = Query(10, ge=1, le=50, description="Max results per store"),
+    mode: str = Query("live", description="live, local (catalog only) or auto (live with catalog fallback)"),
+    stores: Optional[str] = Query(None, description="Comma-separated stores, e.g. carrefour,leclerc (default: all)"),
+    locations: Optional[str] = Query(None, description="Store locations, e.g. leclerc:drive-1,leclerc:drive-2"),
+    fields: Optional[str] = Query(None, description="Product fields to scrape and return, e.g. name,price (default: all)"),
+    run_async: bool = Query(False, alias="async", description="Queue the search and return a job ID")
 ):
     """
     Search for products across all stores.
@@ -64,21 +436,68 @@ async def search(
     Args:
         q: Search query
         max_results: Maximum results per store (1-50)
+        mode: "live" scrapes, "local" answers from the catalog in milliseconds,
+            "auto" scrapes with a time budget and falls back to the catalog
+        stores: Stores to search (default: all)
+        locations: Store locations to search in parallel (default: each store's default)
+        fields: Product fields to return; the others are not scraped, and
+            images are not loaded unless image_url is requested
+        run_async: Return a job ID immediately instead of waiting for the scrape
+            (live mode only)
         
     Returns:
-        List of products from all stores
+        List of products from all stores, or the queued job
     """
+    if mode not in SEARCH_MODES:
+        raise HTTPException(status_code=400, detail=f"Invalid mode: {mode}")
+    selected = parse_stores(stores)
+    selected_locations = parse_store_locations(locations, selected)
+    selected_fields = parse_product_fields(fields)
+    
+    if run_async:
+        # Job workers only run live scrapes; local answers are instant anyway
+        if mode != "live":
+            raise HTTPException(status_code=400, detail=f"mode={mode} cannot be combined with async=true")
+        return await submit_job("search", q, max_results, selected, selected_locations, selected_fields)
+    
     if not comparator:
         raise HTTPException(status_code=503, detail="Comparator not initialized")
     
     try:
-        logger.info(f"Search request: q={q}, max_results={max_results}")
-        products = await comparator.search_all(q, max_results)
+        logger.info(f"Search request: q={q}, max_results={max_results}, mode={mode}")
+        if mode == "local":
+            products = await comparator.search_local(q, max_results, selected, selected_locations)
+        else:
+            if prewarmer:
+                await prewarmer.record(q)
+            if mode == "auto":
+                products = await comparator.search_all(
+                    q,
+                    max_results,
+                    store_timeout=AUTO_STORE_TIMEOUT,
+                    fallback=True,
+                    stores=selected,
+                    locations=selected_locations,
+                    fields=selected_fields,
+                )
+            else:
+                products = await comparator.search_all(
+                    q, max_results, stores=selected, locations=selected_locations, fields=selected_fields
+                )
+        
+        if mode == "live":
+            product_dicts = [p.to_dict(selected_fields) for p in products]
+        else:
+            product_dicts = [
+                {**p.to_dict(selected_fields), "source": p.source, "age_seconds": round(p.age_seconds())}
+                for p in products
+            ]
         
         return {
             "query": q,
+            "mode": mode,
             "total_results": len(products),
-            "products": [p.to_dict() for p in products]
+            "products": product_dicts
         }
     except Exception as e:
         logger.error(f"Search error: {e}", exc_info=True)
@@ -88,7 +507,11 @@ async def search(
 @app.get("/compare")
 async def compare(
     q: str = Query(..., description="Search query"),
-    max_per_store: int = Query(5, ge=1, le=20, description="Max results per store")
+    max_per_store: int = Query(5, ge=1, le=20, description="Max results per store"),
+    stores: Optional[str] = Query(None, description="Comma-separated stores, e.g. carrefour,leclerc (default: all)"),
+    locations: Optional[str] = Query(None, description="Store locations, e.g. leclerc:drive-1,leclerc:drive-2"),
+    fields: Optional[str] = Query(None, description="Product fields to scrape, e.g. name,price,ean (default: all)"),
+    run_async: bool = Query(False, alias="async", description="Queue the comparison and return a job ID")
 ):
     """
     Compare prices for a product across stores.
@@ -96,16 +519,30 @@ async def compare(
     Args:
         q: Search query
         max_per_store: Maximum results per store (1-20)
+        stores: Stores to compare (default: all)
+        locations: Store locations to compare in parallel (default: each store's default)
+        fields: Product fields to scrape; deals carry None for the others
+        run_async: Return a job ID immediately instead of waiting for the scrape
         
     Returns:
-        Price comparison with best deals
+        Price comparison with best deals, or the queued job
     """
+    selected = parse_stores(stores)
+    selected_locations = parse_store_locations(locations, selected)
+    selected_fields = parse_product_fields(fields)
+    if run_async:
+        return await submit_job("compare", q, max_per_store, selected, selected_locations, selected_fields)
+    
     if not comparator:
         raise HTTPException(status_code=503, detail="Comparator not initialized")
     
     try:
         logger.info(f"Compare request: q={q}, max_per_store={max_per_store}")
-        results = await comparator.compare_prices(q, max_per_store)
+        if prewarmer:
+            await prewarmer.record(q)
+        results = await comparator.compare_prices(
+            q, max_per_store, selected, selected_locations, fields=selected_fields
+        )
         
         return results
     except Exception as e:
@@ -113,6 +550,170 @@ async def compare(
         raise HTTPException(status_code=500, detail=f"Comparison failed: {str(e)}")
 
 
+@app.get("/barcode/{ean}")
+async def compare_barcode(
+    ean: str,
+    max_per_store: int = Query(5, ge=1, le=20, description="Max results per store of live searches"),
+    stores: Optional[str] = Query(None, description="Comma-separated stores, e.g. carrefour,leclerc (default: all)"),
+    locations: Optional[str] = Query(None, description="Store locations, e.g. leclerc:drive-1,leclerc:drive-2"),
+    max_age: float = Query(3600, ge=0, description="Seconds an indexed price stays usable")
+):
+    """
+    Compare prices of one product by its EAN barcode.
+    
+    Args:
+        ean: EAN-13, EAN-8, UPC-A or GTIN-14 barcode
+        max_per_store: Maximum results per store of live searches (1-20)
+        stores: Stores to compare (default: all)
+        locations: Store locations to compare (default: each store's default)
+        max_age: Seconds a price seen by an earlier search is reused
+        
+    Returns:
+        Price comparison of the stores selling that exact product
+    """
+    selected = parse_stores(stores)
+    selected_locations = parse_store_locations(locations, selected)
+    if not comparator:
+        raise HTTPException(status_code=503, detail="Comparator not initialized")
+    if normalize_ean(ean) is None:
+        raise HTTPException(status_code=400, detail=f"Invalid barcode: {ean}")
+    
+    try:
+        logger.info(f"Barcode request: ean={ean}")
+        return await comparator.compare_barcode(ean, max_per_store, selected, selected_locations, max_age)
+    except Exception as e:
+        logger.error(f"Barcode error: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Comparison failed: {str(e)}")
+
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    """
+    Poll an asynchronous job.
+    
+    Args:
+        job_id: Job identifier returned by /search or /compare with async=true
+        
+    Returns:
+        Job status, with the result once finished
+    """
+    if not job_backend:
+        raise HTTPException(status_code=503, detail="Job queue not initialized")
+    
+    job = await asyncio.to_thread(job_backend.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job: {job_id}")
+    return job.to_dict()
+
+
+@app.get("/jobs/{job_id}/wait")
+async def wait_job(
+    job_id: str,
+    timeout: float = Query(30.0, ge=0, le=120, description="Max seconds to wait")
+):
+    """
+    Wait for an asynchronous job to finish (long polling).
+    
+    Args:
+        job_id: Job identifier
+        timeout: Maximum time to wait in seconds (0-120)
+        
+    Returns:
+        Job status, with the result if it finished in time
+    """
+    if not job_backend:
+        raise HTTPException(status_code=503, detail="Job queue not initialized")
+    
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    job = await asyncio.to_thread(job_backend.get, job_id)
+    while job is not None and not job.finished and loop.time() < deadline:
+        await asyncio.sleep(JOB_POLL_INTERVAL)
+        job = await asyncio.to_thread(job_backend.get, job_id)
+    
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job: {job_id}")
+    return job.to_dict()
+
+
+@app.get("/history")
+async def product_history(
+    product: str = Query(..., description="Product name"),
+    store: Optional[str] = Query(None, description="Restrict to one store"),
+    since: Optional[str] = Query(None, description="ISO date or unix timestamp"),
+    until: Optional[str] = Query(None, description="ISO date or unix timestamp"),
+    limit: int = Query(1000, ge=1, le=10000, description="Max rows"),
+    location: Optional[str] = Query(None, description="Restrict to one store location, e.g. a drive id")
+):
+    """
+    Price history of a product across stores.
+    
+    Args:
+        product: Product name (case and whitespace insensitive)
+        store: Restrict to one store
+        since: Start of the time range
+        until: End of the time range (exclusive)
+        limit: Maximum rows returned (1-10000)
+        location: Restrict to one store location
+        
+    Returns:
+        Price changes, oldest first, with a per-store (and location) summary
+    """
+    if not history:
+        raise HTTPException(status_code=503, detail="Price history disabled")
+    
+    rows = await asyncio.to_thread(
+        history.product_history,
+        product,
+        store,
+        parse_time(since, "since"),
+        parse_time(until, "until"),
+        limit,
+        location,
+    )
+    return {
+        "product": product,
+        "total_results": len(rows),
+        "summary": summarize_history(rows),
+        "history": rows,
+    }
+
+
+@app.get("/history/store/{store}")
+async def store_history(
+    store: str,
+    since: Optional[str] = Query(None, description="ISO date or unix timestamp"),
+    until: Optional[str] = Query(None, description="ISO date or unix timestamp"),
+    limit: int = Query(1000, ge=1, le=10000, description="Max rows"),
+    location: Optional[str] = Query(None, description="Restrict to one store location, e.g. a drive id")
+):
+    """
+    Price changes recorded for a store.
+    
+    Args:
+        store: Store name (case-insensitive)
+        since: Start of the time range
+        until: End of the time range (exclusive)
+        limit: Maximum rows returned (1-10000)
+        location: Restrict to one store location
+        
+    Returns:
+        Price changes, oldest first
+    """
+    if not history:
+        raise HTTPException(status_code=503, detail="Price history disabled")
+    
+    rows = await asyncio.to_thread(
+        history.store_history,
+        store,
+        parse_time(since, "since"),
+        parse_time(until, "until"),
+        limit,
+        location,
+    )
+    return {"store": store, "total_results": len(rows), "history": rows}
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(
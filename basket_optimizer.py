@@ -0,0 +1,226 @@
+"""Cheapest multi-store split of a shopping list.
+
+Buying every item at its cheapest store ignores that each extra shop costs a
+trip. optimize_basket() picks the set of stores minimizing the item prices
+plus a fixed cost per store visited, optionally with at most max_stores
+stores, and assigns each item to its cheapest store in that set.
+
+While there are at most EXACT_SUBSETS store subsets to choose from (11
+stores, or up to 23 with max_stores=3), the search is exact: subsets are
+enumerated depth-first, each one extending its parent's per-item minima with
+one more store (a single map(min, ...) pass), and branches that cannot beat
+the best basket found so far are pruned. This stays within a few hundred
+milliseconds for 250 items.
+
+Above that the exact search grows exponentially (about a minute for 20
+stores with a store cost), so a local search is used instead: starting from
+the best single store, and from the stores cheapest for some item, the best
+move adding, dropping or swapping one store is applied while it lowers the
+total. The result is then flagged "exact": False; on random price matrices
+it is within a few percent of the optimum, usually equal to it.
+"""
+
+from math import comb
+from typing import Dict, List, Optional, Tuple, Union
+import math
+
+StoreCost = Union[float, Dict[str, float]]
+
+# Largest number of store subsets searched exhaustively (2^11)
+EXACT_SUBSETS = 2048
+
+
+def store_key(store: str, location: Optional[str] = None) -> str:
+    """Name of a store in the matrix ("Leclerc", or "Leclerc @ drive-1" per location)."""
+    return f"{store} @ {location}" if location else store
+
+
+def price_matrix(comparisons: Dict[str, Dict]) -> Dict[str, Dict[str, Dict]]:
+    """
+    Cheapest offer of each store for each item.
+
+    Args:
+        comparisons: Item -> PriceComparator.compare_prices() result; items
+            whose comparison failed or found nothing are skipped
+
+    Returns:
+        Item -> store -> {"price", "name", "url"}
+    """
+    matrix = {}
+    for item, comparison in comparisons.items():
+        offers: Dict[str, Dict] = {}
+        for deal in comparison.get("best_deals") or []:
+            for price in deal["all_prices"]:
+                store = store_key(price["store"], price.get("location"))
+                if store not in offers or price["price"] < offers[store]["price"]:
+                    offers[store] = {"price": price["price"], "name": deal["name"], "url": price["url"]}
+        if offers:
+            matrix[item] = offers
+    return matrix
+
+
+def optimize_basket(
+    matrix: Dict[str, Dict[str, Dict]],
+    max_stores: Optional[int] = None,
+    store_cost: StoreCost = 0.0,
+    quantities: Optional[Dict[str, float]] = None,
+) -> Dict:
+    """
+    Cheapest assignment of items to at most max_stores stores.
+
+    Args:
+        matrix: Item -> store -> offer with a "price" (see price_matrix())
+        max_stores: Maximum number of stores visited (default: no limit)
+        store_cost: Fixed cost of visiting a store (travel, delivery fee),
+            one value for all stores or per store
+        quantities: Units bought per item (default: 1)
+
+    Returns:
+        {"stores": {store: {"items": [...], "subtotal"}}, "items_total",
+        "store_costs", "total", "unpriced", "cheapest_everywhere" (the
+        total when each item is bought at its cheapest store), and "exact"
+        (False if the stores were chosen by local search)}; stores is empty
+        if nothing is priced
+
+    Raises:
+        ValueError: If max_stores is below 1
+    """
+    if max_stores is not None and max_stores < 1:
+        raise ValueError("max_stores must be at least 1")
+    quantities = quantities or {}
+
+    items = list(matrix)
+    stores = sorted({store for offers in matrix.values() for store in offers})
+    fixed = [store_cost.get(s, 0.0) if isinstance(store_cost, dict) else store_cost for s in stores]
+    # costs[j][i]: price of item i at store j for the wanted quantity, inf if not sold there
+    costs = [
+        [
+            matrix[item][store]["price"] * quantities.get(item, 1) if store in matrix[item] else math.inf
+            for item in items
+        ]
+        for store in stores
+    ]
+    limit = min(max_stores or len(stores), len(stores))
+
+    # Any basket pays at least the cheapest price of every item
+    floor = sum(min(column) for column in zip(*costs))
+    exact = sum(comb(len(stores), size) for size in range(1, limit + 1)) <= EXACT_SUBSETS
+    if exact:
+        chosen = _exhaustive_search(costs, fixed, limit, floor)
+    else:
+        chosen = _local_search(costs, fixed, limit)
+
+    plan = {store: {"items": [], "subtotal": 0.0} for store in (stores[j] for j in chosen)}
+    unpriced = []
+    for i, item in enumerate(items):
+        j = min(chosen, key=lambda j: costs[j][i]) if chosen else None
+        if j is None or costs[j][i] == math.inf:
+            unpriced.append(item)
+            continue
+        store = stores[j]
+        offer = matrix[item][store]
+        plan[store]["items"].append({
+            "item": item,
+            "name": offer["name"],
+            "quantity": quantities.get(item, 1),
+            "price": round(costs[j][i], 2),
+            "url": offer.get("url"),
+        })
+        plan[store]["subtotal"] += costs[j][i]
+
+    items_total = sum(entry["subtotal"] for entry in plan.values())
+    store_costs = sum(fixed[j] for j in chosen)
+    for entry in plan.values():
+        entry["subtotal"] = round(entry["subtotal"], 2)
+
+    # Reference: every item at its cheapest store, whatever the number of trips
+    cheapest_stores = {min(range(len(stores)), key=lambda j: costs[j][i]) for i in range(len(items))}
+    cheapest_everywhere = floor + sum(fixed[j] for j in cheapest_stores) if items else 0.0
+
+    return {
+        "stores": plan,
+        "items_total": round(items_total, 2),
+        "store_costs": round(store_costs, 2),
+        "total": round(items_total + store_costs, 2),
+        "unpriced": unpriced,
+        "cheapest_everywhere": round(cheapest_everywhere, 2),
+        "exact": exact,
+    }
+
+
+def _score(minima: List[float], paid: float) -> Tuple[int, float]:
+    """(items left unpriced, total) of a basket with these per-item minima."""
+    total = sum(minima)
+    if not math.isinf(total):
+        return 0, total + paid
+    return minima.count(math.inf), sum(cost for cost in minima if cost != math.inf) + paid
+
+
+def _exhaustive_search(costs: List[List[float]], fixed: List[float], limit: int, floor: float) -> Tuple[int, ...]:
+    """Best set of at most limit stores, by branch and bound over all subsets."""
+    best = {"missing": math.inf, "total": math.inf, "subset": ()}
+
+    def visit(start: int, subset: tuple, minima: Optional[List[float]], paid: float) -> None:
+        for j in range(start, len(costs)):
+            visit_paid = paid + fixed[j]
+            if best["missing"] == 0 and floor + visit_paid >= best["total"]:
+                continue  # neither this subset nor its supersets can win
+            extended = costs[j] if minima is None else list(map(min, minima, costs[j]))
+            total = sum(extended)
+            missing = 0
+            if math.isinf(total):
+                # Only reachable with max_stores: no smaller set sells everything
+                missing = extended.count(math.inf)
+                total = sum(cost for cost in extended if cost != math.inf)
+            total += visit_paid
+            if (missing, total) < (best["missing"], best["total"]):
+                best.update(missing=missing, total=total, subset=subset + (j,))
+            if len(subset) + 1 < limit:
+                visit(j + 1, subset + (j,), extended, visit_paid)
+
+    visit(0, (), None, 0.0)
+    return best["subset"]
+
+
+def _local_search(costs: List[List[float]], fixed: List[float], limit: int) -> Tuple[int, ...]:
+    """Good set of at most limit stores, improved by add/drop/swap moves while they help."""
+    stores = range(len(costs))
+
+    def minima_of(subset: Tuple[int, ...]) -> List[float]:
+        return list(map(min, *(costs[j] for j in subset))) if len(subset) > 1 else costs[subset[0]]
+
+    def paid(subset: Tuple[int, ...]) -> float:
+        return sum(fixed[j] for j in subset)
+
+    def descend(score: Tuple[int, float], current: Tuple[int, ...]) -> Tuple[Tuple[int, float], Tuple[int, ...]]:
+        while True:
+            minima, others = minima_of(current), [j for j in stores if j not in current]
+            # (score, subset) of each move, built from the minima of the stores kept
+            moves = []
+            if len(current) < limit:
+                moves += [
+                    (_score(list(map(min, minima, costs[o])), paid(current) + fixed[o]), current + (o,))
+                    for o in others
+                ]
+            if len(current) > 1:
+                for j in current:
+                    kept = tuple(k for k in current if k != j)
+                    kept_minima = minima_of(kept)
+                    moves.append((_score(kept_minima, paid(kept)), kept))
+                    moves += [
+                        (_score(list(map(min, kept_minima, costs[o])), paid(kept) + fixed[o]), kept + (o,))
+                        for o in others
+                    ]
+            else:
+                moves += [(_score(costs[o], fixed[o]), (o,)) for o in others]
+            move = min(moves, default=None)
+            if move is None or move[0] >= score:
+                return score, current
+            score, current = move
+
+    # Start from the best single store, and from the stores cheapest for some item
+    starts = [min((_score(costs[j], fixed[j]), (j,)) for j in stores)]
+    cheapest = tuple({min(stores, key=lambda j: costs[j][i]) for i in range(len(costs[0]))})
+    if len(cheapest) <= limit:
+        starts.append((_score(minima_of(cheapest), paid(cheapest)), cheapest))
+    return tuple(sorted(min(descend(*start) for start in starts)[1]))
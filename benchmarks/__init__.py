@@ -0,0 +1,4 @@
+"""Offline benchmarks and performance harnesses for the scrapers.
+
+Run them from the repository root, e.g. ``python -m benchmarks.replay_bench --help``.
+"""
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""Basket optimizer benchmark on random price matrices.
+
+Times optimize_basket() for a shopping list of --items items priced at
+--stores stores, for each store limit and per-store cost:
+
+    python -m benchmarks.basket_bench --items 250 --stores 8
+"""
+
+from datetime import datetime
+from pathlib import Path
+from typing import Dict
+import argparse
+import json
+import random
+import statistics
+import sys
+import time
+from basket_optimizer import optimize_basket
+from benchmarks.e2e_bench import git_revision
+
+RESULTS_DIR = Path(__file__).parent / "results"
+
+
+def random_matrix(items: int, stores: int, coverage: float = 0.85, seed: int = 0) -> Dict[str, Dict[str, Dict]]:
+    """Item -> store -> offer; each store sells an item with probability coverage."""
+    rng = random.Random(seed)
+    names = [f"Store {j}" for j in range(stores)]
+    matrix = {}
+    for i in range(items):
+        base = rng.uniform(0.5, 15.0)
+        offers = {
+            store: {"price": round(base * rng.uniform(0.8, 1.3), 2), "name": f"item {i}", "url": None}
+            for store in names if rng.random() < coverage
+        }
+        matrix[f"item {i}"] = offers or {names[0]: {"price": round(base, 2), "name": f"item {i}", "url": None}}
+    return matrix
+
+
+def main():
+    """Run the basket optimizer benchmark."""
+    parser = argparse.ArgumentParser(description="Basket optimizer benchmark")
+    parser.add_argument("--items", type=int, default=250, help="Items in the shopping list (default: 250)")
+    parser.add_argument("--stores", type=int, default=8, help="Stores priced (default: 8)")
+    parser.add_argument("-k", "--max-stores", type=int, action="append", help="Store limit (repeatable, default: 1, 2, 3 and none)")
+    parser.add_argument("-c", "--store-cost", type=float, action="append", help="Cost per store (repeatable, default: 0 and 5)")
+    parser.add_argument("-r", "--runs", type=int, default=5, help="Runs per case (default: 5)")
+    parser.add_argument("-o", "--output", help="Output JSON path (default: benchmarks/results/basket-<time>.json)")
+    args = parser.parse_args()
+
+    matrix = random_matrix(args.items, args.stores)
+    results = []
+    for max_stores in args.max_stores or [1, 2, 3, None]:
+        for store_cost in args.store_cost or [0.0, 5.0]:
+            timings = []
+            for _ in range(args.runs):
+                start = time.perf_counter()
+                plan = optimize_basket(matrix, max_stores, store_cost)
+                timings.append(time.perf_counter() - start)
+            entry = {
+                "max_stores": max_stores,
+                "store_cost": store_cost,
+                "median_ms": statistics.median(timings) * 1000,
+                "max_ms": max(timings) * 1000,
+                "stores_used": len(plan["stores"]),
+                "unpriced": len(plan["unpriced"]),
+                "total": plan["total"],
+                "cheapest_everywhere": plan["cheapest_everywhere"],
+                "exact": plan["exact"],
+            }
+            results.append(entry)
+            print(
+                f"k={str(max_stores or '-'):<3} cost={store_cost:<5} median {entry['median_ms']:7.1f} ms   "
+                f"max {entry['max_ms']:7.1f} ms   {entry['stores_used']} stores, {entry['total']:.2f}€"
+                + ("" if entry["exact"] else " (local search)")
+                + (f" ({entry['unpriced']} items not sold there)" if entry["unpriced"] else "")
+            )
+
+    report = {
+        "benchmark": "basket",
+        "timestamp": datetime.now().isoformat(),
+        "git_revision": git_revision(),
+        "python": sys.version.split()[0],
+        "items": args.items,
+        "stores": args.stores,
+        "cases": results,
+    }
+    output = Path(args.output) if args.output else RESULTS_DIR / f"basket-{datetime.now():%Y%m%d-%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+    print(f"\n💾 Results saved to: {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""End-to-end latency benchmark against the local fake-store server.
+
+Drives PriceComparator.search_all / compare_prices at several concurrency
+levels and reports latency percentiles, throughput, browser count and RSS:
+
+    python -m benchmarks.e2e_bench -c 1,4,8 -n 32 --latency 150
+    python -m benchmarks.e2e_bench --cold            # browser launch per search
+    python -m benchmarks.e2e_bench --store-url http://127.0.0.1:8765
+
+Results are saved as JSON under benchmarks/results/ so runs can be compared
+over time.
+"""
+
+from contextlib import ExitStack
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+import argparse
+import asyncio
+import json
+import logging
+import os
+import subprocess
+import time
+from price_comparator import PriceComparator
+from scrapers import BrowserPool
+from scrapers.procinfo import browser_instances, tree_rss_bytes
+from benchmarks.fake_store import FakeStoreConfig, point_at_fake_store, start_fake_store
+from benchmarks.stats import summarize
+
+RESULTS_DIR = Path(__file__).parent / "results"
+
+
+class ResourceSampler:
+    """Sample browser count and process-tree RSS in the background."""
+
+    def __init__(self, interval: float = 0.25):
+        self.interval = interval
+        self.peak_rss = 0
+        self.peak_browsers = 0
+        self._task: Optional[asyncio.Task] = None
+
+    def _sample(self) -> None:
+        self.peak_rss = max(self.peak_rss, tree_rss_bytes())
+        self.peak_browsers = max(self.peak_browsers, browser_instances())
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.to_thread(self._sample)
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._sample()
+
+
+async def run_level(
+    comparator: PriceComparator, mode: str, concurrency: int, requests: int, max_per_store: int
+) -> Dict:
+    """Run requests searches at a fixed concurrency and summarize them."""
+    slots = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    errors = 0
+    empty = 0
+
+    async def one(i: int) -> None:
+        nonlocal errors, empty
+        # Unique queries so every request scrapes
+        query = f"produit {concurrency}-{i}-{time.monotonic_ns()}"
+        async with slots:
+            start = time.perf_counter()
+            try:
+                if mode == "compare":
+                    result = await comparator.compare_prices(query, max_per_store)
+                    count = result["total_products"]
+                else:
+                    count = len(await comparator.search_all(query, max_per_store))
+                if count == 0:
+                    empty += 1
+            except Exception:
+                errors += 1
+            latencies.append(time.perf_counter() - start)
+
+    sampler = ResourceSampler()
+    sampler.start()
+    wall_start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    wall = time.perf_counter() - wall_start
+    await sampler.stop()
+
+    return {
+        "concurrency": concurrency,
+        "requests": requests,
+        "errors": errors,
+        "empty_results": empty,
+        "wall_seconds": wall,
+        "throughput_rps": requests / wall if wall else 0.0,
+        "latency": summarize(latencies),
+        "peak_browsers": sampler.peak_browsers,
+        "peak_rss_mb": round(sampler.peak_rss / 1024 / 1024, 1),
+    }
+
+
+def git_revision() -> Optional[str]:
+    """Current git commit, if available."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_level(level: Dict) -> None:
+    lat = level["latency"]
+    print(
+        f"c={level['concurrency']:<3} "
+        f"p50 {lat['p50'] * 1000:7.0f} ms  p95 {lat['p95'] * 1000:7.0f} ms  p99 {lat['p99'] * 1000:7.0f} ms  "
+        f"{level['throughput_rps']:6.2f} req/s  browsers {level['peak_browsers']:<3} "
+        f"RSS {level['peak_rss_mb']:7.1f} MB  errors {level['errors']}"
+    )
+
+
+async def main():
+    """Run the end-to-end benchmark."""
+    parser = argparse.ArgumentParser(description="End-to-end scrape latency benchmark")
+    parser.add_argument("-c", "--concurrency", default="1,2,4,8", help="Comma-separated levels (default: 1,2,4,8)")
+    parser.add_argument("-n", "--requests", type=int, default=16, help="Requests per level (default: 16)")
+    parser.add_argument("-m", "--mode", choices=["search", "compare"], default="compare")
+    parser.add_argument("--max-per-store", type=int, default=5, help="Results per store (default: 5)")
+    parser.add_argument("--cold", action="store_true", help="Launch a browser per search (no BrowserPool)")
+    parser.add_argument("--store-url", help="Use a running fake store instead of starting one")
+    parser.add_argument("--latency", type=float, default=100.0, help="Fake store latency in ms (default: 100)")
+    parser.add_argument("--results", type=int, default=24, help="Fake store products per page (default: 24)")
+    parser.add_argument("--pages", type=int, default=1, help="Fake store result pages per query (default: 1)")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="Fake store HTTP 500 probability")
+    parser.add_argument("-o", "--output", help="Output JSON path (default: benchmarks/results/e2e-<time>.json)")
+    parser.add_argument("-v", "--verbose", action="store_true", help="Enable verbose logging")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.ERROR)
+    levels = [int(c) for c in args.concurrency.split(",") if c.strip()]
+
+    server = None
+    config = FakeStoreConfig(
+        latency_ms=args.latency, results=args.results, failure_rate=args.failure_rate, pages=args.pages
+    )
+    if args.store_url:
+        base_url = args.store_url.rstrip("/")
+    else:
+        server = await start_fake_store(config)
+        base_url = server.base_url
+
+    comparator = PriceComparator(browser_pool=None if args.cold else BrowserPool())
+    fake_stores = ExitStack()
+    for scraper in comparator.scrapers:
+        fake_stores.enter_context(point_at_fake_store(scraper, base_url))
+
+    print(f"🏁 {args.mode} benchmark against {base_url} ({'cold' if args.cold else 'warm'} browsers)")
+    results = []
+    try:
+        for concurrency in levels:
+            level = await run_level(comparator, args.mode, concurrency, args.requests, args.max_per_store)
+            print_level(level)
+            results.append(level)
+    finally:
+        await comparator.close()
+        fake_stores.close()
+        if server:
+            await server.stop()
+
+    report = {
+        "benchmark": "e2e",
+        "timestamp": datetime.now().isoformat(),
+        "git_revision": git_revision(),
+        "mode": args.mode,
+        "warm_browsers": not args.cold,
+        "max_per_store": args.max_per_store,
+        "fake_store": None if args.store_url else config.to_dict(),
+        "cpu_count": os.cpu_count(),
+        "levels": results,
+    }
+    output = Path(args.output) if args.output else RESULTS_DIR / f"e2e-{datetime.now():%Y%m%d-%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+    print(f"\n💾 Results saved to: {output}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,403 @@
+#!/usr/bin/env python3
+"""Local HTTP server emulating the stores' search pages for offline benchmarks.
+
+Serves Carrefour, Intermarché and Leclerc search result pages built with the
+markup each scraper expects, with deterministic synthetic products:
+
+    python -m benchmarks.fake_store --port 8765 --latency 200 --results 24
+
+Latency, result counts, pagination and failure injection (HTTP 500 or an
+anti-bot challenge page) are configurable per server and overridable per
+request with query parameters (``latency_ms``, ``results``, ``pages``,
+``fail``). Result pages link to the next one with ``<a rel="next">``.
+
+Each store also serves a category tree for catalog crawls: ``/<store>/rayons``
+links to categories, which link to sub-categories (plus a few featured
+products, duplicated on purpose) holding paginated product listings.
+"""
+
+from contextlib import contextmanager
+from html import escape
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+from urllib.parse import urlencode
+import argparse
+import asyncio
+import hashlib
+import json
+import logging
+import random
+import tempfile
+from aiohttp import web
+from scrapers.selector_stats import SelectorStats
+from scrapers.session import SessionManager
+
+logger = logging.getLogger(__name__)
+
+ADJECTIVES = ["fermier", "bio", "extra", "classique", "premium", "familial", "léger", "entier"]
+BRANDS = ["Marque Repère", "Carrefour", "Président", "Lustucru", "Panzani", "Bonne Maman", "Lactel"]
+UNITS = ["kg", "L"]
+
+# A 1x1 transparent GIF served for product images
+PIXEL = bytes.fromhex("47494638396101000100800000000000ffffff21f90401000000002c00000000010001000002024401003b")
+
+CHALLENGE_PAGE = """<!DOCTYPE html><html><head><title>Just a moment...</title></head>
+<body><div id="challenge-form">Checking your browser before accessing the site.</div></body></html>"""
+
+
+class FakeProduct:
+    """Synthetic product, deterministic for a given store, query and index."""
+
+    def __init__(self, store: str, query: str, index: int):
+        seed = int(hashlib.md5(f"{store}:{query}:{index}".encode()).hexdigest()[:8], 16)
+        rng = random.Random(seed)
+        self.id = f"{seed:08x}"
+        self.name = f"{query.strip().capitalize()} {rng.choice(ADJECTIVES)} {index + 1}"
+        self.brand = rng.choice(BRANDS)
+        self.euros = rng.randint(0, 15)
+        self.cents = rng.randint(1, 99)
+        self.unit_price = f"{rng.randint(1, 30)},{rng.randint(10, 99)}"
+        self.unit = rng.choice(UNITS)
+        # Same barcode in every store (names and prices differ), valid check digit
+        ean_rng = random.Random(f"{query}:{index}")
+        body = "3" + "".join(str(ean_rng.randint(0, 9)) for _ in range(11))
+        weighted = sum(int(d) * (3 if i % 2 == 0 else 1) for i, d in enumerate(reversed(body)))
+        self.ean = body + str((10 - weighted % 10) % 10)
+
+    @property
+    def price_text(self) -> str:
+        return f"{self.euros},{self.cents:02d} €"
+
+
+class FakeStoreConfig:
+    """Behaviour of the fake store server."""
+
+    def __init__(
+        self,
+        latency_ms: float = 100.0,
+        jitter_ms: float = 50.0,
+        results: int = 24,
+        failure_rate: float = 0.0,
+        challenge_rate: float = 0.0,
+        seed: Optional[int] = None,
+        pages: int = 1,
+        categories: int = 4,
+        subcategories: int = 3,
+        image_latency_ms: float = 0.0,
+    ):
+        """
+        Initialize configuration.
+
+        Args:
+            latency_ms: Base delay before each search page is served
+            jitter_ms: Uniform random extra delay
+            results: Products per search page
+            failure_rate: Probability of answering HTTP 500
+            challenge_rate: Probability of answering an anti-bot challenge page
+            seed: Seed for latency and failure randomness (optional)
+            pages: Result pages per query (results products each)
+            categories: Top-level categories of the catalog tree
+            subcategories: Sub-categories per category
+            image_latency_ms: Delay before each product image is served
+        """
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.results = results
+        self.failure_rate = failure_rate
+        self.challenge_rate = challenge_rate
+        self.rng = random.Random(seed)
+        self.pages = pages
+        self.categories = categories
+        self.subcategories = subcategories
+        self.image_latency_ms = image_latency_ms
+
+    def to_dict(self) -> Dict:
+        return {
+            "latency_ms": self.latency_ms,
+            "jitter_ms": self.jitter_ms,
+            "results": self.results,
+            "failure_rate": self.failure_rate,
+            "challenge_rate": self.challenge_rate,
+            "pages": self.pages,
+            "categories": self.categories,
+            "subcategories": self.subcategories,
+            "image_latency_ms": self.image_latency_ms,
+        }
+
+
+def _page(title: str, body: str) -> str:
+    return f"<!DOCTYPE html><html><head><meta charset='utf-8'><title>{escape(title)}</title></head><body>{body}</body></html>"
+
+
+def render_carrefour(base: str, products: List[FakeProduct]) -> str:
+    tiles = "".join(
+        f'<article data-testid="product-card" data-product-id="{p.id}" data-ean="{p.ean}">'
+        f'<a href="{base}/p/{p.id}"><h3 data-testid="product-title">{escape(p.name)}</h3></a>'
+        f'<img src="{base}/img/{p.id}.gif" alt="">'
+        f'<span data-testid="product-brand">{escape(p.brand)}</span>'
+        f'<span data-testid="product-price">{p.price_text}</span>'
+        f'<span data-testid="product-unit">la pièce</span>'
+        f'<span data-testid="unit-price">{p.unit_price} € / {p.unit}</span>'
+        f'</article>'
+        for p in products
+    )
+    return _page("Carrefour - Recherche", f'<main class="search-results">{tiles}</main>')
+
+
+def render_intermarche(base: str, products: List[FakeProduct]) -> str:
+    tiles = "".join(
+        f'<div class="product" data-product="{p.id}" data-ean="{p.ean}">'
+        f'<a href="{base}/produit/{p.id}"><h3 class="product-title">{escape(p.name)}</h3></a>'
+        f'<img src="{base}/img/{p.id}.gif" alt="">'
+        f'<span class="product-brand">{escape(p.brand)}</span>'
+        f'<span class="product-price">{p.price_text}</span>'
+        f'<span class="product-unit">la pièce</span>'
+        f'<span class="unit-price">{p.unit_price} € / {p.unit}</span>'
+        f'</div>'
+        for p in products
+    )
+    return _page("Intermarché - Recherche", f'<main>{tiles}</main>')
+
+
+def render_leclerc(base: str, products: List[FakeProduct]) -> str:
+    # Leclerc's scraper reads textContent line by line: name, brand, "X € ,YY"
+    tiles = "".join(
+        f'<div class="product-tile" data-ean="{p.ean}">\n'
+        f'<a href="{base}/fp/{escape(p.name.lower().replace(" ", "-"))}-{p.ean}">{escape(p.name)}</a>\n'
+        f'<span>{escape(p.brand)}</span>\n'
+        f'<span>{p.euros} € ,{p.cents:02d}</span>\n'
+        f'<span>{p.unit_price} € / {p.unit.capitalize()}</span>\n'
+        f'<span>Vendu par E.Leclerc</span>\n'
+        f'</div>\n'
+        for p in products
+    )
+    return _page("E.Leclerc - Recherche", f'<main>\n{tiles}</main>')
+
+
+def _category_links(links: List[tuple]) -> str:
+    items = "".join(f'<li><a class="category-link" href="{escape(href)}">{escape(name)}</a></li>' for href, name in links)
+    return f'<nav class="categories"><ul>{items}</ul></nav>'
+
+
+# Products of each sub-category also featured on its parent category page
+FEATURED = 2
+
+# store slug -> (search path, query parameter, renderer)
+STORES = {
+    "carrefour": ("/s", "q", render_carrefour),
+    "intermarche": ("/courses-en-ligne/recherche", "search", render_intermarche),
+    "leclerc": ("/recherche", "q", render_leclerc),
+}
+
+# Scraper store_name -> store slug
+STORE_SLUGS = {"Carrefour": "carrefour", "Intermarché": "intermarche", "Leclerc": "leclerc"}
+
+
+def create_app(config: FakeStoreConfig) -> web.Application:
+    """Build the aiohttp application serving all fake stores."""
+    app = web.Application()
+    app["config"] = config
+    app["stats"] = {"requests": 0, "failures": 0, "challenges": 0}
+
+    async def pixel(request: web.Request) -> web.Response:
+        if config.image_latency_ms:
+            await asyncio.sleep(config.image_latency_ms / 1000)
+        return web.Response(body=PIXEL, content_type="image/gif")
+
+    async def listing(
+        request: web.Request, slug: str, query: str, paginate: bool = True,
+        featured: Optional[List[FakeProduct]] = None, nav: str = "",
+    ) -> web.Response:
+        """Serve a page of products, with latency, failure injection and pagination."""
+        stats = app["stats"]
+        stats["requests"] += 1
+        latency = float(request.query.get("latency_ms", config.latency_ms))
+        results = int(request.query.get("results", config.results))
+        pages = int(request.query.get("pages", config.pages))
+        page = int(request.query.get("page", 1))
+        await asyncio.sleep((latency + config.rng.uniform(0, config.jitter_ms)) / 1000)
+
+        roll = config.rng.random()
+        if request.query.get("fail") == "1" or roll < config.failure_rate:
+            stats["failures"] += 1
+            return web.Response(status=500, text="Internal Server Error")
+        if roll < config.failure_rate + config.challenge_rate:
+            stats["challenges"] += 1
+            return web.Response(status=403, text=CHALLENGE_PAGE, content_type="text/html")
+
+        if paginate:
+            first = (page - 1) * results
+            products = [FakeProduct(slug, query, i) for i in range(first, first + results)] if page <= pages else []
+        else:
+            products = featured or []
+        base = f"{request.scheme}://{request.host}/{slug}"
+        html = STORES[slug][2](base, products).replace("<body>", f"<body>{nav}", 1)
+        if paginate and page < pages:
+            next_url = f"{request.path}?{urlencode({**request.query, 'page': page + 1})}"
+            html = html.replace("</body>", f'<a rel="next" href="{escape(next_url)}">Page suivante</a></body>')
+        return web.Response(text=html, content_type="text/html")
+
+    def search_handler(slug: str):
+        param = STORES[slug][1]
+
+        async def handler(request: web.Request) -> web.Response:
+            return await listing(request, slug, request.query.get(param, ""))
+
+        return handler
+
+    def category_handler(slug: str):
+        root = f"/{slug}/rayons"
+
+        def index(name: Optional[str], count: int) -> int:
+            if not (name or "").isdigit() or int(name) >= count:
+                raise web.HTTPNotFound()
+            return int(name)
+
+        async def handler(request: web.Request) -> web.Response:
+            if "category" not in request.match_info:
+                links = [(f"{root}/{c}", f"Rayon {c + 1}") for c in range(config.categories)]
+                return await listing(request, slug, "", paginate=False, nav=_category_links(links))
+
+            category = index(request.match_info["category"], config.categories)
+            if "subcategory" not in request.match_info:
+                links = [(f"{root}/{category}/{s}", f"Rayon {category + 1}.{s + 1}") for s in range(config.subcategories)]
+                featured = [
+                    FakeProduct(slug, f"rayon {category + 1}.{s + 1}", i)
+                    for s in range(config.subcategories)
+                    for i in range(FEATURED)
+                ]
+                return await listing(request, slug, "", paginate=False, featured=featured, nav=_category_links(links))
+
+            subcategory = index(request.match_info["subcategory"], config.subcategories)
+            return await listing(request, slug, f"rayon {category + 1}.{subcategory + 1}")
+
+        return handler
+
+    async def stats(request: web.Request) -> web.Response:
+        return web.json_response({**app["stats"], "config": config.to_dict()})
+
+    for slug, (path, _, _) in STORES.items():
+        app.router.add_get(f"/{slug}{path}", search_handler(slug))
+        app.router.add_get(f"/{slug}/rayons", category_handler(slug))
+        app.router.add_get(f"/{slug}/rayons/{{category}}", category_handler(slug))
+        app.router.add_get(f"/{slug}/rayons/{{category}}/{{subcategory}}", category_handler(slug))
+        app.router.add_get(f"/{slug}/img/{{name}}", pixel)
+    app.router.add_get("/stats", stats)
+    return app
+
+
+class FakeStoreServer:
+    """Running fake store server."""
+
+    def __init__(self, runner: web.AppRunner, base_url: str):
+        self.runner = runner
+        self.base_url = base_url
+
+    @property
+    def stats(self) -> Dict:
+        """Requests, failures and challenges served so far."""
+        return dict(self.runner.app["stats"])
+
+    async def stop(self) -> None:
+        await self.runner.cleanup()
+
+
+async def start_fake_store(
+    config: Optional[FakeStoreConfig] = None, host: str = "127.0.0.1", port: int = 0
+) -> FakeStoreServer:
+    """
+    Start the fake store server on the running event loop.
+
+    Args:
+        config: Server behaviour (default: FakeStoreConfig())
+        host: Interface to bind
+        port: Port to bind, 0 for a free one
+
+    Returns:
+        Started FakeStoreServer
+    """
+    runner = web.AppRunner(create_app(config or FakeStoreConfig()), access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, host, port)
+    await site.start()
+    server = FakeStoreServer(runner, f"http://{host}:{runner.addresses[0][1]}")
+    logger.info(f"Fake store listening on {server.base_url}")
+    return server
+
+
+@contextmanager
+def point_at_fake_store(scraper, base_url: str) -> Iterator[None]:
+    """
+    Redirect a scraper instance to the fake store inside the block.
+
+    Its selector statistics are kept in memory, so fake-store markup does not
+    change the order learned on the real stores. Leclerc waits for rendered
+    products instead of its fixed delay, and its cookie file is written to a
+    temporary directory removed when the block exits.
+
+    Args:
+        scraper: Carrefour, Intermarché or Leclerc scraper
+        base_url: Fake store base URL, e.g. http://127.0.0.1:8765
+    """
+    slug = STORE_SLUGS[scraper.store_name]
+    path = STORES[slug][0]
+    scraper.BASE_URL = f"{base_url}/{slug}"
+    scraper.SEARCH_URL = f"{base_url}/{slug}{path}"
+    scraper.CATEGORY_URL = f"{base_url}/{slug}/rayons"
+    scraper.selector_stats = SelectorStats(None)
+    if hasattr(scraper, "FIXED_WAIT"):
+        scraper.FIXED_WAIT = None
+
+    with tempfile.TemporaryDirectory(prefix="fake-store-") as directory:
+        if hasattr(scraper, "session"):
+            # Leclerc refuses to search without usable cookies
+            host = base_url.split("://", 1)[1].split(":")[0]
+            cookies = [{"name": "fake_session", "value": "1", "domain": host, "path": "/"}]
+            cookie_file = Path(directory) / "cookies.json"
+            cookie_file.write_text(json.dumps(cookies))
+            scraper.session = SessionManager([cookie_file])
+        yield
+
+
+async def _serve(config: FakeStoreConfig, host: str, port: int) -> None:
+    server = await start_fake_store(config, host, port)
+    print(f"🏪 Fake store running on {server.base_url}")
+    for slug, (path, param, _) in STORES.items():
+        print(f"   {server.base_url}/{slug}{path}?{param}=poulet")
+        print(f"   {server.base_url}/{slug}/rayons")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await server.stop()
+
+
+def main():
+    """Run the fake store server."""
+    parser = argparse.ArgumentParser(description="Fake supermarket search server")
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to bind (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8765, help="Port (default: 8765)")
+    parser.add_argument("--latency", type=float, default=100.0, help="Base latency in ms (default: 100)")
+    parser.add_argument("--jitter", type=float, default=50.0, help="Random extra latency in ms (default: 50)")
+    parser.add_argument("--results", type=int, default=24, help="Products per page (default: 24)")
+    parser.add_argument("--pages", type=int, default=1, help="Result pages per query (default: 1)")
+    parser.add_argument("--categories", type=int, default=4, help="Top-level catalog categories (default: 4)")
+    parser.add_argument("--subcategories", type=int, default=3, help="Sub-categories per category (default: 3)")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="Probability of HTTP 500")
+    parser.add_argument("--challenge-rate", type=float, default=0.0, help="Probability of a challenge page")
+    parser.add_argument("--image-latency", type=float, default=0.0, help="Delay per product image in ms (default: 0)")
+    parser.add_argument("--seed", type=int, help="Random seed")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    config = FakeStoreConfig(
+        args.latency, args.jitter, args.results, args.failure_rate, args.challenge_rate, args.seed, args.pages,
+        args.categories, args.subcategories, args.image_latency,
+    )
+    try:
+        asyncio.run(_serve(config, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""Latency saved by field projection, against the local fake-store server.
+
+Scrapes each store with every field, then without each optional field in
+turn, then with name and price only, and reports the median scrape and
+extraction times and the difference with the full scrape:
+
+    python -m benchmarks.fields_bench -n 10 --image-latency 20
+    python -m benchmarks.fields_bench --store carrefour --results 48
+
+Searches run one at a time without cache, on a warm browser pool.
+"""
+
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+import argparse
+import asyncio
+import json
+import logging
+import statistics
+import sys
+import time
+from scrapers import BrowserPool, registry
+from scrapers.fields import BASE_FIELDS, PRODUCT_FIELDS, parse_fields
+from scrapers.phases import record_phases
+from benchmarks.e2e_bench import git_revision
+from benchmarks.fake_store import FakeStoreConfig, point_at_fake_store, start_fake_store
+
+RESULTS_DIR = Path(__file__).parent / "results"
+
+# Fields a search can leave out (unit_label comes with unit_price)
+OPTIONAL_FIELDS = [f for f in PRODUCT_FIELDS if f not in BASE_FIELDS and f not in ("category", "unit_label")]
+
+
+def cases() -> List[Dict]:
+    """Field selections measured: all, all but one optional field, base fields only."""
+    selections = [{"case": "all", "fields": None}]
+    for field in OPTIONAL_FIELDS:
+        selections.append({"case": f"-{field}", "fields": [f for f in OPTIONAL_FIELDS if f != field]})
+    selections.append({"case": "name,price", "fields": ["name", "price"]})
+    return selections
+
+
+async def run_case(scraper, fields: Optional[List[str]], runs: int, max_results: int) -> Dict:
+    """Scrape runs unique queries with a field selection."""
+    totals: List[float] = []
+    extracts: List[float] = []
+    products = 0
+    for i in range(runs):
+        query = f"produit {i}-{time.monotonic_ns()}"
+        with record_phases() as timings:
+            start = time.perf_counter()
+            result = await scraper.search_with_cache(query, max_results, parse_fields(fields))
+            totals.append(time.perf_counter() - start)
+        extracts.append(timings.get("extract", 0.0))
+        products += len(result)
+    return {
+        "median_ms": statistics.median(totals) * 1000,
+        "extract_ms": statistics.median(extracts) * 1000,
+        "products": products,
+    }
+
+
+async def main():
+    """Run the field projection benchmark."""
+    parser = argparse.ArgumentParser(description="Field projection benchmark")
+    parser.add_argument("-s", "--store", action="append", help="Store to scrape (repeatable, default: all)")
+    parser.add_argument("-n", "--runs", type=int, default=8, help="Searches per case and store (default: 8)")
+    parser.add_argument("--max-results", type=int, default=24, help="Products per search (default: 24)")
+    parser.add_argument("--results", type=int, default=24, help="Fake store products per page (default: 24)")
+    parser.add_argument("--latency", type=float, default=50.0, help="Fake store page latency in ms (default: 50)")
+    parser.add_argument("--image-latency", type=float, default=10.0, help="Fake store image latency in ms (default: 10)")
+    parser.add_argument("-o", "--output", help="Output JSON path (default: benchmarks/results/fields-<time>.json)")
+    parser.add_argument("-v", "--verbose", action="store_true", help="Enable verbose logging")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.ERROR)
+    config = FakeStoreConfig(
+        latency_ms=args.latency, jitter_ms=0.0, results=args.results, image_latency_ms=args.image_latency
+    )
+    server = await start_fake_store(config)
+    pool = BrowserPool()
+    results = []
+    try:
+        for name in registry.resolve(args.store) if args.store else registry.available():
+            scraper = registry.create(name, browser_pool=pool)
+            with point_at_fake_store(scraper, server.base_url):
+                await run_case(scraper, None, 1, args.max_results)  # warm up the browser and session
+                print(f"\n🏪 {scraper.store_name}")
+                baseline = None
+                for case in cases():
+                    entry = {"store": scraper.store_name, **case}
+                    entry.update(await run_case(scraper, case["fields"], args.runs, args.max_results))
+                    if baseline is None:
+                        baseline = entry
+                    entry["saved_ms"] = baseline["median_ms"] - entry["median_ms"]
+                    entry["extract_saved_ms"] = baseline["extract_ms"] - entry["extract_ms"]
+                    results.append(entry)
+                    print(
+                        f"  {entry['case']:<12} median {entry['median_ms']:7.1f} ms   "
+                        f"extract {entry['extract_ms']:6.1f} ms   saved {entry['saved_ms']:6.1f} ms "
+                        f"(extract {entry['extract_saved_ms']:5.1f} ms)"
+                    )
+    finally:
+        await pool.close()
+        await server.stop()
+
+    report = {
+        "benchmark": "fields",
+        "timestamp": datetime.now().isoformat(),
+        "git_revision": git_revision(),
+        "python": sys.version.split()[0],
+        "runs": args.runs,
+        "max_results": args.max_results,
+        "fake_store": config.to_dict(),
+        "cases": results,
+    }
+    output = Path(args.output) if args.output else RESULTS_DIR / f"fields-{datetime.now():%Y%m%d-%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+    print(f"\n💾 Results saved to: {output}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
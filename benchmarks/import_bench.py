@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""Import-time benchmark for the package's entry points.
+
+Imports each target in a fresh interpreter several times and reports the
+median wall time, the slowest modules (from ``python -X importtime``) and
+whether Playwright was loaded:
+
+    python -m benchmarks.import_bench -r 10
+    python -m benchmarks.import_bench -t price_comparator -t scrapers
+"""
+
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+from benchmarks.e2e_bench import git_revision
+
+RESULTS_DIR = Path(__file__).parent / "results"
+
+# Name -> statement run in a fresh interpreter
+TARGETS = {
+    "scrapers": "import scrapers",
+    "price_comparator": "import price_comparator",
+    "api_server": "import api_server",
+    "compare --help": "import sys; sys.argv = ['compare.py', '--help']; import runpy; runpy.run_path('compare.py', run_name='__main__')",
+}
+
+PROBE = "; import sys as _s; print('PLAYWRIGHT=' + str(any(m.startswith('playwright') for m in _s.modules)))"
+
+
+def _run(statement: str, importtime: bool = False) -> subprocess.CompletedProcess:
+    command = [sys.executable]
+    if importtime:
+        command += ["-X", "importtime"]
+    command += ["-c", f"try:\n    {statement}\nexcept SystemExit:\n    pass\n{PROBE.lstrip('; ')}"]
+    return subprocess.run(command, capture_output=True, text=True)
+
+
+def slowest_modules(stderr: str, top: int) -> List[Dict]:
+    """Parse -X importtime output into the modules with the largest cumulative time."""
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, name = [part.strip() for part in line.split(":", 1)[1].split("|")]
+        modules.append({"module": name, "self_ms": int(self_us) / 1000, "cumulative_ms": int(cumulative_us) / 1000})
+    return sorted(modules, key=lambda m: m["self_ms"], reverse=True)[:top]
+
+
+def bench_target(name: str, statement: str, runs: int, top: int) -> Dict:
+    """Time one target over several fresh interpreters."""
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = _run(statement)
+        timings.append(time.perf_counter() - start)
+        if result.returncode != 0:
+            raise RuntimeError(f"{name} failed:\n{result.stderr}")
+    traced = _run(statement, importtime=True)
+    return {
+        "target": name,
+        "runs": runs,
+        "median_ms": statistics.median(timings) * 1000,
+        "min_ms": min(timings) * 1000,
+        "loads_playwright": "PLAYWRIGHT=True" in traced.stdout,
+        "slowest_modules": slowest_modules(traced.stderr, top),
+    }
+
+
+def main():
+    """Run the import-time benchmark."""
+    parser = argparse.ArgumentParser(description="Import-time benchmark")
+    parser.add_argument("-t", "--target", action="append", choices=list(TARGETS), help="Target (repeatable, default: all)")
+    parser.add_argument("-r", "--runs", type=int, default=5, help="Interpreter runs per target (default: 5)")
+    parser.add_argument("--top", type=int, default=5, help="Slowest modules listed per target (default: 5)")
+    parser.add_argument("-o", "--output", help="Output JSON path (default: benchmarks/results/import-<time>.json)")
+    args = parser.parse_args()
+
+    results = []
+    for name in args.target or list(TARGETS):
+        entry = bench_target(name, TARGETS[name], args.runs, args.top)
+        results.append(entry)
+        playwright = "⚠️  loads Playwright" if entry["loads_playwright"] else "✅ no Playwright"
+        print(f"{name:<18} median {entry['median_ms']:7.1f} ms   min {entry['min_ms']:7.1f} ms   {playwright}")
+        for module in entry["slowest_modules"]:
+            print(f"   {module['self_ms']:7.1f} ms  {module['module']}")
+
+    report = {
+        "benchmark": "import",
+        "timestamp": datetime.now().isoformat(),
+        "git_revision": git_revision(),
+        "python": sys.version.split()[0],
+        "targets": results,
+    }
+    output = Path(args.output) if args.output else RESULTS_DIR / f"import-{datetime.now():%Y%m%d-%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+    print(f"\n💾 Results saved to: {output}")
+
+
+if __name__ == "__main__":
+    main()
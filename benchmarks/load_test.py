@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""HTTP load generator for the API server.
+
+Closed loop: a fixed number of users each send requests back to back.
+Open loop: requests arrive as a Poisson process at a fixed rate, and
+latency is measured from the scheduled arrival so server stalls are not
+hidden by a slowed-down client (coordinated omission).
+
+    # Start a stub server in-process and hammer /compare with 64 users
+    python -m benchmarks.load_test --spawn -e compare -u 64 -d 20
+
+    # Open loop at 2000 req/s against an already running server
+    python -m benchmarks.load_test --url http://127.0.0.1:9999 --rate 2000 -d 30
+"""
+
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+import argparse
+import asyncio
+import json
+import random
+import subprocess
+import sys
+import time
+import aiohttp
+from benchmarks.e2e_bench import git_revision
+from benchmarks.stats import summarize
+
+RESULTS_DIR = Path(__file__).parent / "results"
+
+ENDPOINTS = {
+    "search": ("/search", "max_results"),
+    "compare": ("/compare", "max_per_store"),
+}
+
+
+class LoadResult:
+    """Latencies and outcomes collected during a run."""
+
+    def __init__(self):
+        self.latencies: List[float] = []
+        self.statuses: Counter = Counter()
+        self.errors = 0
+        self.dropped = 0
+
+    def to_dict(self, wall: float) -> Dict:
+        completed = len(self.latencies)
+        return {
+            "requests": completed + self.errors,
+            "errors": self.errors,
+            "dropped": self.dropped,
+            "statuses": {str(k): v for k, v in sorted(self.statuses.items())},
+            "wall_seconds": wall,
+            "throughput_rps": completed / wall if wall else 0.0,
+            "latency": summarize(self.latencies),
+        }
+
+
+async def _request(
+    session: aiohttp.ClientSession, url: str, params: Dict, result: LoadResult, start: float
+) -> None:
+    try:
+        async with session.get(url, params=params) as response:
+            await response.read()
+            result.statuses[response.status] += 1
+    except (aiohttp.ClientError, asyncio.TimeoutError):
+        result.errors += 1
+        return
+    result.latencies.append(time.perf_counter() - start)
+
+
+def _params(args: argparse.Namespace, rng: random.Random) -> Dict:
+    limit_param = ENDPOINTS[args.endpoint][1]
+    return {"q": f"produit {rng.randrange(args.queries)}", limit_param: args.max_results}
+
+
+async def closed_loop(session: aiohttp.ClientSession, args: argparse.Namespace, result: LoadResult) -> None:
+    """Each of args.users sends requests back to back until the deadline."""
+    url = args.url + ENDPOINTS[args.endpoint][0]
+    deadline = time.perf_counter() + args.duration
+
+    async def user(seed: int) -> None:
+        rng = random.Random(seed)
+        while time.perf_counter() < deadline:
+            await _request(session, url, _params(args, rng), result, time.perf_counter())
+
+    await asyncio.gather(*(user(i) for i in range(args.users)))
+
+
+async def open_loop(session: aiohttp.ClientSession, args: argparse.Namespace, result: LoadResult) -> None:
+    """Send requests at Poisson arrivals of args.rate per second until the deadline."""
+    url = args.url + ENDPOINTS[args.endpoint][0]
+    rng = random.Random(0)
+    in_flight = set()
+    start = time.perf_counter()
+    scheduled = start
+
+    while scheduled < start + args.duration:
+        scheduled += rng.expovariate(args.rate)
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if len(in_flight) >= args.max_in_flight:
+            result.dropped += 1
+            continue
+        task = asyncio.create_task(_request(session, url, _params(args, rng), result, scheduled))
+        in_flight.add(task)
+        task.add_done_callback(in_flight.discard)
+
+    if in_flight:
+        await asyncio.wait(in_flight)
+
+
+async def wait_healthy(url: str, timeout: float = 30.0) -> None:
+    """Poll /health until the server answers."""
+    deadline = time.monotonic() + timeout
+    async with aiohttp.ClientSession() as session:
+        while True:
+            try:
+                async with session.get(f"{url}/health") as response:
+                    if response.status == 200:
+                        return
+            except aiohttp.ClientError:
+                pass
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"API server at {url} did not become healthy")
+            await asyncio.sleep(0.2)
+
+
+def spawn_stub_server(args: argparse.Namespace) -> subprocess.Popen:
+    """Start benchmarks.stub_server in a subprocess."""
+    port = args.url.rsplit(":", 1)[1].split("/")[0]
+    command = [
+        sys.executable, "-m", "benchmarks.stub_server",
+        "--port", port,
+        "--delay-ms", str(args.delay_ms),
+        "--products", str(args.products),
+    ]
+    if args.no_cache:
+        command.append("--no-cache")
+    return subprocess.Popen(command)
+
+
+async def run(args: argparse.Namespace) -> Dict:
+    """Warm up, run the load and return the report."""
+    await wait_healthy(args.url)
+    connector = aiohttp.TCPConnector(limit=0)
+    timeout = aiohttp.ClientTimeout(total=args.timeout)
+    async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+        if args.warmup:
+            warmup = argparse.Namespace(**{**vars(args), "duration": args.warmup})
+            await closed_loop(session, warmup, LoadResult())
+
+        result = LoadResult()
+        start = time.perf_counter()
+        if args.rate:
+            await open_loop(session, args, result)
+        else:
+            await closed_loop(session, args, result)
+        wall = time.perf_counter() - start
+
+    return {
+        "benchmark": "load",
+        "timestamp": datetime.now().isoformat(),
+        "git_revision": git_revision(),
+        "url": args.url,
+        "endpoint": args.endpoint,
+        "mode": "open" if args.rate else "closed",
+        "users": None if args.rate else args.users,
+        "rate": args.rate,
+        "queries": args.queries,
+        "max_results": args.max_results,
+        **result.to_dict(wall),
+    }
+
+
+def print_report(report: Dict) -> None:
+    lat = report["latency"]
+    load = f"{report['rate']:g} req/s offered" if report["rate"] else f"{report['users']} users"
+    print(f"\n{report['endpoint']} ({report['mode']} loop, {load})")
+    print(f"   throughput {report['throughput_rps']:9.1f} req/s   requests {report['requests']}")
+    print(
+        f"   p50 {lat['p50'] * 1000:7.2f} ms   p95 {lat['p95'] * 1000:7.2f} ms   "
+        f"p99 {lat['p99'] * 1000:7.2f} ms   max {lat['max'] * 1000:7.2f} ms"
+    )
+    print(f"   statuses {report['statuses']}   errors {report['errors']}   dropped {report['dropped']}")
+
+
+def main():
+    """Run the load test."""
+    parser = argparse.ArgumentParser(description="API server load generator")
+    parser.add_argument("--url", default="http://127.0.0.1:9999", help="API base URL (default: http://127.0.0.1:9999)")
+    parser.add_argument("-e", "--endpoint", choices=list(ENDPOINTS), default="search")
+    parser.add_argument("-u", "--users", type=int, default=32, help="Closed-loop concurrent users (default: 32)")
+    parser.add_argument("-r", "--rate", type=float, help="Open-loop arrival rate in req/s (enables open loop)")
+    parser.add_argument("-d", "--duration", type=float, default=10.0, help="Seconds of load (default: 10)")
+    parser.add_argument("--warmup", type=float, default=2.0, help="Warm-up seconds, not measured (default: 2)")
+    parser.add_argument("-q", "--queries", type=int, default=100, help="Distinct queries to cycle through (default: 100)")
+    parser.add_argument("-n", "--max-results", type=int, default=10, help="Results per store (default: 10)")
+    parser.add_argument("--max-in-flight", type=int, default=10000, help="Open-loop cap before dropping arrivals")
+    parser.add_argument("--timeout", type=float, default=30.0, help="Per-request timeout in seconds (default: 30)")
+    parser.add_argument("--spawn", action="store_true", help="Start benchmarks.stub_server for the run")
+    parser.add_argument("--delay-ms", type=float, default=0.0, help="Stub scrape time with --spawn (default: 0)")
+    parser.add_argument("--products", type=int, default=10, help="Stub products per store with --spawn")
+    parser.add_argument("--no-cache", action="store_true", help="Stub server bypasses the cache with --spawn")
+    parser.add_argument("-o", "--output", help="Output JSON path (default: benchmarks/results/load-<time>.json)")
+    args = parser.parse_args()
+    args.url = args.url.rstrip("/")
+
+    server: Optional[subprocess.Popen] = spawn_stub_server(args) if args.spawn else None
+    try:
+        report = asyncio.run(run(args))
+    finally:
+        if server:
+            server.terminate()
+            server.wait()
+
+    print_report(report)
+    output = Path(args.output) if args.output else RESULTS_DIR / f"load-{datetime.now():%Y%m%d-%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+    print(f"\n💾 Results saved to: {output}")
+
+
+if __name__ == "__main__":
+    main()
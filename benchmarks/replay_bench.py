@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""Record live searches once, then replay them offline and time every phase.
+
+    # Record (needs network, cookies for Leclerc)
+    python -m benchmarks.replay_bench record -q poulet -q lait --dir cassettes/
+
+    # Replay with no network, 5 runs each, save the report
+    python -m benchmarks.replay_bench replay --dir cassettes/ -r 5 -o replay.json
+
+Replay reports per-phase timings and checks that the parsed products still
+match the recorded ones, so parser changes can be checked for regressions
+and performance changes against the same inputs.
+"""
+
+from typing import Dict, List
+import argparse
+import asyncio
+import json
+import logging
+import sys
+import time
+from scrapers import BrowserPool, CarrefourScraper, IntermarcheScraper, LeclercScraper
+from scrapers.phases import record_phases
+from scrapers.replay import Cassette, RECORD, REPLAY
+from scrapers.selector_stats import SelectorStats
+from benchmarks.stats import summarize
+
+SCRAPERS = {
+    "carrefour": CarrefourScraper,
+    "intermarche": IntermarcheScraper,
+    "leclerc": LeclercScraper,
+}
+
+
+# Memory only, so benchmark runs do not change the order learned in production
+SELECTOR_STATS = SelectorStats(None)
+
+
+def _by_store_name() -> Dict[str, type]:
+    return {cls(selector_stats=SELECTOR_STATS).store_name: cls for cls in SCRAPERS.values()}
+
+
+async def record(directory: str, queries: List[str], stores: List[str], max_results: int) -> None:
+    """Run live searches and save them to the cassette directory."""
+    cassette = Cassette(directory, RECORD)
+    for store in stores:
+        for query in queries:
+            scraper = SCRAPERS[store](selector_stats=SELECTOR_STATS)
+            scraper.cassette = cassette
+            products = await scraper.search(query, max_results)
+            cassette.save_products(scraper.store_name, query, products)
+            print(f"📼 {scraper.store_name} '{query}': recorded {len(products)} products")
+
+
+def _matches(products: List, expected: List[Dict]) -> bool:
+    """Whether replayed products equal the recorded ones (name and price)."""
+    return [(p.name, p.price) for p in products] == [(e["name"], e["price"]) for e in expected]
+
+
+async def replay(directory: str, runs: int, max_results: int) -> List[Dict]:
+    """Replay every recording and collect timings."""
+    cassette = Cassette(directory, REPLAY)
+    classes = _by_store_name()
+    # A warm browser keeps launch cost out of the per-phase numbers
+    pool = BrowserPool()
+    try:
+        return [
+            await replay_recording(cassette, classes[recording["store"]], pool, recording, runs, max_results)
+            for recording in cassette.recordings()
+        ]
+    finally:
+        await pool.close()
+
+
+async def replay_recording(
+    cassette: Cassette, scraper_class: type, pool: BrowserPool, recording: Dict, runs: int, max_results: int
+) -> Dict:
+    """Replay one recording several times and summarize its timings."""
+    store, query = recording["store"], recording["query"]
+    totals = []
+    phases: Dict[str, List[float]] = {}
+    regressions = 0
+
+    for _ in range(runs):
+        scraper = scraper_class(browser_pool=pool, selector_stats=SELECTOR_STATS)
+        scraper.cassette = cassette
+        with record_phases() as timings:
+            start = time.perf_counter()
+            products = await scraper.search(query, max_results)
+            totals.append(time.perf_counter() - start)
+        for name, duration in timings.items():
+            phases.setdefault(name, []).append(duration)
+        if not _matches(products, recording["products"]):
+            regressions += 1
+
+    return {
+        "store": store,
+        "query": query,
+        "runs": runs,
+        "expected_products": len(recording["products"]),
+        "regressions": regressions,
+        "total": summarize(totals),
+        "phases": {name: summarize(values) for name, values in phases.items()},
+    }
+
+
+def print_report(report: List[Dict]) -> None:
+    """Pretty print replay timings."""
+    for entry in report:
+        status = "✅" if entry["regressions"] == 0 else f"❌ {entry['regressions']} mismatching runs"
+        print(f"\n{entry['store']} '{entry['query']}' ({entry['runs']} runs) {status}")
+        print(f"   total   p50 {entry['total']['p50'] * 1000:8.1f} ms   p95 {entry['total']['p95'] * 1000:8.1f} ms")
+        for name, stats in entry["phases"].items():
+            print(f"   {name:<7} p50 {stats['p50'] * 1000:8.1f} ms   p95 {stats['p95'] * 1000:8.1f} ms")
+
+
+async def main():
+    """Run the record/replay benchmark."""
+    parser = argparse.ArgumentParser(description="Record/replay scraper benchmark")
+    parser.add_argument("mode", choices=[RECORD, REPLAY])
+    parser.add_argument("--dir", default="cassettes", help="Recording directory (default: cassettes)")
+    parser.add_argument("-q", "--query", action="append", default=[], help="Query to record (repeatable)")
+    parser.add_argument(
+        "-s", "--stores",
+        default=",".join(SCRAPERS),
+        help="Comma-separated stores to record (default: all)"
+    )
+    parser.add_argument("-n", "--max-results", type=int, default=10, help="Results per search (default: 10)")
+    parser.add_argument("-r", "--runs", type=int, default=3, help="Replay runs per recording (default: 3)")
+    parser.add_argument("-o", "--output", help="Write the replay report as JSON")
+    parser.add_argument("-v", "--verbose", action="store_true", help="Enable verbose logging")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING)
+
+    if args.mode == RECORD:
+        stores = [s.strip() for s in args.stores.split(",") if s.strip()]
+        unknown = [s for s in stores if s not in SCRAPERS]
+        if unknown or not args.query:
+            parser.error(f"record needs -q and known stores (unknown: {', '.join(unknown)})")
+        await record(args.dir, args.query, stores, args.max_results)
+        return
+
+    report = await replay(args.dir, args.runs, args.max_results)
+    if not report:
+        print(f"❌ No recordings found in {args.dir}")
+        sys.exit(1)
+    print_report(report)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"\n💾 Report saved to: {args.output}")
+    if any(entry["regressions"] for entry in report):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,38 @@
+"""Small statistics helpers shared by the benchmarks."""
+
+from typing import Dict, List
+import math
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """
+    Return the pct-th percentile (0-100) using linear interpolation.
+
+    Args:
+        values: Samples (need not be sorted)
+        pct: Percentile to compute
+
+    Returns:
+        Percentile value, or 0.0 for an empty list
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * pct / 100
+    low = math.floor(rank)
+    high = math.ceil(rank)
+    if low == high:
+        return ordered[low]
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def summarize(values: List[float]) -> Dict[str, float]:
+    """Summarize latency samples in seconds (count, mean, p50/p95/p99, max)."""
+    return {
+        "count": len(values),
+        "mean": sum(values) / len(values) if values else 0.0,
+        "p50": percentile(values, 50),
+        "p95": percentile(values, 95),
+        "p99": percentile(values, 99),
+        "max": max(values) if values else 0.0,
+    }
@@ -0,0 +1,101 @@
+"""Browserless scrapers returning synthetic products after a configurable delay.
+
+Used to load-test the API server without paying for real scrapes: the
+scrape itself becomes an ``asyncio.sleep`` so what remains is routing,
+caching, serialization and ``find_best_price``.
+"""
+
+from functools import lru_cache
+from typing import List, Optional, Tuple
+import asyncio
+import random
+from scrapers.base import BaseScraper, Product
+from benchmarks.fake_store import FakeProduct
+
+DEFAULT_STORES = ["Leclerc", "Carrefour", "Intermarché"]
+
+
+@lru_cache(maxsize=4096)
+def _catalog(store: str, query: str, count: int) -> Tuple[FakeProduct, ...]:
+    return tuple(FakeProduct(store, query, i) for i in range(count))
+
+
+class StubScraper(BaseScraper):
+    """Scraper that sleeps, then returns deterministic synthetic products."""
+
+    def __init__(
+        self,
+        name: str,
+        cache_client=None,
+        delay_ms: float = 0.0,
+        jitter_ms: float = 0.0,
+        products: int = 10,
+        failure_rate: float = 0.0,
+        seed: Optional[int] = None,
+        **kwargs,
+    ):
+        """
+        Initialize stub scraper.
+
+        Args:
+            name: Store name reported by the scraper and its products
+            cache_client: Cache client (optional)
+            delay_ms: Simulated scrape duration
+            jitter_ms: Uniform random extra duration
+            products: Products available per query
+            failure_rate: Probability that a search raises
+            seed: Seed for delay and failure randomness (optional)
+            **kwargs: Passed to BaseScraper (sinks, cache_ttl, ...)
+        """
+        super().__init__(cache_client, **kwargs)
+        self.name = name
+        self.delay_ms = delay_ms
+        self.jitter_ms = jitter_ms
+        self.products = products
+        self.failure_rate = failure_rate
+        self.rng = random.Random(seed)
+        self.searches = 0
+
+    @property
+    def store_name(self) -> str:
+        return self.name
+
+    async def search(self, query: str, max_results: int = 10) -> List[Product]:
+        self.searches += 1
+        delay = self.delay_ms + self.rng.uniform(0, self.jitter_ms)
+        if delay > 0:
+            await asyncio.sleep(delay / 1000)
+        if self.rng.random() < self.failure_rate:
+            raise RuntimeError(f"{self.name}: injected failure")
+
+        slug = self.name.lower()
+        return [
+            Product(
+                name=p.name,
+                price=p.euros + p.cents / 100,
+                unit="pièce",
+                store=self.name,
+                url=f"https://stub.invalid/{slug}/{p.id}",
+                brand=p.brand,
+                unit_price=float(p.unit_price.replace(",", ".")),
+                unit_label=f"€/{p.unit}",
+            )
+            for p in _catalog(self.name, query, self.products)[:max_results]
+        ]
+
+
+def make_stub_scrapers(
+    cache_client=None, stores: Optional[List[str]] = None, **options
+) -> List[StubScraper]:
+    """
+    Build one StubScraper per store.
+
+    Args:
+        cache_client: Cache client shared by the scrapers (optional)
+        stores: Store names (default: Leclerc, Carrefour, Intermarché)
+        **options: StubScraper keyword arguments (delay_ms, products, ...)
+
+    Returns:
+        List of StubScraper
+    """
+    return [StubScraper(name, cache_client, **options) for name in stores or DEFAULT_STORES]
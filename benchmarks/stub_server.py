@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""Run api_server.app with stub scrapers for load testing.
+
+    python -m benchmarks.stub_server --port 9999 --delay-ms 50 --products 20
+    python -m benchmarks.stub_server --no-cache      # every request "scrapes"
+
+Job workers, cache pre-warming, price history and the local catalog are off
+unless asked for, so the server measures request handling only.
+"""
+
+import argparse
+import logging
+import os
+
+
+def configure(args: argparse.Namespace) -> None:
+    """Set api_server environment before it is imported."""
+    os.environ.setdefault("PRICE_API_JOB_WORKERS", "0")
+    os.environ.setdefault("PRICE_API_PREWARM", "1" if args.prewarm else "0")
+    os.environ.setdefault("SCRAPER_SELECTOR_STATS", "")
+    if not args.sinks:
+        os.environ.setdefault("PRICE_API_HISTORY_DB", "")
+        os.environ.setdefault("PRICE_API_CATALOG_DB", "")
+
+
+def main():
+    """Start the API server with stub scrapers."""
+    parser = argparse.ArgumentParser(description="API server with stub scrapers")
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to bind (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=9999, help="Port (default: 9999)")
+    parser.add_argument("--delay-ms", type=float, default=0.0, help="Simulated scrape time (default: 0)")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="Random extra scrape time (default: 0)")
+    parser.add_argument("--products", type=int, default=10, help="Products per store and query (default: 10)")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="Probability a store search fails")
+    parser.add_argument("--stores", default="Leclerc,Carrefour,Intermarché", help="Comma-separated store names")
+    parser.add_argument("--no-cache", action="store_true", help="Bypass the result cache")
+    parser.add_argument("--sinks", action="store_true", help="Keep price history and catalog writes enabled")
+    parser.add_argument("--prewarm", action="store_true", help="Keep the cache pre-warmer running")
+    parser.add_argument("-v", "--verbose", action="store_true", help="Enable verbose logging")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING)
+    configure(args)
+
+    import uvicorn
+    import api_server
+    from benchmarks.stub_scrapers import make_stub_scrapers
+
+    stores = [s.strip() for s in args.stores.split(",") if s.strip()]
+    options = {
+        "stores": stores,
+        "delay_ms": args.delay_ms,
+        "jitter_ms": args.jitter_ms,
+        "products": args.products,
+        "failure_rate": args.failure_rate,
+    }
+    api_server.SCRAPER_FACTORY = lambda cache_client: make_stub_scrapers(
+        None if args.no_cache else cache_client, **options
+    )
+
+    print(f"🧪 API server with {len(stores)} stub stores on http://{args.host}:{args.port}")
+    uvicorn.run(
+        api_server.app,
+        host=args.host,
+        port=args.port,
+        log_level="info" if args.verbose else "warning",
+        access_log=args.verbose,
+    )
+
+
+if __name__ == "__main__":
+    main()
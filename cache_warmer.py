@@ -0,0 +1,284 @@
+"""Popularity-driven cache pre-warming.
+
+Tracks query frequency with a decaying top-K sketch and re-scrapes the
+hottest queries shortly before their cache entries expire, so popular
+searches keep being served from cache.
+
+Only the scrapers the comparator has already created (stores and locations
+searched since startup) are kept warm, so pre-warming never imports a store
+on its own, and only their full-field entries: projected searches
+(?fields=...) are cached under other keys and left to expire.
+"""
+
+from datetime import datetime, time as dtime
+from typing import Dict, List, Optional, Tuple
+import asyncio
+import logging
+import math
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class DecayingTopK:
+    """Space-Saving top-K sketch with exponentially decaying counts."""
+
+    def __init__(self, capacity: int = 500, half_life: float = 3600.0):
+        """
+        Initialize sketch.
+
+        Args:
+            capacity: Number of distinct queries tracked
+            half_life: Seconds after which a hit counts for half as much
+        """
+        self.capacity = capacity
+        self.half_life = half_life
+        self._landmark = time.time()
+        self._counts: Dict[str, float] = {}
+
+    def _weight(self, now: float) -> float:
+        """Forward-decay weight of a hit at time now."""
+        exponent = (now - self._landmark) / self.half_life
+        if exponent > 50:
+            # Rescale before weights overflow; relative order is unchanged
+            scale = math.pow(2.0, -exponent)
+            self._counts = {q: c * scale for q, c in self._counts.items()}
+            self._landmark = now
+            exponent = 0.0
+        return math.pow(2.0, exponent)
+
+    def add(self, query: str, now: Optional[float] = None) -> None:
+        """Record one occurrence of query."""
+        weight = self._weight(now if now is not None else time.time())
+        if query in self._counts:
+            self._counts[query] += weight
+        elif len(self._counts) < self.capacity:
+            self._counts[query] = weight
+        else:
+            # Space-Saving: the newcomer inherits the evicted minimum count
+            victim = min(self._counts, key=self._counts.get)
+            floor = self._counts.pop(victim)
+            self._counts[query] = floor + weight
+
+    def top(self, k: int, now: Optional[float] = None) -> List[Tuple[str, float]]:
+        """
+        Return the k most frequent queries.
+
+        Args:
+            k: Number of queries to return
+            now: Reference time for decayed scores (default: now)
+
+        Returns:
+            List of (query, decayed hit count) sorted by decreasing count
+        """
+        scale = 1.0 / self._weight(now if now is not None else time.time())
+        ranked = sorted(self._counts.items(), key=lambda item: item[1], reverse=True)
+        return [(q, c * scale) for q, c in ranked[:k]]
+
+
+def parse_windows(spec: Optional[str]) -> List[Tuple[dtime, dtime]]:
+    """
+    Parse off-peak windows such as ``"22:00-06:30,13:00-14:00"``.
+
+    Args:
+        spec: Comma-separated HH:MM-HH:MM ranges, empty for always
+
+    Returns:
+        List of (start, end) times; windows may wrap past midnight
+    """
+    windows = []
+    for part in (spec or "").split(","):
+        part = part.strip()
+        if not part:
+            continue
+        start, end = part.split("-")
+        windows.append((
+            datetime.strptime(start.strip(), "%H:%M").time(),
+            datetime.strptime(end.strip(), "%H:%M").time(),
+        ))
+    return windows
+
+
+class StoreBudget:
+    """Token bucket limiting pre-warm scrapes per store per hour."""
+
+    def __init__(self, per_hour: int):
+        self.per_hour = per_hour
+        self.tokens = float(per_hour)
+        self._updated = time.monotonic()
+
+    def take(self) -> bool:
+        """Consume one scrape if budget allows."""
+        now = time.monotonic()
+        self.tokens = min(self.per_hour, self.tokens + (now - self._updated) * self.per_hour / 3600)
+        self._updated = now
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
+
+
+class PrewarmScheduler:
+    """Background task re-scraping hot queries before their cache expires."""
+
+    def __init__(
+        self,
+        comparator,
+        cache,
+        top_k: int = 200,
+        lead_time: int = 300,
+        interval: float = 60.0,
+        store_budget: int = 60,
+        off_peak: Optional[str] = None,
+        max_results: int = 10,
+        concurrency: int = 2,
+    ):
+        """
+        Initialize scheduler.
+
+        Args:
+            comparator: PriceComparator whose scrapers are refreshed
+            cache: Cache client shared with the scrapers (needs ttl/exists)
+            top_k: Number of hottest queries kept warm
+            lead_time: Refresh entries expiring within this many seconds
+            interval: Seconds between scheduling passes
+            store_budget: Maximum pre-warm scrapes per store location per hour
+            off_peak: Only pre-warm inside these windows, e.g. "01:00-07:00"
+            max_results: Results scraped per store when refreshing an entry
+                that does not record how many it was scraped with
+            concurrency: Refresh scrapes running at once
+        """
+        self.comparator = comparator
+        self.cache = cache
+        self.top_k = top_k
+        self.lead_time = lead_time
+        self.interval = interval
+        self.off_peak = parse_windows(off_peak)
+        self.max_results = max_results
+        self.store_budget = store_budget
+        self.sketch = DecayingTopK(capacity=top_k * 4)
+        # Store name (store@location for other locations) -> budget, on first refresh
+        self.budgets: Dict[str, StoreBudget] = {}
+        self._slots = asyncio.Semaphore(concurrency)
+        self._warmed: Dict[str, float] = {}
+        self.stats_counters = {
+            "requests": 0,
+            "requests_served_warm": 0,
+            "store_hits_served_warm": 0,
+            "refreshes": 0,
+            "refresh_failures": 0,
+            "skipped_budget": 0,
+            "passes": 0,
+        }
+
+    def in_window(self, now: Optional[datetime] = None) -> bool:
+        """Whether pre-warming is currently allowed."""
+        if not self.off_peak:
+            return True
+        current = (now or datetime.now()).time()
+        for start, end in self.off_peak:
+            if start <= end and start <= current < end:
+                return True
+            if start > end and (current >= start or current < end):
+                return True
+        return False
+
+    async def record(self, query: str) -> bool:
+        """
+        Record an incoming query before it is served.
+
+        Args:
+            query: Search query as received by the API
+
+        Returns:
+            True if at least one store will answer from a pre-warmed entry
+        """
+        self.sketch.add(query)
+        self.stats_counters["requests"] += 1
+
+        warm_hits = 0
+        now = time.time()
+        for scraper in self.comparator.active_scrapers():
+            key = scraper._get_cache_key(query)
+            if self._warmed.get(key, 0) > now and await asyncio.to_thread(self.cache.exists, key):
+                warm_hits += 1
+
+        self.stats_counters["store_hits_served_warm"] += warm_hits
+        if warm_hits:
+            self.stats_counters["requests_served_warm"] += 1
+        return warm_hits > 0
+
+    async def run(self) -> None:
+        """Run scheduling passes until cancelled."""
+        logger.info(
+            f"Pre-warm scheduler started (top_k={self.top_k}, lead_time={self.lead_time}s)"
+        )
+        while True:
+            try:
+                if self.in_window():
+                    await self.run_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Pre-warm pass failed: {e}", exc_info=True)
+            await asyncio.sleep(self.interval)
+
+    async def run_once(self) -> int:
+        """
+        Refresh hot entries close to expiry.
+
+        Returns:
+            Number of refresh scrapes started
+        """
+        self.stats_counters["passes"] += 1
+        tasks = []
+        for query, _ in self.sketch.top(self.top_k):
+            for scraper in self.comparator.active_scrapers():
+                key = scraper._get_cache_key(query)
+                ttl = await asyncio.to_thread(self.cache.ttl, key)
+                # -2: no entry (nothing to keep warm), -1: no expiry
+                if ttl < 0 or ttl > self.lead_time:
+                    continue
+                name = f"{scraper.store_name}@{scraper.location}" if scraper.location else scraper.store_name
+                budget = self.budgets.get(name)
+                if budget is None:
+                    budget = self.budgets[name] = StoreBudget(self.store_budget)
+                if not budget.take():
+                    self.stats_counters["skipped_budget"] += 1
+                    continue
+                tasks.append(self._refresh(scraper, query, key))
+
+        if tasks:
+            await asyncio.gather(*tasks)
+        return len(tasks)
+
+    async def _refresh(self, scraper, query: str, key: str) -> None:
+        """Scrape a query for one store and rewrite its cache entry, with as many results."""
+        async with self._slots:
+            try:
+                max_results = await scraper._get_cached_max_results(query) or self.max_results
+                # Like a regular search: location tags, sinks, metrics and traces
+                products = await scraper.search_with_cache(query, max_results, force_refresh=True)
+                self._warmed[key] = time.time() + scraper.cache_ttl
+                self.stats_counters["refreshes"] += 1
+                logger.info(f"Pre-warmed {scraper.store_name} for '{query}' ({len(products)} products)")
+            except Exception as e:
+                self.stats_counters["refresh_failures"] += 1
+                logger.warning(f"Pre-warm of {scraper.store_name} for '{query}' failed: {e}")
+
+        # Forget entries that have since expired
+        now = time.time()
+        self._warmed = {k: exp for k, exp in self._warmed.items() if exp > now}
+
+    def stats(self) -> Dict:
+        """Return counters and the current hot queries."""
+        return {
+            **self.stats_counters,
+            "in_window": self.in_window(),
+            "budget_remaining": {
+                store: int(budget.tokens) for store, budget in self.budgets.items()
+            },
+            "hot_queries": [
+                {"query": q, "score": round(score, 2)} for q, score in self.sketch.top(20)
+            ],
+        }
@@ -0,0 +1,448 @@
+#!/usr/bin/env python3
+"""Full-catalog crawl of a store's category tree, resumable.
+
+Walks the category pages from the scraper's CATEGORY_URL with a bounded
+number of parallel pages, and streams every product found to a JSONL (or
+Parquet) file:
+
+    python catalog_crawler.py carrefour -c 4 --max-depth 3
+    python catalog_crawler.py carrefour --store-url http://127.0.0.1:8765  # fake store
+
+Crawl state lives in a SQLite file next to the output: the frontier of
+category pages (pending / done / failed) and the set of product URLs
+already written. Each page is checkpointed in one transaction once its
+products are written, so an interrupted crawl started again with the same
+paths resumes where it stopped. Pages in flight at the interruption are
+crawled again, which may write their products twice (at-least-once).
+"""
+
+from contextlib import ExitStack
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urldefrag, urlparse
+import argparse
+import asyncio
+import json
+import logging
+import sqlite3
+import threading
+import time
+from scrapers import BrowserPool, Product, registry
+
+logger = logging.getLogger(__name__)
+
+STATE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS pages (
+    url TEXT PRIMARY KEY,
+    label TEXT,
+    depth INTEGER NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',  -- pending, done or failed
+    products INTEGER,
+    crawled_at REAL
+);
+CREATE INDEX IF NOT EXISTS idx_pages_status ON pages(status);
+
+CREATE TABLE IF NOT EXISTS seen_products (
+    url TEXT PRIMARY KEY
+) WITHOUT ROWID;
+"""
+
+FORMATS = ("jsonl", "parquet")
+
+
+def product_id(product: Product, page_url: str) -> str:
+    """Key deduplicating products: their URL, or store/name/price without one."""
+    if product.url and product.url != page_url:
+        return urldefrag(product.url)[0]
+    return f"{product.store}:{product.name}:{product.price}"
+
+
+class CrawlState:
+    """Frontier and seen-set of a crawl, persisted in SQLite."""
+
+    def __init__(self, path: str):
+        """
+        Open (or create) the crawl state.
+
+        Args:
+            path: SQLite database file
+        """
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(STATE_SCHEMA)
+        self._lock = threading.Lock()
+
+    def add_pages(self, pages: List[Tuple[str, str, int]]) -> List[Tuple[str, str, int]]:
+        """
+        Add (url, label, depth) pages to the frontier.
+
+        Returns:
+            The pages that were not known yet
+        """
+        with self._lock, self._conn:
+            return self._add_pages(pages)
+
+    def _add_pages(self, pages: List[Tuple[str, str, int]]) -> List[Tuple[str, str, int]]:
+        added = []
+        for url, label, depth in pages:
+            cursor = self._conn.execute(
+                "INSERT OR IGNORE INTO pages (url, label, depth) VALUES (?, ?, ?)", (url, label, depth)
+            )
+            if cursor.rowcount:
+                added.append((url, label, depth))
+        return added
+
+    def pending(self) -> List[Tuple[str, str, int]]:
+        """Pages still to crawl, shallowest first."""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT url, label, depth FROM pages WHERE status = 'pending' ORDER BY depth, rowid"
+            ).fetchall()
+
+    def retry_failed(self) -> int:
+        """Put failed pages back in the frontier; returns how many."""
+        with self._lock, self._conn:
+            return self._conn.execute("UPDATE pages SET status = 'pending' WHERE status = 'failed'").rowcount
+
+    def complete_page(
+        self, url: str, products: List[Product], links: List[Tuple[str, str, int]], write
+    ) -> Tuple[List[Product], List[Tuple[str, str, int]]]:
+        """
+        Checkpoint a crawled page.
+
+        Products not seen before are passed to write(products) inside the
+        transaction, which is only committed once they are written.
+
+        Args:
+            url: Crawled page URL
+            products: Products found on the page
+            links: (url, label, depth) category links found on the page
+            write: Callable writing the new products to the output
+
+        Returns:
+            (new products, new pages)
+        """
+        with self._lock, self._conn:
+            new_products = [
+                p for p in products
+                if self._conn.execute(
+                    "INSERT OR IGNORE INTO seen_products (url) VALUES (?)", (product_id(p, url),)
+                ).rowcount
+            ]
+            new_pages = self._add_pages(links)
+            self._conn.execute(
+                "UPDATE pages SET status = 'done', products = ?, crawled_at = ? WHERE url = ?",
+                (len(new_products), time.time(), url),
+            )
+            if new_products:
+                write(new_products)
+            return new_products, new_pages
+
+    def fail_page(self, url: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE pages SET status = 'failed', crawled_at = ? WHERE url = ?", (time.time(), url)
+            )
+
+    def stats(self) -> Dict[str, int]:
+        """Page counts by status, and products written."""
+        with self._lock:
+            counts = dict(self._conn.execute("SELECT status, COUNT(*) FROM pages GROUP BY status").fetchall())
+            products = self._conn.execute("SELECT COUNT(*) FROM seen_products").fetchone()[0]
+        return {
+            "pending": counts.get("pending", 0),
+            "done": counts.get("done", 0),
+            "failed": counts.get("failed", 0),
+            "products": products,
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class JsonLinesWriter:
+    """Append products as JSON lines, flushed after every page."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "a", encoding="utf-8")
+
+    def write(self, products: List[Product]) -> None:
+        for p in products:
+            self._file.write(json.dumps(p.to_dict(), ensure_ascii=False) + "\n")
+        self._file.flush()
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class ParquetWriter:
+    """
+    Write products as Parquet part files in a directory (needs pyarrow).
+
+    Each crawled page becomes one part file, written before the page is
+    checkpointed; the directory reads as a single dataset
+    (pyarrow.dataset / pandas.read_parquet) and can be compacted afterwards.
+    """
+
+    def __init__(self, path: str):
+        """
+        Initialize writer.
+
+        Args:
+            path: Output directory; parts of a resumed crawl are numbered on
+        """
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            raise RuntimeError("Parquet output requires pyarrow (pip install pyarrow)")
+        self.directory = Path(path)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._part = len(list(self.directory.glob("part-*.parquet")))
+
+    def write(self, products: List[Product]) -> None:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        table = pa.Table.from_pylist([p.to_dict() for p in products])
+        pq.write_table(table, self.directory / f"part-{self._part:06d}.parquet")
+        self._part += 1
+
+    def close(self) -> None:
+        pass
+
+
+def open_writer(path: str, format: str = "jsonl"):
+    """Open the product output in the given format ("jsonl" or "parquet")."""
+    if format == "parquet":
+        return ParquetWriter(path)
+    if format == "jsonl":
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        return JsonLinesWriter(path)
+    raise ValueError(f"Unknown output format: {format} (expected one of {', '.join(FORMATS)})")
+
+
+class CatalogCrawler:
+    """Crawl one store's category tree with a bounded number of parallel pages."""
+
+    def __init__(
+        self,
+        scraper,
+        state: CrawlState,
+        writer,
+        concurrency: int = 4,
+        max_depth: int = 3,
+        max_pages: Optional[int] = None,
+        max_products_per_page: int = 1000,
+        sinks: Optional[List] = None,
+    ):
+        """
+        Initialize crawler.
+
+        Args:
+            scraper: Store scraper (sets CATEGORY_URL and its link selectors)
+            state: Crawl frontier and seen-set
+            writer: Product output (JsonLinesWriter or ParquetWriter)
+            concurrency: Category pages crawled in parallel
+            max_depth: Link depth followed below the root page
+            max_pages: Pages crawled by this run at most; the rest stays
+                pending for the next one (optional)
+            max_products_per_page: Products read per category listing
+            sinks: Objects with an add(query, products) method receiving new
+                products, e.g. the ProductCatalog (optional)
+        """
+        self.scraper = scraper
+        self.state = state
+        self.writer = writer
+        self.concurrency = concurrency
+        self.max_depth = max_depth
+        self.max_pages = max_pages
+        self.max_products_per_page = max_products_per_page
+        self.sinks = list(sinks or [])
+        self.pages_crawled = 0
+        self.products_written = 0
+        self._started = 0
+        self._host = None
+
+    async def run(self, root: Optional[str] = None) -> Dict:
+        """
+        Crawl until the frontier is empty or max_pages is reached.
+
+        Args:
+            root: Root category URL (default: the scraper's CATEGORY_URL);
+                ignored when resuming
+
+        Returns:
+            Crawl statistics
+        """
+        root = root or self.scraper.CATEGORY_URL
+        if not root:
+            raise ValueError(f"{self.scraper.store_name} has no CATEGORY_URL, pass a root URL")
+        await asyncio.to_thread(self.state.add_pages, [(root, None, 0)])
+        self._host = urlparse(root).netloc
+
+        queue: asyncio.Queue = asyncio.Queue()
+        for page in await asyncio.to_thread(self.state.pending):
+            queue.put_nowait(tuple(page))
+        logger.info(f"Crawling {self.scraper.store_name}: {queue.qsize()} pages pending")
+
+        start = time.perf_counter()
+        workers = [asyncio.create_task(self._worker(queue)) for _ in range(self.concurrency)]
+        joined = asyncio.create_task(queue.join())
+        try:
+            # Workers only return on error (e.g. the browser failed to start)
+            await asyncio.wait([joined, *workers], return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for task in [joined, *workers]:
+                task.cancel()
+            await asyncio.gather(joined, *workers, return_exceptions=True)
+        for worker in workers:
+            if not worker.cancelled() and worker.exception():
+                raise worker.exception()
+
+        stats = await asyncio.to_thread(self.state.stats)
+        return {
+            "store": self.scraper.store_name,
+            "pages_crawled": self.pages_crawled,
+            "products_written": self.products_written,
+            "duration_s": round(time.perf_counter() - start, 2),
+            "state": stats,
+        }
+
+    async def _worker(self, queue: asyncio.Queue) -> None:
+        """Crawl pages from the queue in one browser context."""
+        async with self.scraper._open_context() as context:
+            await self.scraper._prepare_context(context)
+            while True:
+                url, label, depth = await queue.get()
+                try:
+                    await self._crawl(context, queue, url, label, depth)
+                finally:
+                    queue.task_done()
+
+    async def _crawl(self, context, queue: asyncio.Queue, url: str, label: Optional[str], depth: int) -> None:
+        if self.max_pages is not None and self._started >= self.max_pages:
+            return  # left pending for the next run
+        self._started += 1
+
+        try:
+            products, links = await self.scraper.crawl_page(context, url, self.max_products_per_page)
+        except Exception as e:
+            logger.warning(f"Failed to crawl {url}: {e}")
+            await asyncio.to_thread(self.state.fail_page, url)
+            return
+
+        pages = []
+        if depth < self.max_depth:
+            for href, text in links:
+                href = urldefrag(href)[0]
+                if urlparse(href).netloc == self._host and href != url:
+                    pages.append((href, text or label, depth + 1))
+        for product in products:
+            product.category = product.category or label
+
+        new_products, new_pages = await asyncio.to_thread(
+            self.state.complete_page, url, products, pages, self.writer.write
+        )
+        for page in new_pages:
+            queue.put_nowait(page)
+        for sink in self.sinks:
+            try:
+                sink.add(label or "", new_products)
+            except Exception as e:
+                logger.warning(f"Result sink error: {e}")
+
+        self.pages_crawled += 1
+        self.products_written += len(new_products)
+        logger.info(
+            f"[{self.pages_crawled}] {url}: {len(new_products)}/{len(products)} new products, "
+            f"{len(new_pages)} new pages"
+        )
+
+
+async def crawl(args) -> Dict:
+    """Run a crawl from parsed command-line arguments."""
+    store = registry.resolve(args.store)[0]
+    pool = BrowserPool()
+    scraper = registry.create(store, browser_pool=pool)
+    scraper.MAX_PAGES = args.max_listing_pages
+    fake_store = ExitStack()
+    if args.store_url:
+        from benchmarks.fake_store import point_at_fake_store
+
+        fake_store.enter_context(point_at_fake_store(scraper, args.store_url.rstrip("/")))
+
+    output = args.output or f"crawl/{store}.{args.format}"
+    state_path = args.state or f"{output}.state.db"
+    Path(state_path).parent.mkdir(parents=True, exist_ok=True)
+    state = CrawlState(state_path)
+    writer = open_writer(output, args.format)
+    sinks = []
+    if args.catalog:
+        from product_catalog import ProductCatalog
+
+        sinks.append(ProductCatalog(args.catalog))
+
+    if args.retry_failed:
+        retried = state.retry_failed()
+        print(f"🔁 Retrying {retried} failed pages")
+
+    crawler = CatalogCrawler(
+        scraper,
+        state,
+        writer,
+        concurrency=args.concurrency,
+        max_depth=args.max_depth,
+        max_pages=args.max_pages,
+        sinks=sinks,
+    )
+    try:
+        return await crawler.run(args.root)
+    finally:
+        state.close()  # waits for a checkpoint in progress
+        writer.close()
+        for sink in sinks:
+            sink.close()
+        await pool.close()
+        fake_store.close()
+        print(f"💾 Products written to: {output} (state: {state_path})")
+
+
+def main():
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description="Crawl a store's full catalog by category")
+    parser.add_argument("store", help="Store to crawl (e.g. carrefour)")
+    parser.add_argument("-o", "--output", help="Output file, or directory for parquet (default: crawl/<store>.<format>)")
+    parser.add_argument("--format", choices=FORMATS, default="jsonl", help="Output format (default: jsonl)")
+    parser.add_argument("--state", help="Crawl state database (default: <output>.state.db)")
+    parser.add_argument("-c", "--concurrency", type=int, default=4, help="Parallel pages (default: 4)")
+    parser.add_argument("--max-depth", type=int, default=3, help="Category depth followed (default: 3)")
+    parser.add_argument("--max-pages", type=int, help="Stop after crawling this many pages (resume later)")
+    parser.add_argument("--max-listing-pages", type=int, default=50, help="Result pages read per category (default: 50)")
+    parser.add_argument("--root", help="Root category URL (default: the store's category page)")
+    parser.add_argument("--retry-failed", action="store_true", help="Crawl previously failed pages again")
+    parser.add_argument("--catalog", help="Also index products in this ProductCatalog database")
+    parser.add_argument("--store-url", help="Crawl a running fake store (benchmarks.fake_store) instead")
+    parser.add_argument("-v", "--verbose", action="store_true", help="Enable verbose logging")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING)
+    try:
+        stats = asyncio.run(crawl(args))
+    except KeyboardInterrupt:
+        print("\n⏸️  Interrupted, run the same command again to resume")
+        return
+
+    state = stats["state"]
+    print(
+        f"🕸️  {stats['store']}: {stats['pages_crawled']} pages, {stats['products_written']} new products "
+        f"in {stats['duration_s']}s"
+    )
+    print(f"   Total: {state['done']} pages done, {state['pending']} pending, {state['failed']} failed, "
+          f"{state['products']} products")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,8 +4,28 @@
 import asyncio
 import sys
 import argparse
+import csv
+import json
+import statistics
+import time
+from contextlib import nullcontext
 from price_comparator import PriceComparator
+from scrapers import BrowserPool
+from scrapers.cache import MemoryCache
 import logging
+import profiling
+import compare_daemon
+
+OUTPUT_FORMATS = ("ndjson", "csv")
+CSV_FIELDS = [
+    "query", "rank", "name", "best_price", "best_store", "best_location",
+    "savings", "price_difference_percent", "url", "error",
+]
+
+
+def store_label(store, location=None):
+    """Store name, with its location if any."""
+    return f"{store} @ {location}" if location else store
 
 
 def print_results(results):
@@ -21,7 +41,8 @@ def print_results(results):
     
     for i, deal in enumerate(results['best_deals'][:10], 1):
         print(f"{i}. {deal['name']}")
-        print(f"   💰 Best: {deal['best_price']:.2f}€ @ {deal['best_store']}")
+        best = store_label(deal['best_store'], deal.get('best_location'))
+        print(f"   💰 Best: {deal['best_price']:.2f}€ @ {best}")
         
         if deal['savings'] > 0:
             print(f"   💸 Save {deal['savings']:.2f}€ ({deal['price_difference_percent']}%)")
@@ -29,13 +50,110 @@ def print_results(results):
         if len(deal['all_prices']) > 1:
             print(f"   📊 Prices:")
             for price_info in deal['all_prices']:
-                indicator = "✅" if price_info['store'] == deal['best_store'] else "  "
-                print(f"      {indicator} {price_info['store']}: {price_info['price']:.2f}€")
+                store = store_label(price_info['store'], price_info.get('location'))
+                indicator = "✅" if store == best else "  "
+                print(f"      {indicator} {store}: {price_info['price']:.2f}€")
         
         print(f"   🔗 {deal['url']}")
         print()
 
 
+def read_queries(path):
+    """
+    Queries of a batch file ("-" for stdin), one per line.
+    
+    Blank lines and # comments are skipped, duplicates are kept once.
+    """
+    f = sys.stdin if path == "-" else open(path, encoding="utf-8")
+    try:
+        queries = [line.strip() for line in f]
+    finally:
+        if f is not sys.stdin:
+            f.close()
+    return list(dict.fromkeys(q for q in queries if q and not q.startswith("#")))
+
+
+class ResultWriter:
+    """Stream batch results as NDJSON (one line per query) or CSV (one row per deal)."""
+    
+    def __init__(self, f, output_format="ndjson"):
+        self.f = f
+        self.output_format = output_format
+        if output_format == "csv":
+            self._csv = csv.DictWriter(f, fieldnames=CSV_FIELDS)
+            self._csv.writeheader()
+    
+    def write(self, query, results=None, error=None, elapsed=None):
+        """Write the outcome of one query and flush it."""
+        if self.output_format == "csv":
+            if error is not None:
+                self._csv.writerow({"query": query, "error": error})
+            for rank, deal in enumerate(results["best_deals"] if results else [], 1):
+                row = {field: deal.get(field) for field in CSV_FIELDS}
+                row.update(query=query, rank=rank)
+                self._csv.writerow(row)
+        else:
+            line = {"query": query, "elapsed_s": round(elapsed, 3) if elapsed is not None else None}
+            line.update(results if results is not None else {"error": error})
+            self.f.write(json.dumps(line, ensure_ascii=False) + "\n")
+        self.f.flush()
+
+
+async def run_batch(comparator, queries, writer, max_per_store=5, concurrency=4):
+    """
+    Compare prices for many queries, at most `concurrency` at a time.
+    
+    Results are written as each query finishes (not in input order).
+    
+    Returns:
+        Throughput summary
+    """
+    slots = asyncio.Semaphore(concurrency)
+    
+    async def compare(query):
+        async with slots:
+            start = time.perf_counter()
+            try:
+                results = await comparator.compare_prices(query, max_per_store)
+                return query, results, None, time.perf_counter() - start
+            except Exception as e:
+                return query, None, f"{type(e).__name__}: {e}", time.perf_counter() - start
+    
+    start = time.perf_counter()
+    latencies = []
+    failed = products = 0
+    for finished in asyncio.as_completed([compare(q) for q in queries]):
+        query, results, error, elapsed = await finished
+        writer.write(query, results, error, elapsed)
+        latencies.append(elapsed)
+        if error is not None:
+            failed += 1
+        else:
+            products += results["total_products"]
+    
+    duration = time.perf_counter() - start
+    return {
+        "queries": len(queries),
+        "failed": failed,
+        "products": products,
+        "duration_s": round(duration, 2),
+        "queries_per_s": round(len(queries) / duration, 2) if duration else 0.0,
+        "latency_p50_s": round(statistics.median(latencies), 2) if latencies else None,
+        "latency_max_s": round(max(latencies), 2) if latencies else None,
+    }
+
+
+def print_summary(summary):
+    """Print a batch summary on stderr, keeping stdout machine-readable."""
+    print(
+        f"\n📈 {summary['queries']} queries ({summary['failed']} failed), "
+        f"{summary['products']} products in {summary['duration_s']}s: "
+        f"{summary['queries_per_s']} queries/s, "
+        f"p50 {summary['latency_p50_s']}s, max {summary['latency_max_s']}s",
+        file=sys.stderr,
+    )
+
+
 async def main():
     """Run CLI price comparison."""
     parser = argparse.ArgumentParser(
@@ -43,14 +161,71 @@ async def main():
     )
     parser.add_argument(
         "query",
+        nargs="?",
         help="Product to search for (e.g., 'poulet', 'lait', 'pain')"
     )
+    parser.add_argument(
+        "-b", "--batch",
+        metavar="FILE",
+        help="Compare every query of FILE (one per line, - for stdin) and stream "
+             "results to stdout instead of pretty-printing"
+    )
+    parser.add_argument(
+        "-j", "--concurrency",
+        type=int,
+        default=4,
+        help="Queries compared at the same time in batch mode (default: 4)"
+    )
+    parser.add_argument(
+        "-f", "--format",
+        choices=OUTPUT_FORMATS,
+        default="ndjson",
+        help="Batch output format: ndjson (one line per query) or csv (one row per deal)"
+    )
+    parser.add_argument(
+        "-o", "--output",
+        help="Write batch results to this file instead of stdout"
+    )
     parser.add_argument(
         "-n", "--max-per-store",
         type=int,
         default=5,
         help="Maximum results per store (default: 5)"
     )
+    parser.add_argument(
+        "-s", "--stores",
+        help="Comma-separated stores to compare, e.g. carrefour,leclerc (default: all)"
+    )
+    parser.add_argument(
+        "-l", "--location",
+        dest="locations",
+        action="append",
+        metavar="STORE:LOCATION",
+        help="Store location to compare, repeatable, e.g. -l leclerc:drive-1 -l leclerc:drive-2 "
+             "(cookies from locations/<store>/<location>.json)"
+    )
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        const=profiling.SAMPLE,
+        choices=profiling.MODES,
+        help="Profile the run: sample (collapsed stacks, default) or cprofile (pstats)"
+    )
+    parser.add_argument(
+        "--profile-dir",
+        default="profiles",
+        help="Directory for profiles (default: profiles)"
+    )
+    parser.add_argument(
+        "--no-daemon",
+        action="store_true",
+        help="Run in this process even if compare_daemon.py is running"
+    )
+    parser.add_argument(
+        "--socket",
+        default=compare_daemon.SOCKET_PATH,
+        help="Socket of compare_daemon.py (default: $PRICE_DAEMON_SOCKET or a per-user path in /tmp)"
+    )
     parser.add_argument(
         "-v", "--verbose",
         action="store_true",
@@ -58,17 +233,70 @@ async def main():
     )
     
     args = parser.parse_args()
+    if bool(args.query) == bool(args.batch):
+        parser.error("give either a query or --batch FILE")
+    if args.concurrency < 1:
+        parser.error("--concurrency must be at least 1")
     
     # Configure logging
     log_level = logging.DEBUG if args.verbose else logging.WARNING
     logging.basicConfig(level=log_level)
     
-    # Run comparison
-    comparator = PriceComparator()
-    results = await comparator.compare_prices(args.query, args.max_per_store)
+    # Run comparison, on the warm daemon when one is running (not when profiling)
+    profiler = (
+        profiling.profile(args.profile, args.query or "batch", args.profile_dir)
+        if args.profile else nullcontext()
+    )
+    client = None
+    if not (args.no_daemon or args.profile):
+        client = await compare_daemon.connect(args.socket, args.stores, args.locations)
+    with profiler as profile_result:
+        if client is not None:
+            # Warm browsers and cache in compare_daemon.py
+            comparator = client
+        elif args.batch:
+            # One browser and one cache for the whole batch: repeated queries are free
+            comparator = PriceComparator(
+                cache_client=MemoryCache(),
+                browser_pool=BrowserPool(),
+                stores=args.stores,
+                locations=args.locations,
+            )
+        else:
+            # Several locations share one browser instead of launching one each
+            comparator = PriceComparator(
+                browser_pool=BrowserPool() if args.locations else None,
+                stores=args.stores,
+                locations=args.locations,
+            )
+        
+        try:
+            if args.batch:
+                queries = read_queries(args.batch)
+                output = open(args.output, "w", newline="", encoding="utf-8") if args.output else sys.stdout
+                try:
+                    writer = ResultWriter(output, args.format)
+                    summary = await run_batch(
+                        comparator, queries, writer, args.max_per_store, args.concurrency
+                    )
+                finally:
+                    if output is not sys.stdout:
+                        output.close()
+            else:
+                results = await comparator.compare_prices(args.query, args.max_per_store)
+        finally:
+            await comparator.close()
     
     # Print results
-    print_results(results)
+    if args.batch:
+        print_summary(summary)
+    else:
+        print_results(results)
+    if profile_result:
+        print(
+            f"🔬 {profile_result.mode} profile saved to: {profile_result.path}",
+            file=sys.stderr if args.batch else sys.stdout,
+        )
 
 
 if __name__ == "__main__":
@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+"""Warm comparison daemon for the CLI, on a Unix domain socket.
+
+compare.py pays for importing Playwright, launching Chromium and an empty
+cache on every run. The daemon keeps a PriceComparator alive instead (shared
+browser pool, warm sessions, in-memory cache), and compare.py sends it its
+queries when it is running:
+
+    python compare_daemon.py &          # start (--stop to stop it)
+    ./compare.py "lait"                 # served by the daemon
+    ./compare.py "lait" --no-daemon     # in-process, as before
+
+Protocol: one JSON object per line in each direction, e.g.
+{"op": "compare", "query": "lait", "max_per_store": 5} answered by
+{"ok": true, "result": {...}} or {"ok": false, "error": "..."}.
+"""
+
+from typing import Dict, Optional
+import argparse
+import asyncio
+import json
+import logging
+import os
+import signal
+import sys
+import time
+
+logger = logging.getLogger(__name__)
+
+SOCKET_PATH = os.environ.get(
+    "PRICE_DAEMON_SOCKET", os.path.join("/tmp", f"price-comparator-{os.getuid()}.sock")
+)
+# Largest request or response line (comparisons can be a few MB of JSON)
+LINE_LIMIT = 64 * 1024 * 1024
+CONNECT_TIMEOUT = 1.0
+
+
+class DaemonError(Exception):
+    """The daemon could not be reached, or answered with an error."""
+
+
+class ComparisonDaemon:
+    """Serve compare and search requests from one warm PriceComparator."""
+
+    def __init__(self, comparator, socket_path: str = SOCKET_PATH):
+        """
+        Initialize daemon.
+
+        Args:
+            comparator: PriceComparator kept warm between requests
+            socket_path: Unix socket to listen on
+        """
+        self.comparator = comparator
+        self.socket_path = socket_path
+        self.started_at = time.time()
+        self.requests = 0
+        self.errors = 0
+        self._server = None
+        self._stopped = asyncio.Event()
+
+    async def start(self) -> None:
+        """
+        Listen on the socket.
+
+        Raises:
+            DaemonError: If another daemon already listens on it
+        """
+        if os.path.exists(self.socket_path):
+            if await ping(self.socket_path):
+                raise DaemonError(f"A daemon is already running on {self.socket_path}")
+            os.unlink(self.socket_path)  # left over by a daemon that died
+        self._server = await asyncio.start_unix_server(
+            self._handle, path=self.socket_path, limit=LINE_LIMIT
+        )
+        os.chmod(self.socket_path, 0o600)
+        logger.info(f"Comparison daemon listening on {self.socket_path}")
+
+    async def serve(self) -> None:
+        """Serve until stop() or a shutdown request, then release everything."""
+        try:
+            await self._stopped.wait()
+        finally:
+            self._server.close()
+            await self._server.wait_closed()
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+            await self.comparator.close()
+            logger.info("Comparison daemon stopped")
+
+    def stop(self) -> None:
+        self._stopped.set()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Answer the requests of one connection, one line each."""
+        try:
+            while not self._stopped.is_set():
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    response = {"ok": True, "result": await self.dispatch(json.loads(line))}
+                except Exception as e:
+                    self.errors += 1
+                    logger.error(f"Daemon request failed: {e!r}")
+                    response = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+                writer.write(json.dumps(response, ensure_ascii=False).encode() + b"\n")
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def dispatch(self, request: Dict):
+        """
+        Run one request.
+
+        Args:
+            request: {"op": "compare" | "search" | "stats" | "ping" | "shutdown", ...}
+
+        Returns:
+            The JSON-serializable result
+
+        Raises:
+            ValueError: If the op or its arguments are invalid
+        """
+        op = request.get("op")
+        self.requests += 1
+        if op == "ping":
+            return "pong"
+        if op == "stats":
+            return self.stats()
+        if op == "shutdown":
+            self.stop()
+            return "stopping"
+        if op not in ("compare", "search"):
+            raise ValueError(f"Unknown op: {op}")
+
+        query = request.get("query")
+        if not query:
+            raise ValueError("Missing query")
+        max_per_store = int(request.get("max_per_store", 5))
+        stores = request.get("stores")
+        locations = request.get("locations")
+        if op == "compare":
+            return await self.comparator.compare_prices(query, max_per_store, stores, locations)
+        products = await self.comparator.search_all(
+            query, max_per_store, stores=stores, locations=locations
+        )
+        return [p.to_dict() for p in products]
+
+    def stats(self) -> Dict:
+        return {
+            "pid": os.getpid(),
+            "uptime_s": round(time.time() - self.started_at, 1),
+            "requests": self.requests,
+            "errors": self.errors,
+            "sessions": self.comparator.session_stats(),
+            "browser": self.comparator.browser_pool.stats() if self.comparator.browser_pool else None,
+        }
+
+
+async def request(request: Dict, socket_path: str = SOCKET_PATH, timeout: Optional[float] = None):
+    """
+    Send one request to the daemon.
+
+    Args:
+        request: Request object (see ComparisonDaemon.dispatch)
+        socket_path: Daemon socket
+        timeout: Seconds to wait for the answer (default: no limit)
+
+    Returns:
+        The result
+
+    Raises:
+        DaemonError: If the daemon is not running or the request failed
+    """
+    try:
+        reader, writer = await asyncio.wait_for(
+            asyncio.open_unix_connection(socket_path, limit=LINE_LIMIT), CONNECT_TIMEOUT
+        )
+    except (OSError, asyncio.TimeoutError) as e:
+        raise DaemonError(f"No daemon on {socket_path}: {e}")
+    try:
+        writer.write(json.dumps(request).encode() + b"\n")
+        await writer.drain()
+        line = await asyncio.wait_for(reader.readline(), timeout)
+    except (OSError, asyncio.TimeoutError) as e:
+        raise DaemonError(f"Daemon request failed: {e!r}")
+    finally:
+        writer.close()
+    if not line:
+        raise DaemonError("Daemon closed the connection")
+    response = json.loads(line)
+    if not response["ok"]:
+        raise DaemonError(response["error"])
+    return response["result"]
+
+
+async def ping(socket_path: str = SOCKET_PATH) -> bool:
+    """Whether a daemon answers on socket_path."""
+    try:
+        return await request({"op": "ping"}, socket_path, timeout=CONNECT_TIMEOUT) == "pong"
+    except DaemonError:
+        return False
+
+
+class DaemonClient:
+    """Stand-in for PriceComparator.compare_prices that runs on the daemon."""
+
+    def __init__(self, socket_path: str = SOCKET_PATH, stores=None, locations=None):
+        """
+        Initialize client.
+
+        Args:
+            socket_path: Daemon socket
+            stores: Default store selection sent with each request (optional)
+            locations: Default store locations, e.g. ["leclerc:drive-1"] (optional)
+        """
+        self.socket_path = socket_path
+        self.stores = stores
+        self.locations = locations
+
+    async def compare_prices(self, query: str, max_per_store: int = 5, stores=None, locations=None) -> Dict:
+        return await request(
+            {
+                "op": "compare",
+                "query": query,
+                "max_per_store": max_per_store,
+                "stores": stores or self.stores,
+                "locations": locations or self.locations,
+            },
+            self.socket_path,
+        )
+
+    async def close(self) -> None:
+        """Nothing to release: the daemon keeps its browsers."""
+
+
+async def connect(socket_path: str = SOCKET_PATH, stores=None, locations=None) -> Optional[DaemonClient]:
+    """Return a client if a daemon is running, else None."""
+    if not hasattr(asyncio, "open_unix_connection") or not os.path.exists(socket_path):
+        return None
+    if not await ping(socket_path):
+        return None
+    return DaemonClient(socket_path, stores, locations)
+
+
+async def main():
+    """Run (or stop) the comparison daemon."""
+    parser = argparse.ArgumentParser(description="Keep browsers and cache warm for compare.py")
+    parser.add_argument(
+        "--socket",
+        default=SOCKET_PATH,
+        help=f"Unix socket to listen on (default: {SOCKET_PATH}, or $PRICE_DAEMON_SOCKET)"
+    )
+    parser.add_argument(
+        "--cache-entries",
+        type=int,
+        default=10000,
+        help="Search results kept in the in-memory cache (default: 10000)"
+    )
+    parser.add_argument(
+        "--stop",
+        action="store_true",
+        help="Stop the running daemon"
+    )
+    parser.add_argument(
+        "--stats",
+        action="store_true",
+        help="Print the running daemon's statistics"
+    )
+    parser.add_argument(
+        "-v", "--verbose",
+        action="store_true",
+        help="Enable verbose logging"
+    )
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.INFO)
+
+    if args.stop or args.stats:
+        try:
+            result = await request({"op": "shutdown" if args.stop else "stats"}, args.socket)
+        except DaemonError as e:
+            print(f"❌ {e}")
+            sys.exit(1)
+        print(json.dumps(result, indent=2) if args.stats else "🛑 Daemon stopping")
+        return
+
+    from price_comparator import PriceComparator
+    from scrapers import BrowserPool
+    from scrapers.cache import MemoryCache
+
+    comparator = PriceComparator(cache_client=MemoryCache(args.cache_entries), browser_pool=BrowserPool())
+    daemon = ComparisonDaemon(comparator, args.socket)
+    try:
+        await daemon.start()
+    except DaemonError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, daemon.stop)
+    print(f"🔥 Comparison daemon ready on {args.socket}")
+    await daemon.serve()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
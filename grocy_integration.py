@@ -1,15 +1,22 @@
 """Integration with Grocy for smart shopping lists."""
 
+import argparse
 import asyncio
 import json
 import subprocess
 import os
-from typing import List, Dict
+from typing import List, Dict, Optional
+from basket_optimizer import optimize_basket, price_matrix
 from price_comparator import PriceComparator
+from scrapers.barcode import normalize_ean
 
+GROCY_URL = "https://grocy.adamelhirch.com/api"
+# Product fields the report needs (the others, and images, are not scraped)
+REPORT_FIELDS = "name,price,ean"
 
-def get_grocy_shopping_list() -> List[Dict]:
-    """Get shopping list from Grocy."""
+
+def grocy_get(path: str):
+    """GET a Grocy API path (e.g. "objects/shopping_list") and decode its JSON."""
     api_key_file = os.path.expanduser("~/.openclaw/secrets/grocy_api_key.txt")
     
     if not os.path.exists(api_key_file):
@@ -18,42 +25,85 @@ def get_grocy_shopping_list() -> List[Dict]:
     with open(api_key_file) as f:
         api_key = f.read().strip()
     
-    # Use Grocy API to get shopping list
     result = subprocess.run([
         "curl", "-s",
         "-H", f"GROCY-API-KEY: {api_key}",
-        "https://grocy.adamelhirch.com/api/objects/shopping_list"
+        f"{GROCY_URL}/{path}"
     ], capture_output=True, text=True)
     
     if result.returncode != 0:
-        raise Exception(f"Failed to fetch Grocy shopping list: {result.stderr}")
+        raise Exception(f"Failed to fetch Grocy {path}: {result.stderr}")
     
-    items = json.loads(result.stdout)
-    return items
+    return json.loads(result.stdout)
+
+
+def get_grocy_shopping_list() -> List[Dict]:
+    """Get shopping list from Grocy."""
+    return grocy_get("objects/shopping_list")
+
+
+def get_grocy_barcodes() -> Dict[int, List[str]]:
+    """Barcodes of Grocy products, by product id."""
+    barcodes: Dict[int, List[str]] = {}
+    for row in grocy_get("objects/product_barcodes"):
+        barcodes.setdefault(row["product_id"], []).append(row["barcode"])
+    return barcodes
+
+
+def item_ean(item: Dict) -> Optional[str]:
+    """First valid EAN among the barcodes attached to a shopping list item."""
+    for barcode in item.get("barcodes") or []:
+        ean = normalize_ean(barcode)
+        if ean:
+            return ean
+    return None
+
+
+def item_name(item: Dict) -> str:
+    """Product name of a Grocy shopping list item (or its note, or its barcode)."""
+    return item.get("product", {}).get("name", item.get("note", "")) or item_ean(item) or ""
+
+
+def item_quantities(items: List[Dict]) -> Dict[str, float]:
+    """Amount to buy per product name (1 when Grocy gives none)."""
+    quantities: Dict[str, float] = {}
+    for item in items:
+        name = item_name(item)
+        if name:
+            quantities[name] = quantities.get(name, 0) + float(item.get("amount") or 1)
+    return quantities
 
 
 async def price_compare_shopping_list(items: List[Dict]) -> Dict:
     """
     Compare prices for all items in shopping list.
     
+    Items with a barcode are looked up by EAN (the same product in every
+    store); the others, and barcodes no store knows, by name.
+    
     Args:
-        items: Grocy shopping list items
+        items: Grocy shopping list items, with their "barcodes" (optional)
         
     Returns:
         Dictionary with price comparisons for each item
     """
-    comparator = PriceComparator()
+    comparator = PriceComparator(fields=REPORT_FIELDS)
     results = {}
     
     for item in items:
-        product_name = item.get("product", {}).get("name", item.get("note", ""))
+        product_name = item_name(item)
         if not product_name:
             continue
+        ean = item_ean(item)
         
-        print(f"🔍 Comparing prices for: {product_name}")
+        print(f"🔍 Comparing prices for: {product_name}" + (f" (EAN {ean})" if ean else ""))
         
         try:
-            comparison = await comparator.compare_prices(product_name, max_per_store=3)
+            comparison = None
+            if ean:
+                comparison = await comparator.compare_barcode(ean, max_per_store=3)
+            if not comparison or not comparison["best_deals"]:
+                comparison = await comparator.compare_prices(product_name, max_per_store=3)
             results[product_name] = comparison
         except Exception as e:
             print(f"❌ Error comparing {product_name}: {e}")
@@ -62,8 +112,40 @@ async def price_compare_shopping_list(items: List[Dict]) -> Dict:
     return results
 
 
-def format_shopping_report(results: Dict) -> str:
-    """Format shopping comparison results as a readable report."""
+def format_basket_split(basket: Dict) -> str:
+    """Format an optimize_basket() plan as a per-store shopping split."""
+    report = f"🧺 **Shopping split ({len(basket['stores'])} stores)**\n\n"
+    for store, entry in sorted(basket["stores"].items(), key=lambda s: -s[1]["subtotal"]):
+        report += f"**{store}**: {entry['subtotal']:.2f}€\n"
+        for line in entry["items"]:
+            quantity = f"{line['quantity']:g} × " if line["quantity"] != 1 else ""
+            report += f"  • {quantity}{line['item']} ({line['name']}): {line['price']:.2f}€\n"
+        report += "\n"
+    
+    if basket["unpriced"]:
+        report += f"⚠️ Not sold in these stores: {', '.join(basket['unpriced'])}\n"
+    if basket["store_costs"]:
+        report += f"🚗 Store costs: {basket['store_costs']:.2f}€\n"
+    report += f"**Basket total: {basket['total']:.2f}€**"
+    if not basket.get("exact", True):
+        report += " (stores chosen by local search, may not be the cheapest split)"
+    extra = basket["total"] - basket["cheapest_everywhere"]
+    if extra > 0.005 and not basket["unpriced"]:
+        report += f" ({extra:.2f}€ more than every item at its cheapest store)"
+    return report + "\n"
+
+
+def format_shopping_report(results: Dict, basket: Optional[Dict] = None) -> str:
+    """
+    Format shopping comparison results as a readable report.
+    
+    Args:
+        results: Comparison per product (see price_compare_shopping_list())
+        basket: Optimized per-store split to append (see basket_optimizer)
+        
+    Returns:
+        Markdown report
+    """
     report = "🛒 **Smart Shopping Report**\n\n"
     
     total_best_price = 0
@@ -101,11 +183,29 @@ def format_shopping_report(results: Dict) -> str:
     if total_savings > 0:
         report += f"**Total savings: {total_savings:.2f}€**\n"
     
+    if basket and basket["stores"]:
+        report += "\n" + format_basket_split(basket)
+    
     return report
 
 
 async def main():
     """Generate smart shopping report."""
+    parser = argparse.ArgumentParser(description="Price a Grocy shopping list across supermarkets")
+    parser.add_argument(
+        "-k", "--max-stores",
+        type=int,
+        default=2,
+        help="Split the basket across at most this many stores (default: 2, 0 for no limit)"
+    )
+    parser.add_argument(
+        "--store-cost",
+        type=float,
+        default=0.0,
+        help="Cost of each store visited (travel, delivery fee) in € (default: 0)"
+    )
+    args = parser.parse_args()
+    
     print("🛒 Fetching Grocy shopping list...")
     items = get_grocy_shopping_list()
     
@@ -115,11 +215,26 @@ async def main():
     
     print(f"📝 Found {len(items)} items\n")
     
+    try:
+        barcodes = get_grocy_barcodes()
+    except Exception as e:
+        print(f"⚠️  Could not fetch barcodes, searching by name: {e}")
+        barcodes = {}
+    for item in items:
+        item["barcodes"] = barcodes.get(item.get("product_id"), [])
+    
     print("🔍 Comparing prices across supermarkets...")
     results = await price_compare_shopping_list(items)
     
+    basket = optimize_basket(
+        price_matrix(results),
+        max_stores=args.max_stores or None,
+        store_cost=args.store_cost,
+        quantities=item_quantities(items),
+    )
+    
     print("\n" + "="*60)
-    report = format_shopping_report(results)
+    report = format_shopping_report(results, basket)
     print(report)
     
     # Save report
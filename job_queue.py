@@ -0,0 +1,699 @@
+"""Asynchronous scrape job queue with worker processes.
+
+Jobs are submitted by the API server and consumed by worker processes that
+each keep their own warm browser. Two backends are available:
+
+- ``memory://``: multiprocessing queue for single-node runs
+- ``redis://host:port/db``: Redis Streams consumer group for multi-node runs
+
+Run standalone workers against a shared Redis backend with:
+    
+    python job_queue.py --backend redis://localhost:6379/0 --workers 4
+"""
+
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional
+import argparse
+import asyncio
+import json
+import logging
+import multiprocessing
+import os
+import queue
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+
+JOB_KINDS = ("compare", "search")
+
+
+class Job:
+    """A queued scrape request."""
+    
+    def __init__(
+        self,
+        kind: str,
+        query: str,
+        max_results: int = 5,
+        stores: Optional[List[str]] = None,
+        locations: Optional[Dict[str, List[str]]] = None,
+        fields: Optional[List[str]] = None,
+        job_id: Optional[str] = None,
+        status: str = JOB_QUEUED,
+        result=None,
+        error: Optional[str] = None,
+        created_at: Optional[float] = None,
+        started_at: Optional[float] = None,
+        finished_at: Optional[float] = None,
+    ):
+        if kind not in JOB_KINDS:
+            raise ValueError(f"Unknown job kind: {kind}")
+        self.kind = kind
+        self.query = query
+        self.max_results = max_results
+        self.stores = stores
+        self.locations = locations
+        self.fields = fields
+        self.job_id = job_id or uuid.uuid4().hex
+        self.status = status
+        self.result = result
+        self.error = error
+        self.created_at = created_at or time.time()
+        self.started_at = started_at
+        self.finished_at = finished_at
+    
+    @property
+    def finished(self) -> bool:
+        """Whether the job reached a terminal state."""
+        return self.status in (JOB_DONE, JOB_FAILED)
+    
+    def to_dict(self) -> Dict:
+        """Convert to dictionary."""
+        return {
+            "job_id": self.job_id,
+            "kind": self.kind,
+            "query": self.query,
+            "max_results": self.max_results,
+            "stores": self.stores,
+            "locations": self.locations,
+            "fields": self.fields,
+            "status": self.status,
+            "result": self.result,
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+    
+    @classmethod
+    def from_dict(cls, data: Dict) -> "Job":
+        """Build a job from its dictionary form."""
+        return cls(**data)
+
+
+class JobBackend(ABC):
+    """Storage and delivery for jobs, shared by the API and the workers."""
+    
+    @abstractmethod
+    def submit(self, job: Job) -> Job:
+        """Store a new job and make it available to workers."""
+        pass
+    
+    @abstractmethod
+    def get(self, job_id: str) -> Optional[Job]:
+        """Return the current state of a job, or None if unknown."""
+        pass
+    
+    @abstractmethod
+    def next_job(self, consumer: str, timeout: float = 1.0) -> Optional[Job]:
+        """
+        Block until a job is available for a worker.
+        
+        Args:
+            consumer: Name of the worker consuming the job
+            timeout: Maximum time to wait in seconds
+        
+        Returns:
+            The job, already marked as running, or None on timeout
+        """
+        pass
+    
+    @abstractmethod
+    def update(self, job: Job) -> None:
+        """Persist a job's new state (result, error, status)."""
+        pass
+
+
+class InMemoryJobBackend(JobBackend):
+    """Single-node backend built on a multiprocessing manager."""
+    
+    EVICT_INTERVAL = 60.0
+    RECLAIM_INTERVAL = 30.0
+    
+    def __init__(
+        self,
+        manager=None,
+        result_ttl: int = 3600,
+        max_jobs: int = 10000,
+        claim_idle: float = 900.0,
+        max_deliveries: int = 3,
+    ):
+        """
+        Initialize in-memory backend.
+        
+        Args:
+            manager: multiprocessing Manager to share state through (optional)
+            result_ttl: Seconds to keep finished jobs, like the Redis backend
+            max_jobs: Jobs kept at most; the oldest finished ones are evicted first
+            claim_idle: Seconds after which a running job whose worker did not
+                finish it is queued again, like the Redis backend
+            max_deliveries: Deliveries of a job before it is marked failed
+                instead of retried
+        """
+        self._manager = manager or multiprocessing.get_context("spawn").Manager()
+        self._queue = self._manager.Queue()
+        self._jobs = self._manager.dict()
+        self._deliveries = self._manager.dict()
+        self._lock = self._manager.Lock()
+        self.result_ttl = result_ttl
+        self.max_jobs = max_jobs
+        self.claim_idle = claim_idle
+        self.max_deliveries = max_deliveries
+        self._evicted_at = time.monotonic()
+        self._reclaimed_at = 0.0
+    
+    def __getstate__(self):
+        # Manager proxies are picklable for spawned workers, the manager is not
+        return {
+            "_manager": None,
+            "_queue": self._queue,
+            "_jobs": self._jobs,
+            "_deliveries": self._deliveries,
+            "_lock": self._lock,
+            "result_ttl": self.result_ttl,
+            "max_jobs": self.max_jobs,
+            "claim_idle": self.claim_idle,
+            "max_deliveries": self.max_deliveries,
+            "_evicted_at": 0.0,
+            "_reclaimed_at": 0.0,
+        }
+    
+    def submit(self, job: Job) -> Job:
+        self._evict()
+        self._jobs[job.job_id] = job.to_dict()
+        self._queue.put(job.job_id)
+        return job
+    
+    def _evict(self) -> None:
+        """Drop expired finished jobs, then the oldest finished ones above max_jobs."""
+        if len(self._jobs) < self.max_jobs and time.monotonic() - self._evicted_at < self.EVICT_INTERVAL:
+            return
+        self._evicted_at = time.monotonic()
+        now = time.time()
+        finished = sorted(
+            (data["finished_at"], job_id)
+            for job_id, data in self._jobs.copy().items()
+            if data["status"] in (JOB_DONE, JOB_FAILED)
+        )
+        expired = [job_id for finished_at, job_id in finished if now - finished_at > self.result_ttl]
+        excess = len(self._jobs) - len(expired) - self.max_jobs + 1
+        if excess > 0:
+            expired += [job_id for _, job_id in finished[len(expired):len(expired) + excess]]
+        for job_id in expired:
+            self._jobs.pop(job_id, None)
+            self._deliveries.pop(job_id, None)
+        if expired:
+            logger.debug(f"Evicted {len(expired)} finished jobs")
+    
+    def get(self, job_id: str) -> Optional[Job]:
+        data = self._jobs.get(job_id)
+        return Job.from_dict(data) if data else None
+    
+    def next_job(self, consumer: str, timeout: float = 1.0) -> Optional[Job]:
+        self._reclaim()
+        try:
+            job_id = self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+        
+        job = self.get(job_id)
+        if job is None or job.finished:
+            return None
+        self._deliveries[job_id] = self._deliveries.get(job_id, 0) + 1
+        job.status = JOB_RUNNING
+        job.started_at = time.time()
+        self.update(job)
+        return job
+    
+    def _reclaim(self) -> None:
+        """
+        Queue again the jobs left running by a worker that died.
+        
+        Every RECLAIM_INTERVAL seconds, jobs started more than claim_idle
+        seconds ago and not finished are retried, or marked failed once
+        delivered max_deliveries times.
+        """
+        if time.monotonic() - self._reclaimed_at < self.RECLAIM_INTERVAL:
+            return
+        self._reclaimed_at = time.monotonic()
+        
+        deadline = time.time() - self.claim_idle
+        with self._lock:
+            for job_id, data in self._jobs.copy().items():
+                if data["status"] != JOB_RUNNING or data["started_at"] > deadline:
+                    continue
+                job = Job.from_dict(data)
+                deliveries = self._deliveries.get(job_id, 1)
+                if deliveries >= self.max_deliveries:
+                    logger.error(f"Job {job_id} abandoned {deliveries} times, giving up")
+                    job.status = JOB_FAILED
+                    job.error = f"Worker stopped responding ({deliveries} attempts)"
+                    job.finished_at = time.time()
+                    self.update(job)
+                    continue
+                
+                logger.warning(f"Retrying job {job_id} abandoned after {time.time() - job.started_at:.0f}s")
+                job.status = JOB_QUEUED
+                self.update(job)
+                self._queue.put(job_id)
+    
+    def update(self, job: Job) -> None:
+        self._jobs[job.job_id] = job.to_dict()
+
+
+class RedisStreamsJobBackend(JobBackend):
+    """Multi-node backend using a Redis Stream and a consumer group."""
+    
+    STREAM = "scrape:jobs"
+    GROUP = "scrape-workers"
+    
+    RECLAIM_INTERVAL = 30.0
+    
+    def __init__(
+        self,
+        url: str = "redis://localhost:6379/0",
+        client=None,
+        result_ttl: int = 3600,
+        claim_idle: float = 900.0,
+        max_deliveries: int = 3,
+    ):
+        """
+        Initialize Redis Streams backend.
+        
+        Args:
+            url: Redis connection URL
+            client: Existing Redis client, e.g. a local stand-in (optional)
+            result_ttl: Seconds to keep job state after its last update
+            claim_idle: Seconds after which a job delivered to a worker that
+                did not finish it is taken over by another worker
+            max_deliveries: Deliveries of a job before it is marked failed
+                instead of retried
+        """
+        self.url = url
+        self.result_ttl = result_ttl
+        self.claim_idle = claim_idle
+        self.max_deliveries = max_deliveries
+        if client is None:
+            import redis
+            client = redis.Redis.from_url(url, decode_responses=True)
+        self.redis = client
+        self._pending: Dict[str, str] = {}
+        self._reclaimed_at = 0.0
+        self._ensure_group()
+    
+    def __getstate__(self):
+        return {
+            "url": self.url,
+            "result_ttl": self.result_ttl,
+            "claim_idle": self.claim_idle,
+            "max_deliveries": self.max_deliveries,
+        }
+    
+    def __setstate__(self, state):
+        self.__init__(**state)
+    
+    def _ensure_group(self) -> None:
+        try:
+            self.redis.xgroup_create(self.STREAM, self.GROUP, id="0", mkstream=True)
+        except Exception as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+    
+    def _job_key(self, job_id: str) -> str:
+        return f"scrape:job:{job_id}"
+    
+    def submit(self, job: Job) -> Job:
+        self.update(job)
+        self.redis.xadd(self.STREAM, {"job_id": job.job_id})
+        return job
+    
+    def get(self, job_id: str) -> Optional[Job]:
+        data = self.redis.get(self._job_key(job_id))
+        return Job.from_dict(json.loads(data)) if data else None
+    
+    def next_job(self, consumer: str, timeout: float = 1.0) -> Optional[Job]:
+        job = self._reclaim(consumer)
+        if job is not None:
+            return job
+        
+        entries = self.redis.xreadgroup(
+            self.GROUP, consumer, {self.STREAM: ">"}, count=1, block=int(timeout * 1000)
+        )
+        if not entries:
+            return None
+        
+        _, messages = entries[0]
+        message_id, fields = messages[0]
+        job = self.get(fields["job_id"])
+        if job is None:
+            # Job state expired before anyone picked it up
+            self.redis.xack(self.STREAM, self.GROUP, message_id)
+            return None
+        return self._start(job, message_id)
+    
+    def _start(self, job: Job, message_id: str) -> Job:
+        self._pending[job.job_id] = message_id
+        job.status = JOB_RUNNING
+        job.started_at = time.time()
+        self.update(job)
+        return job
+    
+    def _reclaim(self, consumer: str) -> Optional[Job]:
+        """
+        Take over a job left pending by a worker that died.
+        
+        Every RECLAIM_INTERVAL seconds, stream entries delivered more than
+        claim_idle seconds ago and never acknowledged are claimed: their job
+        is retried, or marked failed once delivered max_deliveries times.
+        
+        Returns:
+            The job to retry, already marked as running, or None
+        """
+        if time.monotonic() - self._reclaimed_at < self.RECLAIM_INTERVAL:
+            return None
+        self._reclaimed_at = time.monotonic()
+        
+        idle_ms = int(self.claim_idle * 1000)
+        stale = self.redis.xpending_range(self.STREAM, self.GROUP, min="-", max="+", count=10, idle=idle_ms)
+        for entry in stale:
+            claimed = self.redis.xclaim(self.STREAM, self.GROUP, consumer, idle_ms, [entry["message_id"]])
+            if not claimed:
+                continue  # another worker claimed it first
+            message_id, fields = claimed[0]
+            job = self.get(fields["job_id"]) if fields else None
+            if job is None or job.finished:
+                # Expired, or finished by a worker that died before acknowledging
+                self.redis.xack(self.STREAM, self.GROUP, message_id)
+                continue
+            
+            if entry["times_delivered"] >= self.max_deliveries:
+                logger.error(f"Job {job.job_id} abandoned {entry['times_delivered']} times, giving up")
+                self._pending[job.job_id] = message_id
+                job.status = JOB_FAILED
+                job.error = f"Worker stopped responding ({entry['times_delivered']} attempts)"
+                job.finished_at = time.time()
+                self.update(job)
+                continue
+            
+            logger.warning(f"Retrying job {job.job_id} abandoned by worker {entry['consumer']}")
+            return self._start(job, message_id)
+        return None
+    
+    def update(self, job: Job) -> None:
+        self.redis.setex(self._job_key(job.job_id), self.result_ttl, json.dumps(job.to_dict()))
+        message_id = self._pending.pop(job.job_id, None) if job.finished else None
+        if message_id:
+            self.redis.xack(self.STREAM, self.GROUP, message_id)
+
+
+def create_backend(url: str = "memory://") -> JobBackend:
+    """
+    Create a job backend from a URL.
+    
+    Args:
+        url: ``memory://`` or a ``redis://`` URL
+    
+    Returns:
+        JobBackend instance
+    """
+    if url.startswith("memory://"):
+        return InMemoryJobBackend()
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisStreamsJobBackend(url)
+    raise ValueError(f"Unsupported job backend: {url}")
+
+
+class JobWorker:
+    """Consume jobs with a warm browser and a local price comparator."""
+    
+    def __init__(
+        self,
+        backend: JobBackend,
+        name: str,
+        concurrency: int = 2,
+        cache_client=None,
+        browser_options: Optional[Dict] = None,
+        cache_url: Optional[str] = None,
+        history_db: Optional[str] = None,
+        catalog_db: Optional[str] = None,
+    ):
+        """
+        Initialize worker.
+        
+        Args:
+            backend: Job backend to consume from
+            name: Consumer name, unique per worker
+            concurrency: Jobs processed at once by this worker
+            cache_client: Redis client shared with the API (optional)
+            browser_options: BrowserPool keyword arguments, e.g. recycling limits
+            cache_url: Redis URL of the API's result cache, connected to when
+                no cache_client is given (default: a cache local to the worker)
+            history_db: Price history database fed with the jobs' scrapes (optional)
+            catalog_db: Product catalog database fed with the jobs' scrapes (optional)
+        """
+        self.backend = backend
+        self.name = name
+        self.concurrency = concurrency
+        self.cache_client = cache_client
+        self.browser_options = browser_options or {}
+        self.cache_url = cache_url
+        self.history_db = history_db
+        self.catalog_db = catalog_db
+        self._stopping = False
+    
+    def stop(self) -> None:
+        """Ask the worker loop to exit after its current jobs."""
+        self._stopping = True
+    
+    async def run(self) -> None:
+        """Process jobs until stopped."""
+        from price_comparator import PriceComparator
+        from price_history import PriceHistoryStore
+        from product_catalog import ProductCatalog
+        from scrapers import BrowserPool
+        from scrapers.cache import MemoryCache
+        
+        if self.cache_client is None:
+            if self.cache_url:
+                import redis
+                self.cache_client = redis.Redis.from_url(self.cache_url)
+            else:
+                self.cache_client = MemoryCache()
+        # Same sinks as the API's synchronous searches (SQLite allows several writers)
+        sinks = []
+        if self.history_db:
+            sinks.append(await asyncio.to_thread(PriceHistoryStore, self.history_db))
+        catalog = await asyncio.to_thread(ProductCatalog, self.catalog_db) if self.catalog_db else None
+        comparator = PriceComparator(
+            self.cache_client,
+            browser_pool=BrowserPool(**self.browser_options),
+            sinks=sinks,
+            catalog=catalog,
+        )
+        slots = asyncio.Semaphore(self.concurrency)
+        tasks = set()
+        logger.info(f"Worker {self.name} started (concurrency={self.concurrency})")
+        
+        try:
+            while not self._stopping:
+                await slots.acquire()
+                job = await asyncio.to_thread(self.backend.next_job, self.name, 1.0)
+                if job is None:
+                    slots.release()
+                    continue
+                
+                task = asyncio.create_task(self._process(comparator, job))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+                task.add_done_callback(lambda _: slots.release())
+            
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+        finally:
+            await comparator.close()
+            for sink in sinks + ([catalog] if catalog else []):
+                await asyncio.to_thread(sink.close)
+            logger.info(f"Worker {self.name} stopped")
+    
+    async def _process(self, comparator, job: Job) -> None:
+        """Run one job and store its outcome."""
+        logger.info(f"Worker {self.name} running {job.kind} job {job.job_id}: {job.query}")
+        try:
+            if job.kind == "compare":
+                job.result = await comparator.compare_prices(
+                    job.query, job.max_results, job.stores, locations=job.locations, fields=job.fields
+                )
+            else:
+                products = await comparator.search_all(
+                    job.query, job.max_results, stores=job.stores, locations=job.locations, fields=job.fields
+                )
+                fields = comparator.resolve_fields(job.fields)
+                job.result = [p.to_dict(fields) for p in products]
+            job.status = JOB_DONE
+        except Exception as e:
+            logger.error(f"Job {job.job_id} failed: {e}", exc_info=True)
+            job.status = JOB_FAILED
+            job.error = str(e)
+        
+        job.finished_at = time.time()
+        await asyncio.to_thread(self.backend.update, job)
+
+
+def _worker_main(
+    backend: JobBackend,
+    name: str,
+    concurrency: int,
+    browser_options: Optional[Dict] = None,
+    storage: Optional[Dict] = None,
+) -> None:
+    """Entry point of a worker process."""
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    worker = JobWorker(backend, name, concurrency, browser_options=browser_options, **(storage or {}))
+    try:
+        asyncio.run(worker.run())
+    except KeyboardInterrupt:
+        pass
+
+
+class WorkerPool:
+    """Start and stop a set of worker processes."""
+    
+    def __init__(
+        self,
+        backend: JobBackend,
+        workers: int = 2,
+        concurrency: int = 2,
+        browser_options: Optional[Dict] = None,
+        storage: Optional[Dict] = None,
+    ):
+        """
+        Initialize worker pool.
+        
+        Args:
+            backend: Job backend shared with the workers
+            workers: Number of worker processes
+            concurrency: Jobs processed at once per worker
+            browser_options: BrowserPool keyword arguments of each worker,
+                e.g. {"max_rss_mb": 2048}
+            storage: Result cache and sinks of each worker, as JobWorker
+                keyword arguments: cache_url, history_db, catalog_db
+        """
+        self.backend = backend
+        self.workers = workers
+        self.concurrency = concurrency
+        self.browser_options = browser_options
+        self.storage = storage
+        self.processes: List[multiprocessing.Process] = []
+    
+    def start(self) -> None:
+        """Spawn the worker processes."""
+        ctx = multiprocessing.get_context("spawn")
+        prefix = f"{os.uname().nodename}-{os.getpid()}"
+        for i in range(self.workers):
+            process = ctx.Process(
+                target=_worker_main,
+                args=(self.backend, f"{prefix}-{i}", self.concurrency, self.browser_options, self.storage),
+                daemon=True,
+            )
+            process.start()
+            self.processes.append(process)
+        logger.info(f"Started {self.workers} job workers")
+    
+    def stop(self, timeout: float = 10.0) -> None:
+        """Terminate the worker processes."""
+        for process in self.processes:
+            process.terminate()
+        for process in self.processes:
+            process.join(timeout)
+        self.processes = []
+
+
+def main():
+    """Run standalone job workers."""
+    parser = argparse.ArgumentParser(description="Run scrape job workers")
+    parser.add_argument(
+        "--backend",
+        default=os.environ.get("PRICE_API_JOB_BACKEND", "redis://localhost:6379/0"),
+        help="Job backend URL (default: redis://localhost:6379/0)"
+    )
+    parser.add_argument(
+        "-w", "--workers",
+        type=int,
+        default=2,
+        help="Number of worker processes (default: 2)"
+    )
+    parser.add_argument(
+        "-c", "--concurrency",
+        type=int,
+        default=2,
+        help="Jobs processed at once per worker (default: 2)"
+    )
+    parser.add_argument(
+        "--max-rss-mb",
+        type=float,
+        default=float(os.environ.get("PRICE_API_BROWSER_MAX_RSS_MB", "2048")),
+        help="Recycle a worker's Chromium above this RSS (default: 2048, 0 disables)"
+    )
+    parser.add_argument(
+        "--max-browser-pages",
+        type=int,
+        default=int(os.environ.get("PRICE_API_BROWSER_MAX_PAGES", "1000")),
+        help="Recycle a worker's Chromium after this many pages (default: 1000, 0 disables)"
+    )
+    parser.add_argument(
+        "--max-context-pages",
+        type=int,
+        default=int(os.environ.get("PRICE_API_CONTEXT_MAX_PAGES", "50")),
+        help="Recycle a reused browser context after this many pages (default: 50, 0 disables)"
+    )
+    parser.add_argument(
+        "--cache",
+        default=os.environ.get("PRICE_API_REDIS_URL"),
+        help="Redis URL of the API's result cache (default: $PRICE_API_REDIS_URL, else per worker)"
+    )
+    parser.add_argument(
+        "--history-db",
+        default=os.environ.get("PRICE_API_HISTORY_DB", "price_history.db"),
+        help="Price history database, empty to disable (default: price_history.db)"
+    )
+    parser.add_argument(
+        "--catalog-db",
+        default=os.environ.get("PRICE_API_CATALOG_DB", "product_catalog.db"),
+        help="Product catalog database, empty to disable (default: product_catalog.db)"
+    )
+    args = parser.parse_args()
+    
+    if args.backend.startswith("memory://"):
+        parser.error("memory:// workers only make sense inside the API server")
+    
+    logging.basicConfig(level=logging.INFO)
+    browser_options = {
+        "max_context_pages": args.max_context_pages or None,
+        "max_browser_pages": args.max_browser_pages or None,
+        "max_rss_mb": args.max_rss_mb or None,
+    }
+    storage = {
+        "cache_url": args.cache,
+        "history_db": args.history_db or None,
+        "catalog_db": args.catalog_db or None,
+    }
+    pool = WorkerPool(create_backend(args.backend), args.workers, args.concurrency, browser_options, storage)
+    pool.start()
+    try:
+        for process in pool.processes:
+            process.join()
+    except KeyboardInterrupt:
+        pool.stop()
+
+
+if __name__ == "__main__":
+    main()
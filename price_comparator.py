@@ -1,61 +1,325 @@
 """Price comparison engine."""
 
-from typing import List, Dict
+from typing import Iterable, List, Dict, Optional, Tuple, Union
 import asyncio
 import logging
-from scrapers import LeclercScraper, CarrefourScraper, IntermarcheScraper, Product
+import time
+from scrapers import Product
+from scrapers import BarcodeIndex, metrics, registry, tracing
+from scrapers.barcode import normalize_ean
+from scrapers.base import LOCATION_PATTERN
+from scrapers.fields import Fields, parse_fields
 
 logger = logging.getLogger(__name__)
 
+Locations = Union[str, Iterable[str], Dict[str, List[str]]]
+
+
+def parse_locations(locations: Optional[Locations]) -> Dict[str, List[str]]:
+    """
+    Parse a location selection into {store: [location, ...]}.
+    
+    Args:
+        locations: "store:location" entries, comma-separated or as a list
+            (e.g. "leclerc:drive-1,leclerc:drive-2"), or a dict of lists
+            
+    Returns:
+        Locations per normalized store name
+        
+    Raises:
+        ValueError: If an entry is malformed
+    """
+    if not locations:
+        return {}
+    if isinstance(locations, dict):
+        entries = [(store, location) for store, values in locations.items() for location in values]
+    else:
+        if isinstance(locations, str):
+            locations = locations.split(",")
+        entries = []
+        for entry in locations:
+            if not entry.strip():
+                continue
+            store, _, location = entry.partition(":")
+            if not location:
+                raise ValueError(f"Invalid location {entry!r} (expected store:location)")
+            entries.append((store, location))
+    
+    parsed: Dict[str, List[str]] = {}
+    for store, location in entries:
+        location = location.strip()
+        if not LOCATION_PATTERN.fullmatch(location):
+            raise ValueError(f"Invalid location: {location!r}")
+        values = parsed.setdefault(registry.normalize(store), [])
+        if location not in values:
+            values.append(location)
+    return parsed
+
 
 class PriceComparator:
     """Compare prices across multiple supermarkets."""
     
-    def __init__(self, cache_client=None):
+    def __init__(
+        self,
+        cache_client=None,
+        browser_pool=None,
+        sinks=None,
+        catalog=None,
+        scrapers=None,
+        stores=None,
+        locations=None,
+        fields=None,
+    ):
         """
         Initialize price comparator.
         
         Args:
             cache_client: Redis client (optional)
+            browser_pool: Shared BrowserPool so searches reuse a warm browser (optional)
+            sinks: Result sinks fed with every fresh scrape, e.g. PriceHistoryStore (optional)
+            catalog: ProductCatalog used for local search and as a fallback (optional);
+                it is also registered as a sink so it stays up to date
+            scrapers: Scrapers to use instead of the registered stores, e.g. stubs
+                for load testing (optional)
+            stores: Default store selection, e.g. "carrefour,leclerc" (default: all
+                registered stores); scrapers are imported and created on first use
+            locations: Default store locations, e.g. "leclerc:drive-1,leclerc:drive-2";
+                each location is searched in parallel with its own scraper
+                (default: each store's default location)
+            fields: Default product fields to extract, e.g. "name,price" (default:
+                all); the others are not scraped (see scrapers.fields)
         """
-        self.scrapers = [
-            LeclercScraper(cache_client),
-            CarrefourScraper(cache_client),
-            IntermarcheScraper(cache_client),
-        ]
+        self.cache_client = cache_client
+        self.browser_pool = browser_pool
+        self.catalog = catalog
+        # Latest product per barcode and store, filled by every fresh scrape
+        self.barcodes = BarcodeIndex()
+        sinks = list(sinks or [])
+        if catalog is not None and catalog not in sinks:
+            sinks.append(catalog)
+        sinks.append(self.barcodes)
+        self._options = {"browser_pool": browser_pool, "sinks": sinks}
+        
+        # (store name, location) -> scraper instance, filled on first use
+        self._scrapers: Dict[Tuple[str, Optional[str]], object] = {}
+        self._fixed = scrapers is not None
+        for scraper in scrapers or []:
+            scraper.sinks += [sink for sink in sinks if sink not in scraper.sinks]
+            key = (registry.normalize(scraper.store_name), getattr(scraper, "location", None))
+            self._scrapers[key] = scraper
+        if self._fixed:
+            self.stores = list(dict.fromkeys(name for name, _ in self._scrapers))
+        else:
+            self.stores = registry.available()
+        self.stores = self.resolve_stores(stores or None)
+        self.locations = parse_locations(locations)
+        self.fields = parse_fields(fields)
+    
+    @property
+    def scrapers(self) -> List:
+        """Scrapers of the default stores, created on first access."""
+        return self.get_scrapers()
+    
+    def resolve_stores(self, stores: Optional[Union[str, Iterable[str]]] = None) -> List[str]:
+        """
+        Validate a store selection.
+        
+        Args:
+            stores: Comma-separated string or list of store names (None: default stores)
+            
+        Returns:
+            Normalized store names
+            
+        Raises:
+            ValueError: If a store is unknown
+        """
+        if stores is None:
+            return self.stores
+        if not self._fixed:
+            return registry.resolve(stores)
+        
+        # Scrapers given explicitly: only those can be selected
+        if isinstance(stores, str):
+            stores = stores.split(",")
+        available = list(dict.fromkeys(name for name, _ in self._scrapers))
+        names = list(dict.fromkeys(registry.normalize(s) for s in stores if s.strip()))
+        unknown = [n for n in names if n not in available]
+        if unknown:
+            raise ValueError(f"Unknown store(s): {', '.join(unknown)} (available: {', '.join(available)})")
+        return names or available
+    
+    def get_scrapers(
+        self, stores: Optional[Union[str, Iterable[str]]] = None, locations: Optional[Locations] = None
+    ) -> List:
+        """
+        Scrapers for a store selection, imported and created on first use.
+        
+        Each location of a store gets its own scraper (own cookies and cache
+        keys); all of them share the browser pool and sinks.
+        
+        Args:
+            stores: Comma-separated string or list of store names (None: default stores)
+            locations: Locations to search, e.g. "leclerc:drive-1,leclerc:drive-2"
+                (None: default locations); stores without one use their default
+            
+        Returns:
+            List of scrapers
+            
+        Raises:
+            ValueError: If a store or location is unknown or malformed
+        """
+        locations = self.locations if locations is None else parse_locations(locations)
+        names = self.resolve_stores(stores)
+        unknown = [name for name in locations if name not in names]
+        if unknown:
+            raise ValueError(f"Location(s) given for unselected store(s): {', '.join(unknown)}")
+        
+        scrapers = []
+        for name in names:
+            for location in locations.get(name) or [None]:
+                key = (name, location)
+                scraper = self._scrapers.get(key)
+                if scraper is None:
+                    if self._fixed:
+                        raise ValueError(f"No scraper for {name} at location {location}")
+                    scraper = self._scrapers[key] = registry.create(
+                        name, self.cache_client, location=location, **self._options
+                    )
+                scrapers.append(scraper)
+        return scrapers
     
-    async def search_all(self, query: str, max_per_store: int = 10) -> List[Product]:
+    async def search_all(
+        self,
+        query: str,
+        max_per_store: int = 10,
+        store_timeout: Optional[float] = None,
+        fallback: bool = False,
+        stores: Optional[Union[str, Iterable[str]]] = None,
+        locations: Optional[Locations] = None,
+        fields: Optional[Union[str, Iterable[str]]] = None,
+    ) -> List[Product]:
         """
-        Search all stores in parallel.
+        Search all stores (and store locations) in parallel.
         
         Args:
             query: Search query
             max_per_store: Maximum results per store
+            store_timeout: Seconds to wait for each store (optional); a timed-out
+                scrape keeps running in the background and still fills the cache
+            fallback: Answer from the local catalog for stores that fail,
+                time out or return nothing
+            stores: Stores to search, e.g. "carrefour,leclerc" (default: all)
+            locations: Store locations to search, e.g. "leclerc:drive-1,leclerc:drive-2"
+            fields: Product fields to extract, e.g. "name,price" (default: the
+                comparator's, else all)
             
         Returns:
             List of all products from all stores
+            
+        Raises:
+            ValueError: If a field is unknown
         """
-        logger.info(f"Searching '{query}' across {len(self.scrapers)} stores...")
+        scrapers = self.get_scrapers(stores, locations)
+        fields = self.resolve_fields(fields)
+        logger.info(f"Searching '{query}' across {len(scrapers)} stores...")
+        start = time.perf_counter()
         
         # Run all scrapers in parallel
         tasks = [
-            scraper.search_with_cache(query, max_per_store)
-            for scraper in self.scrapers
+            self._search_store(scraper, query, max_per_store, store_timeout, fields)
+            for scraper in scrapers
         ]
         
-        results = await asyncio.gather(*tasks, return_exceptions=True)
+        with tracing.span("search_all", query=query, stores=len(tasks)):
+            results = await asyncio.gather(*tasks, return_exceptions=True)
         
         # Flatten results and filter errors
         all_products = []
-        for i, result in enumerate(results):
-            if isinstance(result, Exception):
-                logger.error(f"Scraper {self.scrapers[i].store_name} failed: {result}")
+        for scraper, result in zip(scrapers, results):
+            store = scraper.store_name
+            location = getattr(scraper, "location", None)
+            if isinstance(result, asyncio.TimeoutError):
+                logger.error(f"Scraper {store} timed out")
+                metrics.STORE_RESULTS.inc(store=store, outcome="timeout")
+                result = []
+            elif isinstance(result, Exception):
+                logger.error(f"Scraper {store} failed: {result!r}")
+                metrics.STORE_RESULTS.inc(store=store, outcome="error")
+                result = []
             else:
-                all_products.extend(result)
+                metrics.STORE_RESULTS.inc(store=store, outcome="ok" if result else "empty")
+            
+            if not result and fallback and self.catalog is not None:
+                with tracing.span("catalog_fallback", store=store):
+                    result = await asyncio.to_thread(
+                        self.catalog.search, query, store, max_per_store, location or ""
+                    )
+                if result:
+                    metrics.CACHE_REQUESTS.inc(store=store, tier="catalog", result="stale")
+                    logger.info(
+                        f"Served {len(result)} {store} products from the local catalog"
+                    )
+                else:
+                    metrics.CACHE_REQUESTS.inc(store=store, tier="catalog", result="miss")
+            
+            all_products.extend(result)
+        
+        metrics.SEARCH_DURATION.observe(time.perf_counter() - start)
         
         logger.info(f"Found {len(all_products)} total products")
         return all_products
     
+    def resolve_fields(self, fields: Optional[Union[str, Iterable[str]]] = None) -> Fields:
+        """Parse a field selection, defaulting to the comparator's."""
+        return parse_fields(fields) if fields is not None else self.fields
+    
+    async def _search_store(
+        self,
+        scraper,
+        query: str,
+        max_per_store: int,
+        store_timeout: Optional[float],
+        fields: Fields = None,
+    ) -> List[Product]:
+        """Search one store, optionally bounded by a timeout."""
+        with tracing.span("store", store=scraper.store_name, location=getattr(scraper, "location", None)):
+            search = scraper.search_with_cache(query, max_per_store, fields)
+            if store_timeout is None:
+                return await search
+            return await asyncio.wait_for(asyncio.shield(asyncio.ensure_future(search)), store_timeout)
+    
+    async def search_local(
+        self,
+        query: str,
+        max_per_store: int = 10,
+        stores: Optional[Union[str, Iterable[str]]] = None,
+        locations: Optional[Locations] = None,
+    ) -> List[Product]:
+        """
+        Search the local catalog only (no scraping).
+        
+        Args:
+            query: Search query
+            max_per_store: Maximum results per store location
+            stores: Stores to search (default: all)
+            locations: Locations to search, e.g. "leclerc:drive-1,leclerc:drive-2"
+                (None: default locations), like search_all()
+            
+        Returns:
+            Most recently known products, tagged with source "catalog"
+        """
+        if self.catalog is None:
+            return []
+        
+        all_products = []
+        for scraper in self.get_scrapers(stores, locations):
+            all_products.extend(
+                await asyncio.to_thread(
+                    self.catalog.search, query, scraper.store_name, max_per_store, location=scraper.location or ""
+                )
+            )
+        return all_products
+    
     def find_best_price(self, products: List[Product]) -> Dict:
         """
         Find the best price among products.
@@ -69,10 +333,13 @@ class PriceComparator:
         if not products:
             return None
         
-        # Group by approximate name (case-insensitive, stripped)
+        # Group by barcode when known (names differ between stores), else by
+        # approximate name (case-insensitive, stripped)
+        ean_by_name = {p.name.lower().strip(): p.ean for p in products if p.ean}
         by_name = {}
         for p in products:
-            key = p.name.lower().strip()
+            name = p.name.lower().strip()
+            key = p.ean or ean_by_name.get(name) or name
             if key not in by_name:
                 by_name[key] = []
             by_name[key].append(p)
@@ -91,10 +358,13 @@ class PriceComparator:
                 "name": cheapest.name,
                 "best_price": cheapest.price,
                 "best_store": cheapest.store,
+                "best_location": cheapest.location,
                 "url": cheapest.url,
+                "ean": next((p.ean for p in sorted_group if p.ean), None),
                 "all_prices": [
                     {
                         "store": p.store,
+                        "location": p.location,
                         "price": p.price,
                         "unit": p.unit,
                         "url": p.url,
@@ -113,19 +383,32 @@ class PriceComparator:
         
         return best_deals
     
-    async def compare_prices(self, query: str, max_per_store: int = 5) -> Dict:
+    async def compare_prices(
+        self,
+        query: str,
+        max_per_store: int = 5,
+        stores: Optional[Union[str, Iterable[str]]] = None,
+        locations: Optional[Locations] = None,
+        fields: Optional[Union[str, Iterable[str]]] = None,
+    ) -> Dict:
         """
         Compare prices for a query across all stores.
         
         Args:
             query: Search query
             max_per_store: Maximum results per store
+            stores: Stores to compare, e.g. "carrefour,leclerc" (default: all)
+            locations: Store locations to compare, e.g. "leclerc:drive-1,leclerc:drive-2"
+            fields: Product fields to extract, e.g. "name,price,ean"; deals
+                carry None for the others (default: the comparator's, else all)
             
         Returns:
             Comparison results with best deals
         """
         # Search all stores
-        products = await self.search_all(query, max_per_store)
+        products = await self.search_all(
+            query, max_per_store, stores=stores, locations=locations, fields=fields
+        )
         
         if not products:
             return {
@@ -135,7 +418,8 @@ class PriceComparator:
             }
         
         # Find best prices
-        best_deals = self.find_best_price(products)
+        with tracing.span("find_best_price", products=len(products)):
+            best_deals = self.find_best_price(products)
         
         return {
             "query": query,
@@ -143,6 +427,115 @@ class PriceComparator:
             "stores_searched": list(set(p.store for p in products)),
             "best_deals": best_deals,
         }
+    
+    async def compare_barcode(
+        self,
+        ean: str,
+        max_per_store: int = 5,
+        stores: Optional[Union[str, Iterable[str]]] = None,
+        locations: Optional[Locations] = None,
+        max_age: float = 3600.0,
+    ) -> Dict:
+        """
+        Compare the prices of one product identified by its barcode.
+        
+        Each store is answered from the barcode index when it saw the product
+        less than max_age seconds ago, else searched live with the EAN as query
+        (keeping exact barcode matches only), else from the local catalog.
+        
+        Args:
+            ean: EAN-13, EAN-8, UPC-A or GTIN-14 barcode
+            max_per_store: Maximum results per store of live searches
+            stores: Stores to compare (default: all)
+            locations: Store locations to compare
+            max_age: Seconds an indexed price stays usable
+            
+        Returns:
+            Comparison results like compare_prices(), with the barcode
+            
+        Raises:
+            ValueError: If the barcode is invalid
+        """
+        normalized = normalize_ean(ean)
+        if normalized is None:
+            raise ValueError(f"Invalid barcode: {ean}")
+        scrapers = self.get_scrapers(stores, locations)
+        # Live matches are recognized by their barcode, whatever the default fields
+        fields = self.fields | {"ean"} if self.fields is not None else None
+        
+        def index_key(store: str, location: Optional[str]) -> str:
+            return f"{store}@{location}" if location else store
+        
+        known = {
+            index_key(p.store, p.location): p
+            for p in self.barcodes.lookup(normalized)
+            if p.age_seconds() < max_age
+        }
+        products = []
+        missing = []
+        for scraper in scrapers:
+            product = known.get(index_key(scraper.store_name, getattr(scraper, "location", None)))
+            if product is not None:
+                products.append(product)
+            else:
+                missing.append(scraper)
+        
+        if missing:
+            with tracing.span("barcode_search", ean=normalized, stores=len(missing)):
+                results = await asyncio.gather(
+                    *(self._search_store(s, normalized, max_per_store, None, fields) for s in missing),
+                    return_exceptions=True,
+                )
+            for scraper, result in zip(missing, results):
+                if isinstance(result, Exception):
+                    logger.error(f"Barcode search on {scraper.store_name} failed: {result!r}")
+                    result = []
+                matches = [p for p in result if p.ean == normalized]
+                if not matches and self.catalog is not None:
+                    matches = await asyncio.to_thread(
+                        self.catalog.lookup_ean, normalized, scraper.store_name, scraper.location or ""
+                    )
+                products.extend(matches[:1])
+        
+        with tracing.span("find_best_price", products=len(products)):
+            best_deals = self.find_best_price(products) or []
+        return {
+            "query": normalized,
+            "ean": normalized,
+            "total_products": len(products),
+            "stores_searched": list(set(p.store for p in products)),
+            "best_deals": best_deals,
+        }
+    
+    def active_scrapers(self) -> List:
+        """Scrapers created so far, of every store and location (none is created here)."""
+        return list(self._scrapers.values())
+    
+    def session_stats(self) -> Dict[str, Dict]:
+        """Challenge rate and warm browser sessions of each store searched so far."""
+        return {
+            scraper.cache_namespace: scraper.warm_sessions.stats()
+            for scraper in self._scrapers.values()
+            if hasattr(scraper, "warm_sessions")
+        }
+    
+    def selector_stats(self):
+        """SelectorStats instances used by the scrapers created so far."""
+        stats = {}
+        for scraper in self._scrapers.values():
+            if getattr(scraper, "selector_stats", None) is not None:
+                stats[id(scraper.selector_stats)] = scraper.selector_stats
+        return list(stats.values())
+    
+    async def close(self) -> None:
+        """Save selector statistics, release the warm sessions and the shared browser pool, if any."""
+        for stats in self.selector_stats():
+            await asyncio.to_thread(stats.save)
+        if self.browser_pool is not None:
+            for scraper in self._scrapers.values():
+                if hasattr(scraper, "warm_sessions"):
+                    await scraper.warm_sessions.close()
+            await self.browser_pool.close()
 
 
 async def main():
@@ -170,7 +563,8 @@ async def main():
         if len(deal['all_prices']) > 1:
             print(f"   📊 Other prices:")
             for price in deal['all_prices'][1:]:
-                print(f"      • {price['store']}: {price['price']:.2f}€")
+                store = f"{price['store']} @ {price['location']}" if price['location'] else price['store']
+                print(f"      • {store}: {price['price']:.2f}€")
         print()
 
 
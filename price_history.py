@@ -0,0 +1,263 @@
+"""Append-only price history store backed by SQLite.
+
+Fresh scrapes are queued by ``add()`` (called from
+``BaseScraper.search_with_cache`` as a result sink) and written by a
+background thread in batches. A row is only appended when a product's price
+differs from its last recorded price, so hourly refreshes of stable prices
+do not grow the table. Each store location (e.g. a Leclerc drive) has its
+own series; "" stands for a store's default location.
+"""
+
+from typing import Dict, List, Optional
+import logging
+import sqlite3
+from datetime import datetime
+from sqlite_sink import SQLiteSink, product_key, to_timestamp
+
+logger = logging.getLogger(__name__)
+
+LATEST_PRICE_TABLE = """
+CREATE TABLE IF NOT EXISTS {table} (
+    store TEXT NOT NULL COLLATE NOCASE,
+    location TEXT NOT NULL DEFAULT '',
+    product_key TEXT NOT NULL,
+    price REAL NOT NULL,
+    first_seen REAL NOT NULL,
+    last_seen REAL NOT NULL,
+    PRIMARY KEY (store, location, product_key)
+) WITHOUT ROWID;
+"""
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS price_history (
+    id INTEGER PRIMARY KEY,
+    store TEXT NOT NULL COLLATE NOCASE,
+    location TEXT NOT NULL DEFAULT '',
+    product_key TEXT NOT NULL,
+    name TEXT NOT NULL,
+    price REAL NOT NULL,
+    unit_price REAL,
+    unit_label TEXT,
+    url TEXT,
+    observed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_history_product_time
+    ON price_history (product_key, observed_at);
+CREATE INDEX IF NOT EXISTS idx_history_store_time
+    ON price_history (store, observed_at);
+""" + LATEST_PRICE_TABLE.format(table="latest_price")
+
+
+class PriceHistoryStore(SQLiteSink):
+    """SQLite price history with a batched asynchronous writer."""
+
+    SCHEMA = SCHEMA
+
+    def __init__(
+        self,
+        path: str = "price_history.db",
+        batch_size: int = 500,
+        flush_interval: float = 2.0,
+    ):
+        """
+        Initialize history store and start its writer thread.
+
+        Args:
+            path: SQLite database file
+            batch_size: Rows buffered before a write transaction
+            flush_interval: Maximum seconds a row waits before being written
+        """
+        self.rows_written = 0
+        self.rows_deduplicated = 0
+        super().__init__(path, batch_size, flush_interval)
+
+    def _migrate(self, conn: sqlite3.Connection) -> None:
+        columns = [r[1] for r in conn.execute("PRAGMA table_info(price_history)")]
+        if columns and "location" not in columns:
+            # Rows recorded so far are attributed to the default location;
+            # latest_price gets a new primary key, so it is rebuilt
+            logger.info(f"Migrating {self.path}: adding store locations")
+            with conn:
+                conn.execute("ALTER TABLE price_history ADD COLUMN location TEXT NOT NULL DEFAULT ''")
+                conn.execute(LATEST_PRICE_TABLE.format(table="latest_price_new"))
+                conn.execute(
+                    "INSERT INTO latest_price_new (store, product_key, price, first_seen, last_seen) "
+                    "SELECT store, product_key, price, first_seen, last_seen FROM latest_price"
+                )
+                conn.execute("DROP TABLE latest_price")
+                conn.execute("ALTER TABLE latest_price_new RENAME TO latest_price")
+
+    def _row(self, p) -> tuple:
+        return (
+            p.store,
+            p.location or "",
+            product_key(p.name),
+            p.name,
+            p.price,
+            p.unit_price,
+            p.unit_label,
+            p.url,
+            to_timestamp(p.scraped_at),
+        )
+
+    def _write_batch(self, conn: sqlite3.Connection, batch: List[tuple]) -> None:
+        """Append changed prices and refresh last-seen times in one transaction."""
+        written = 0
+        with conn:
+            for row in batch:
+                store, location, key, _, price, _, _, _, observed_at = row
+                latest = conn.execute(
+                    "SELECT price FROM latest_price WHERE store = ? AND location = ? AND product_key = ?",
+                    (store, location, key),
+                ).fetchone()
+
+                if latest is not None and latest["price"] == price:
+                    conn.execute(
+                        "UPDATE latest_price SET last_seen = MAX(last_seen, ?) "
+                        "WHERE store = ? AND location = ? AND product_key = ?",
+                        (observed_at, store, location, key),
+                    )
+                    continue
+
+                conn.execute(
+                    "INSERT INTO price_history "
+                    "(store, location, product_key, name, price, unit_price, unit_label, url, observed_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    row,
+                )
+                conn.execute(
+                    "INSERT INTO latest_price (store, location, product_key, price, first_seen, last_seen) "
+                    "VALUES (?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT (store, location, product_key) DO UPDATE SET "
+                    "price = excluded.price, first_seen = excluded.first_seen, "
+                    "last_seen = excluded.last_seen",
+                    (store, location, key, price, observed_at, observed_at),
+                )
+                written += 1
+
+        self.rows_written += written
+        self.rows_deduplicated += len(batch) - written
+        logger.debug(f"History batch: {written} written, {len(batch) - written} unchanged")
+
+    def product_history(
+        self,
+        product: str,
+        store: Optional[str] = None,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+        limit: int = 1000,
+        location: Optional[str] = None,
+    ) -> List[Dict]:
+        """
+        Return price changes for one product, oldest first.
+
+        Args:
+            product: Product name (matched after normalization)
+            store: Restrict to one store (optional)
+            since: Unix timestamp lower bound (optional)
+            until: Unix timestamp upper bound (optional)
+            limit: Maximum rows returned (the most recent ones)
+            location: Restrict to one store location ("" for the default
+                location, None for all)
+
+        Returns:
+            List of history rows
+        """
+        sql = (
+            "SELECT * FROM price_history INDEXED BY idx_history_product_time "
+            "WHERE product_key = ?"
+        )
+        params: list = [product_key(product)]
+        if store:
+            sql += " AND store = ?"
+            params.append(store)
+        if location is not None:
+            sql += " AND location = ?"
+            params.append(location)
+        return self._range_query(sql, params, since, until, limit)
+
+    def store_history(
+        self,
+        store: str,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+        limit: int = 1000,
+        location: Optional[str] = None,
+    ) -> List[Dict]:
+        """
+        Return price changes recorded for a store, oldest first.
+
+        Args:
+            store: Store name (case-insensitive)
+            since: Unix timestamp lower bound (optional)
+            until: Unix timestamp upper bound (optional)
+            limit: Maximum rows returned (the most recent ones)
+            location: Restrict to one store location ("" for the default
+                location, None for all)
+
+        Returns:
+            List of history rows
+        """
+        sql = "SELECT * FROM price_history INDEXED BY idx_history_store_time WHERE store = ?"
+        params: list = [store]
+        if location is not None:
+            sql += " AND location = ?"
+            params.append(location)
+        return self._range_query(
+            sql,
+            params,
+            since,
+            until,
+            limit,
+        )
+
+    def _range_query(
+        self, sql: str, params: list, since: Optional[float], until: Optional[float], limit: int
+    ) -> List[Dict]:
+        """Apply the time range to an indexed prefix query and run it."""
+        if since is not None:
+            sql += " AND observed_at >= ?"
+            params.append(since)
+        if until is not None:
+            sql += " AND observed_at < ?"
+            params.append(until)
+        # Latest rows first, so a long history keeps its current price
+        sql += " ORDER BY observed_at DESC LIMIT ?"
+        params.append(limit)
+
+        rows = self._query(sql, params)[::-1]
+        return [
+            {
+                "store": r["store"],
+                "location": r["location"] or None,
+                "name": r["name"],
+                "price": r["price"],
+                "unit_price": r["unit_price"],
+                "unit_label": r["unit_label"],
+                "url": r["url"],
+                "observed_at": datetime.fromtimestamp(r["observed_at"]).isoformat(),
+            }
+            for r in rows
+        ]
+
+
+def summarize_history(rows: List[Dict]) -> Dict[str, Dict]:
+    """
+    Summarize history rows per store location (current, lowest and highest price).
+
+    Args:
+        rows: Rows from product_history(), oldest first
+
+    Returns:
+        Mapping of store name (store@location for other than the default
+        location) to price summary
+    """
+    summary: Dict[str, Dict] = {}
+    for row in rows:
+        key = f"{row['store']}@{row['location']}" if row.get("location") else row["store"]
+        s = summary.setdefault(key, {"min": row["price"], "max": row["price"]})
+        s["min"] = min(s["min"], row["price"])
+        s["max"] = max(s["max"], row["price"])
+        s["current"] = row["price"]
+        s["since"] = row["observed_at"]
+    return summary
@@ -0,0 +1,256 @@
+"""Local product catalog with full-text search.
+
+Every fresh scrape is upserted into a SQLite table indexed with FTS5
+(``unicode61`` tokenizer with diacritics removed, so "creme" matches
+"crème"). The catalog answers searches in milliseconds from the most recent
+known prices and serves as a fallback when live scrapes fail or time out.
+Products with a barcode are also indexed by EAN, to find the same product
+in every store (lookup_ean()). Each store location (e.g. a Leclerc drive) has
+its own prices; "" stands for a store's default location.
+"""
+
+from datetime import datetime
+from typing import List, Optional
+import logging
+import re
+import sqlite3
+from scrapers.base import Product
+from sqlite_sink import SQLiteSink, product_key, to_timestamp
+
+logger = logging.getLogger(__name__)
+
+CATALOG_TABLE = """
+CREATE TABLE IF NOT EXISTS {table} (
+    id INTEGER PRIMARY KEY,
+    store TEXT NOT NULL COLLATE NOCASE,
+    location TEXT NOT NULL DEFAULT '',
+    product_key TEXT NOT NULL,
+    name TEXT NOT NULL,
+    brand TEXT,
+    price REAL NOT NULL,
+    unit TEXT,
+    url TEXT,
+    image_url TEXT,
+    category TEXT,
+    unit_price REAL,
+    unit_label TEXT,
+    scraped_at REAL NOT NULL,
+    ean TEXT,
+    UNIQUE (store, location, product_key)
+);
+"""
+
+SCHEMA = CATALOG_TABLE.format(table="catalog") + """
+CREATE INDEX IF NOT EXISTS catalog_ean ON catalog (ean) WHERE ean IS NOT NULL;
+CREATE VIRTUAL TABLE IF NOT EXISTS catalog_fts USING fts5(
+    name, brand,
+    content='catalog', content_rowid='id',
+    tokenize='unicode61 remove_diacritics 2'
+);
+CREATE TRIGGER IF NOT EXISTS catalog_ai AFTER INSERT ON catalog BEGIN
+    INSERT INTO catalog_fts (rowid, name, brand) VALUES (new.id, new.name, new.brand);
+END;
+CREATE TRIGGER IF NOT EXISTS catalog_ad AFTER DELETE ON catalog BEGIN
+    INSERT INTO catalog_fts (catalog_fts, rowid, name, brand)
+    VALUES ('delete', old.id, old.name, old.brand);
+END;
+CREATE TRIGGER IF NOT EXISTS catalog_au AFTER UPDATE ON catalog BEGIN
+    INSERT INTO catalog_fts (catalog_fts, rowid, name, brand)
+    VALUES ('delete', old.id, old.name, old.brand);
+    INSERT INTO catalog_fts (rowid, name, brand) VALUES (new.id, new.name, new.brand);
+END;
+"""
+
+
+def fts_query(query: str) -> Optional[str]:
+    """
+    Turn a free-text query into an FTS5 expression.
+
+    Every word must match, as a prefix, so "poul fermi" finds "Poulet fermier".
+
+    Args:
+        query: User search query
+
+    Returns:
+        FTS5 MATCH expression, or None if the query has no words
+    """
+    words = re.findall(r"\w+", query)
+    if not words:
+        return None
+    return " ".join(f'"{w}"*' for w in words)
+
+
+class ProductCatalog(SQLiteSink):
+    """Incrementally updated full-text index of scraped products."""
+
+    SCHEMA = SCHEMA
+
+    def __init__(
+        self,
+        path: str = "product_catalog.db",
+        batch_size: int = 500,
+        flush_interval: float = 1.0,
+    ):
+        """
+        Initialize catalog and start its writer thread.
+
+        Args:
+            path: SQLite database file
+            batch_size: Rows buffered before a write transaction
+            flush_interval: Maximum seconds a row waits before being indexed
+        """
+        super().__init__(path, batch_size, flush_interval)
+
+    def _migrate(self, conn: sqlite3.Connection) -> None:
+        columns = [r[1] for r in conn.execute("PRAGMA table_info(catalog)")]
+        if columns and "ean" not in columns:
+            conn.execute("ALTER TABLE catalog ADD COLUMN ean TEXT")
+            columns.append("ean")
+        if columns and "location" not in columns:
+            # The unique key changes, so the table is rebuilt; ids are kept, so
+            # the full-text index stays valid (triggers and indexes are
+            # dropped with the old table and recreated by SCHEMA)
+            logger.info(f"Migrating {self.path}: adding store locations")
+            with conn:
+                conn.execute(CATALOG_TABLE.format(table="catalog_new"))
+                conn.execute(
+                    f"INSERT INTO catalog_new ({', '.join(columns)}) SELECT {', '.join(columns)} FROM catalog"
+                )
+                conn.execute("DROP TABLE catalog")
+                conn.execute("ALTER TABLE catalog_new RENAME TO catalog")
+
+    def _row(self, p) -> tuple:
+        return (
+            p.store,
+            p.location or "",
+            product_key(p.name),
+            p.name,
+            p.brand,
+            p.price,
+            p.unit,
+            p.url,
+            p.image_url,
+            p.category,
+            p.unit_price,
+            p.unit_label,
+            to_timestamp(p.scraped_at),
+            p.ean,
+        )
+
+    def _write_batch(self, conn: sqlite3.Connection, batch: List[tuple]) -> None:
+        """
+        Upsert products, keeping the most recently scraped version.
+
+        Searches restricted to a few fields (see scrapers.fields) leave the
+        others None, so known values are kept for those.
+        """
+        with conn:
+            conn.executemany(
+                "INSERT INTO catalog (store, location, product_key, name, brand, price, unit, url, "
+                "image_url, category, unit_price, unit_label, scraped_at, ean) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (store, location, product_key) DO UPDATE SET "
+                "name = excluded.name, brand = COALESCE(excluded.brand, catalog.brand), "
+                "price = excluded.price, unit = COALESCE(excluded.unit, catalog.unit), "
+                "url = COALESCE(excluded.url, catalog.url), "
+                "image_url = COALESCE(excluded.image_url, catalog.image_url), "
+                "category = excluded.category, "
+                "unit_price = COALESCE(excluded.unit_price, catalog.unit_price), "
+                "unit_label = COALESCE(excluded.unit_label, catalog.unit_label), "
+                "scraped_at = excluded.scraped_at, "
+                "ean = COALESCE(excluded.ean, catalog.ean) "
+                "WHERE excluded.scraped_at >= catalog.scraped_at",
+                batch,
+            )
+        logger.debug(f"Indexed {len(batch)} products")
+
+    def search(
+        self, query: str, store: Optional[str] = None, limit: int = 10, location: Optional[str] = None
+    ) -> List[Product]:
+        """
+        Search the catalog.
+
+        Args:
+            query: Free-text query (accent and case insensitive)
+            store: Restrict to one store (optional)
+            limit: Maximum results
+            location: Restrict to one location of the store ("" for its
+                default location, None for all)
+
+        Returns:
+            Products ranked by relevance, carrying their original scrape time
+        """
+        expression = fts_query(query)
+        if expression is None:
+            return []
+
+        sql = (
+            "SELECT c.* FROM catalog_fts JOIN catalog c ON c.id = catalog_fts.rowid "
+            "WHERE catalog_fts MATCH ?"
+        )
+        params: list = [expression]
+        if store:
+            sql += " AND c.store = ?"
+            params.append(store)
+        if location is not None:
+            sql += " AND c.location = ?"
+            params.append(location)
+        sql += " ORDER BY bm25(catalog_fts) LIMIT ?"
+        params.append(limit)
+
+        return self._products(self._query(sql, params))
+
+    def lookup_ean(self, ean: str, store: Optional[str] = None, location: Optional[str] = None) -> List[Product]:
+        """
+        Products with a barcode, one per store location.
+
+        Args:
+            ean: Normalized EAN (see scrapers.barcode.normalize_ean)
+            store: Restrict to one store (optional)
+            location: Restrict to one location of the store ("" for its
+                default location, None for all)
+
+        Returns:
+            Most recently scraped product of each store location, cheapest first
+        """
+        sql = "SELECT * FROM catalog WHERE ean = ?"
+        params: list = [ean]
+        if store:
+            sql += " AND store = ?"
+            params.append(store)
+        if location is not None:
+            sql += " AND location = ?"
+            params.append(location)
+        latest = {}
+        for row in self._query(sql, params):
+            key = (row["store"].lower(), row["location"])
+            if key not in latest or row["scraped_at"] > latest[key]["scraped_at"]:
+                latest[key] = row
+        return self._products(sorted(latest.values(), key=lambda r: r["price"]))
+
+    def _products(self, rows: List[sqlite3.Row]) -> List[Product]:
+        """Rows to products tagged with source "catalog"."""
+        products = []
+        for r in rows:
+            product = Product(
+                name=r["name"],
+                price=r["price"],
+                unit=r["unit"],
+                store=r["store"],
+                url=r["url"],
+                image_url=r["image_url"],
+                brand=r["brand"],
+                category=r["category"],
+                unit_price=r["unit_price"],
+                unit_label=r["unit_label"],
+                scraped_at=datetime.fromtimestamp(r["scraped_at"]).isoformat(),
+                location=r["location"] or None,
+                ean=r["ean"],
+            )
+            product.source = "catalog"
+            products.append(product)
+        return products
+
+    def count(self) -> int:
+        """Number of products in the catalog."""
+        return self._query("SELECT COUNT(*) FROM catalog")[0][0]
@@ -0,0 +1,182 @@
+"""On-demand CPU profiling of API requests and CLI runs.
+
+Two profilers are available:
+- ``sample``: a background thread samples the profiled thread's stack every
+  few milliseconds and writes collapsed stacks (``.folded``, readable by
+  flamegraph.pl and speedscope). Overhead is bounded by the sampling interval.
+- ``cprofile``: deterministic cProfile, written as ``.pstats``
+  (``python -m pstats``, snakeviz). Exact call counts, higher overhead.
+
+Both profile the whole thread, so for the API server they include whatever
+else the event loop ran during the request. A ProfileLimiter keeps
+production overhead bounded: one profile at a time, N per hour.
+"""
+
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Iterator, Optional
+import cProfile
+import logging
+import os
+import re
+import sys
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+SAMPLE = "sample"
+CPROFILE = "cprofile"
+MODES = (SAMPLE, CPROFILE)
+
+MIN_INTERVAL = 0.001  # fastest allowed sampling, in seconds
+DEFAULT_INTERVAL = 0.005
+MAX_SECONDS = 120.0  # samplers stop on their own after this long
+
+
+class SamplingProfiler:
+    """Periodically capture one thread's Python stack and count the stacks."""
+
+    def __init__(
+        self,
+        interval: float = DEFAULT_INTERVAL,
+        thread_id: Optional[int] = None,
+        max_seconds: float = MAX_SECONDS,
+    ):
+        """
+        Initialize profiler.
+
+        Args:
+            interval: Seconds between samples (at least MIN_INTERVAL)
+            thread_id: Thread to sample (default: the calling thread)
+            max_seconds: Stop sampling after this long
+        """
+        self.interval = max(interval, MIN_INTERVAL)
+        self.thread_id = thread_id or threading.get_ident()
+        self.max_seconds = max_seconds
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+
+    def _run(self) -> None:
+        deadline = time.monotonic() + self.max_seconds
+        while not self._stop.wait(self.interval):
+            if time.monotonic() > deadline:
+                logger.warning(f"Sampling profiler stopped after {self.max_seconds:.0f}s")
+                return
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            self.stacks[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+    def collapsed(self) -> str:
+        """Stacks in collapsed format: "root;caller;callee count" per line."""
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+class ProfileLimiter:
+    """Allow one profile at a time and at most per_hour profiles per hour."""
+
+    def __init__(self, per_hour: int = 12):
+        self.per_hour = per_hour
+        self.tokens = float(per_hour)
+        self._updated = time.monotonic()
+        self._busy = False
+        self._lock = threading.Lock()
+
+    def acquire(self) -> bool:
+        """Reserve a profile slot; False if one is running or the budget is spent."""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.per_hour, self.tokens + (now - self._updated) * self.per_hour / 3600)
+            self._updated = now
+            if self._busy or self.tokens < 1:
+                return False
+            self.tokens -= 1
+            self._busy = True
+            return True
+
+    def release(self) -> None:
+        with self._lock:
+            self._busy = False
+
+
+class ProfileResult:
+    """Where a profile was written, filled in when profiling stops."""
+
+    def __init__(self, mode: str):
+        self.mode = mode
+        self.path: Optional[Path] = None
+        self.samples: Optional[int] = None
+        self.duration: Optional[float] = None
+
+
+@contextmanager
+def profile(
+    mode: str = SAMPLE,
+    name: str = "profile",
+    output_dir: str = "profiles",
+    interval: float = DEFAULT_INTERVAL,
+) -> Iterator[ProfileResult]:
+    """
+    Profile the calling thread for the duration of the block.
+
+    Args:
+        mode: "sample" (collapsed stacks) or "cprofile" (pstats)
+        name: Used in the output file name, e.g. the request path or query
+        output_dir: Directory receiving the profile
+        interval: Sampling interval in seconds (sample mode)
+
+    Yields:
+        ProfileResult whose path is set once the block exits
+    """
+    if mode not in MODES:
+        raise ValueError(f"Unknown profile mode: {mode} (expected one of {', '.join(MODES)})")
+
+    result = ProfileResult(mode)
+    sampler = SamplingProfiler(interval) if mode == SAMPLE else None
+    deterministic = cProfile.Profile() if mode == CPROFILE else None
+    start = time.perf_counter()
+    if sampler:
+        sampler.start()
+    else:
+        deterministic.enable()
+    try:
+        yield result
+    finally:
+        if sampler:
+            sampler.stop()
+        else:
+            deterministic.disable()
+        result.duration = time.perf_counter() - start
+
+        directory = Path(output_dir)
+        directory.mkdir(parents=True, exist_ok=True)
+        slug = re.sub(r"[^\w]+", "-", name.lower()).strip("-") or "profile"
+        stem = f"{datetime.now():%Y%m%d-%H%M%S-%f}-{slug}"
+        if sampler:
+            result.samples = sampler.samples
+            result.path = directory / f"{stem}.folded"
+            result.path.write_text(sampler.collapsed())
+        else:
+            result.path = directory / f"{stem}.pstats"
+            deterministic.dump_stats(result.path)
+        logger.info(f"Wrote {mode} profile ({result.duration:.2f}s) to {result.path}")
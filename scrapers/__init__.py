@@ -1,14 +1,40 @@
-"""Scrapers package initialization."""
+"""Scrapers package initialization.
 
+Store scrapers are imported on first access (see scrapers.registry), so
+importing the package does not load Playwright.
+"""
+
+from .barcode import BarcodeIndex
 from .base import BaseScraper, Product
-from .leclerc import LeclercScraper
-from .carrefour import CarrefourScraper
-from .intermarche import IntermarcheScraper
+from .browser import BrowserPool
+from .challenge import ChallengeDetected
+
+# Lazily imported attribute -> "module:Class"
+_LAZY = {
+    "LeclercScraper": "scrapers.leclerc:LeclercScraper",
+    "CarrefourScraper": "scrapers.carrefour:CarrefourScraper",
+    "IntermarcheScraper": "scrapers.intermarche:IntermarcheScraper",
+}
 
 __all__ = [
     "BaseScraper",
     "Product",
+    "BarcodeIndex",
+    "BrowserPool",
+    "ChallengeDetected",
     "LeclercScraper",
     "CarrefourScraper",
     "IntermarcheScraper",
 ]
+
+
+def __getattr__(name):
+    target = _LAZY.get(name)
+    if target is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    from importlib import import_module
+
+    module, _, attribute = target.partition(":")
+    value = getattr(import_module(module), attribute)
+    globals()[name] = value
+    return value
@@ -0,0 +1,117 @@
+"""EAN/GTIN barcodes: validation, extraction and a barcode-keyed index.
+
+The same product has the same EAN in every store, so a barcode match is
+exact where name matching is fuzzy. Stores expose it in tile attributes
+(data-ean, data-gtin) or at the end of product URLs
+(".../fp/lait-demi-ecreme-3560070894222"); normalize_ean() checks the GS1
+check digit so random numbers in URLs are not taken for barcodes.
+"""
+
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional
+import re
+import threading
+
+# Digits ending a URL path segment, e.g. "-3560070894222" or "/3560070894222"
+URL_EAN_PATTERN = re.compile(r"(?<!\d)(\d{8}|\d{12,14})(?=$|[/?#.])")
+
+
+def normalize_ean(value) -> Optional[str]:
+    """
+    Validate a barcode and normalize it to EAN-13 (EAN-8 is kept as is).
+
+    UPC-A (12 digits) gets a leading zero and GTIN-14 loses its leading zero
+    (packaging level indicator 0 only).
+
+    Args:
+        value: Barcode as a string or int (spaces and dashes are ignored)
+
+    Returns:
+        The barcode, or None if it is not a valid EAN-8/UPC-A/EAN-13/GTIN-14
+    """
+    if value is None:
+        return None
+    digits = re.sub(r"[\s-]", "", str(value))
+    if not digits.isdigit() or len(digits) not in (8, 12, 13, 14):
+        return None
+    # GS1 check digit: weights 3 and 1 alternating from the right (check digit excluded)
+    body, check = digits[:-1], int(digits[-1])
+    total = sum(int(d) * (3 if i % 2 == 0 else 1) for i, d in enumerate(reversed(body)))
+    if (10 - total % 10) % 10 != check:
+        return None
+    if len(digits) == 12:
+        return "0" + digits
+    if len(digits) == 14:
+        return digits[1:] if digits[0] == "0" else None
+    return digits
+
+
+def ean_from_url(url: Optional[str]) -> Optional[str]:
+    """Barcode at the end of a product URL path segment, if any."""
+    if not url:
+        return None
+    path = url.split("?", 1)[0].split("#", 1)[0]
+    for candidate in reversed(URL_EAN_PATTERN.findall(path)):
+        ean = normalize_ean(candidate)
+        if ean:
+            return ean
+    return None
+
+
+def find_ean(*candidates) -> Optional[str]:
+    """
+    First valid barcode among attribute values and URLs.
+
+    Args:
+        *candidates: Raw values (data-ean, data-gtin, JSON fields) or URLs
+
+    Returns:
+        Normalized barcode, or None
+    """
+    for candidate in candidates:
+        if not candidate:
+            continue
+        ean = normalize_ean(candidate)
+        if ean is None and isinstance(candidate, str) and "/" in candidate:
+            ean = ean_from_url(candidate)
+        if ean:
+            return ean
+    return None
+
+
+class BarcodeIndex:
+    """Latest product of each store per barcode, usable as a result sink."""
+
+    def __init__(self, max_barcodes: int = 100000):
+        """
+        Initialize index.
+
+        Args:
+            max_barcodes: Barcodes kept before the least recently updated are dropped
+        """
+        self.max_barcodes = max_barcodes
+        self._products: "OrderedDict[str, Dict[str, object]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, query: str, products: Iterable) -> None:
+        """Index products that carry a barcode (sink interface)."""
+        with self._lock:
+            for product in products:
+                ean = getattr(product, "ean", None)
+                if not ean:
+                    continue
+                by_store = self._products.pop(ean, None) or {}
+                key = product.store if not product.location else f"{product.store}@{product.location}"
+                by_store[key] = product
+                self._products[ean] = by_store
+            while len(self._products) > self.max_barcodes:
+                self._products.popitem(last=False)
+
+    def lookup(self, ean: str) -> List:
+        """Known products with this barcode, one per store (and location)."""
+        ean = normalize_ean(ean) or ean
+        with self._lock:
+            return list(self._products.get(ean, {}).values())
+
+    def __len__(self) -> int:
+        return len(self._products)
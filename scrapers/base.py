@@ -1,15 +1,34 @@
 """Base scraper class for all supermarket scrapers."""
 
 from abc import ABC, abstractmethod
-from typing import List, Dict, Optional
+from contextlib import asynccontextmanager
+from typing import Dict, Iterable, List, Optional, Tuple
 import asyncio
 import logging
 from datetime import datetime, timedelta
 import hashlib
 import json
+import re
+import time
+from urllib.parse import urljoin
+from . import metrics, tracing
+from .challenge import ChallengeDetected, WarmSessionPool, detect_challenge
+from .fields import Fields, current_fields, fields_key, parse_fields, project, wanted
+from .phases import phase, record_phases
+from .selector_stats import shared_stats
 
 logger = logging.getLogger(__name__)
 
+# Valid store location ids (also used in file names)
+LOCATION_PATTERN = re.compile(r"[A-Za-z0-9][A-Za-z0-9_.-]*")
+
+# Outcomes of BaseScraper._next_page()
+PAGE_APPENDED = "appended"  # more tiles were added to the current page
+PAGE_REPLACED = "replaced"  # the next results page was loaded in place
+
+# Resource types not loaded when a search does not ask for image_url
+IMAGE_RESOURCES = {"image", "media"}
+
 
 class Product:
     """Product data model."""
@@ -26,6 +45,9 @@ class Product:
         category: Optional[str] = None,
         unit_price: Optional[float] = None,
         unit_label: Optional[str] = None,
+        scraped_at: Optional[str] = None,
+        location: Optional[str] = None,
+        ean: Optional[str] = None,
     ):
         self.name = name
         self.price = price
@@ -37,11 +59,19 @@ class Product:
         self.category = category
         self.unit_price = unit_price  # Prix au kg/L
         self.unit_label = unit_label  # "€/kg", "€/L", etc.
-        self.scraped_at = datetime.now().isoformat()
+        self.scraped_at = scraped_at or datetime.now().isoformat()
+        self.location = location  # store location (drive) the price applies to, if any
+        self.ean = ean  # EAN-13 (or EAN-8) barcode, see scrapers.barcode
+        self.source = "live"  # "live" or "catalog" (served from the local index)
     
-    def to_dict(self) -> Dict:
-        """Convert to dictionary."""
-        return {
+    def to_dict(self, fields: Fields = None) -> Dict:
+        """
+        Convert to dictionary.
+        
+        Args:
+            fields: Keys to keep (see scrapers.fields.parse_fields), default all
+        """
+        data = {
             "name": self.name,
             "price": self.price,
             "unit": self.unit,
@@ -53,7 +83,35 @@ class Product:
             "unit_price": self.unit_price,
             "unit_label": self.unit_label,
             "scraped_at": self.scraped_at,
+            "location": self.location,
+            "ean": self.ean,
         }
+        if fields is not None:
+            data = {key: value for key, value in data.items() if key in fields}
+        return data
+    
+    @classmethod
+    def from_dict(cls, data: Dict) -> "Product":
+        """Rebuild a product from to_dict() output."""
+        return cls(
+            name=data["name"],
+            price=data["price"],
+            unit=data["unit"],
+            store=data["store"],
+            url=data["url"],
+            image_url=data.get("image_url"),
+            brand=data.get("brand"),
+            category=data.get("category"),
+            unit_price=data.get("unit_price"),
+            unit_label=data.get("unit_label"),
+            scraped_at=data.get("scraped_at"),
+            location=data.get("location"),
+            ean=data.get("ean"),
+        )
+    
+    def age_seconds(self) -> float:
+        """Seconds elapsed since the product was scraped."""
+        return max(0.0, (datetime.now() - datetime.fromisoformat(self.scraped_at)).total_seconds())
     
     def cache_key(self, query: str) -> str:
         """Generate cache key for this product."""
@@ -64,16 +122,76 @@ class Product:
 class BaseScraper(ABC):
     """Base class for all supermarket scrapers."""
     
-    def __init__(self, cache_client=None, cache_ttl: int = 3600):
+    # Pagination: result pages (or "load more" rounds) visited per search at most
+    MAX_PAGES = 5
+    PAGE_TIMEOUT = 30000
+    # Reuse browser contexts that got past anti-bot checks between searches
+    # (with a browser pool, see scrapers.challenge)
+    WARM_SESSIONS = True
+    SCROLL_TIMEOUT = 3000
+    # Buttons revealing more tiles in place, then links to the next page;
+    # if neither is found the page is scrolled to trigger infinite loading
+    LOAD_MORE_SELECTORS: List[str] = []
+    NEXT_PAGE_SELECTORS: List[str] = ['a[rel="next"]']
+    # Product tiles, the first selector matching a listing page is used
+    PRODUCT_SELECTORS: List[str] = []
+    # Catalog crawl (see catalog_crawler.py): root of the category tree and
+    # links to the sub-categories of a category page
+    CATEGORY_URL: Optional[str] = None
+    CATEGORY_LINK_SELECTORS: List[str] = ['a.category-link']
+    # Change detection: when the product grid of a search page has the same
+    # fingerprint (tile ids and prices) as the last scrape of the query, its
+    # products are reused instead of parsed again. Needs a cache client.
+    FINGERPRINT_TTL = 7 * 24 * 3600
+    FINGERPRINT_SCRIPT = """(selectors) => {
+        for (const selector of selectors) {
+            const tiles = document.querySelectorAll(selector);
+            if (!tiles.length) continue;
+            return Array.from(tiles, el => {
+                const link = el.querySelector('a[href]');
+                const id = el.getAttribute('data-product-id') || el.getAttribute('data-product')
+                    || el.id || (link ? link.getAttribute('href') : '');
+                const prices = el.textContent.match(/\\d+\\s*[,.]\\s*\\d+\\s*€|\\d+\\s*€\\s*,\\s*\\d+/g) || [];
+                return id + '|' + prices.join(' ');
+            }).join('\\n');
+        }
+        return null;
+    }"""
+    
+    def __init__(
+        self,
+        cache_client=None,
+        cache_ttl: int = 3600,
+        browser_pool=None,
+        sinks: Optional[List] = None,
+        location: Optional[str] = None,
+        selector_stats=None,
+    ):
         """
         Initialize scraper.
         
         Args:
             cache_client: Redis client or similar (optional)
             cache_ttl: Cache time-to-live in seconds (default 1 hour)
+            browser_pool: Shared BrowserPool keeping Chromium warm (optional)
+            sinks: Objects with an add(query, products) method receiving every
+                fresh scrape, e.g. the price history store (optional)
+            location: Store location (e.g. a drive id) whose prices are scraped;
+                it has its own session state and cache entries (optional)
+            selector_stats: SelectorStats learning the order of fallback
+                selector chains (default: the process-wide one, saved to
+                selector_stats.json)
         """
         self.cache = cache_client
         self.cache_ttl = cache_ttl
+        self.browser_pool = browser_pool
+        self.sinks = list(sinks or [])
+        if location is not None and not LOCATION_PATTERN.fullmatch(location):
+            raise ValueError(f"Invalid location: {location!r}")
+        self.location = location
+        self.selector_stats = selector_stats or shared_stats()
+        self.cassette = None  # scrapers.replay.Cassette for record/replay runs
+        self._warm_sessions: Optional[WarmSessionPool] = None
         self.logger = logging.getLogger(f"{__name__}.{self.__class__.__name__}")
     
     @property
@@ -96,80 +214,577 @@ class BaseScraper(ABC):
         """
         pass
     
-    def _get_cache_key(self, query: str) -> str:
-        """Generate cache key for a search query."""
-        return f"scraper:{self.store_name.lower()}:{hashlib.md5(query.encode()).hexdigest()}"
+    @property
+    def warm_sessions(self) -> WarmSessionPool:
+        """Warm browser sessions of this store, with its challenge statistics."""
+        if self._warm_sessions is None:
+            self._warm_sessions = WarmSessionPool(self.store_name)
+        return self._warm_sessions
     
-    async def _get_cached(self, query: str) -> Optional[List[Product]]:
-        """Get cached results if available."""
-        if not self.cache:
+    @asynccontextmanager
+    async def _open_context(self, query: Optional[str] = None, **options):
+        """
+        Open a browser context for one search.
+        
+        Uses the shared browser pool when configured, otherwise launches a
+        throwaway Chromium instance that is closed with the context. When a
+        cassette is set, the context records to or replays from it.
+        
+        Args:
+            query: Search query, used to name cassette recordings
+            **options: Keyword arguments for browser.new_context()
+            
+        Yields:
+            Playwright BrowserContext
+        """
+        if self.cassette is not None and query is not None:
+            options.update(self.cassette.context_options(self.store_name, query))
+        
+        async with self._new_context(**options) as context:
+            if self.cassette is not None and query is not None:
+                await self.cassette.attach(context, self.store_name, query)
+            yield context
+    
+    @asynccontextmanager
+    async def _new_context(self, **options):
+        """Create a context on the pooled browser (reusing a warm one) or on a throwaway one."""
+        if self.browser_pool is not None:
+            if self.WARM_SESSIONS and not options:
+                async with self.warm_sessions.session(self.browser_pool) as context:
+                    yield context
+                return
+            async with self.browser_pool.context(**options) as context:
+                yield context
+            return
+        
+        from playwright.async_api import async_playwright
+        
+        async with async_playwright() as p:
+            with phase("context"):
+                browser = await p.chromium.launch(headless=True)
+            metrics.BROWSER_LAUNCHES.inc(kind="throwaway")
+            metrics.BROWSER_CONTEXTS_IN_USE.inc()
+            try:
+                with phase("context"):
+                    context = await browser.new_context(**options)
+                yield context
+            finally:
+                metrics.BROWSER_CONTEXTS_IN_USE.dec()
+                await browser.close()
+    
+    async def _goto(self, page, url: str, timeout: Optional[int] = None, wait_until: str = "networkidle"):
+        """
+        Navigate to url and fail fast on anti-bot challenge pages.
+        
+        Args:
+            page: Playwright page
+            url: URL to load
+            timeout: Navigation timeout in ms (default: PAGE_TIMEOUT)
+            wait_until: Load state to wait for
+            
+        Returns:
+            Playwright Response of the navigation
+            
+        Raises:
+            ChallengeDetected: If the store answered with a challenge page
+        """
+        try:
+            response = await page.goto(url, wait_until=wait_until, timeout=timeout or self.PAGE_TIMEOUT)
+        except Exception as e:
+            # Challenge pages keep polling, so the load state may never be reached
+            reason = await self._challenge_reason(page)
+            if reason:
+                raise ChallengeDetected(self.store_name, url, reason) from e
+            raise
+        reason = await self._challenge_reason(page, response)
+        if reason:
+            raise ChallengeDetected(self.store_name, url, reason)
+        return response
+    
+    async def _new_page(self, context):
+        """
+        Open a page, not loading images unless the current search wants image_url.
+        
+        Args:
+            context: Browser context
+            
+        Returns:
+            Playwright Page
+        """
+        page = await context.new_page()
+        if not self._wants("image_url"):
+            await page.route("**/*", self._skip_images)
+        return page
+    
+    @staticmethod
+    async def _skip_images(route) -> None:
+        if route.request.resource_type in IMAGE_RESOURCES:
+            await route.abort()
+        else:
+            await route.fallback()  # context routes (e.g. cassette replay) still apply
+    
+    def _wants(self, field: str) -> bool:
+        """Whether the current search asked for a product field (see scrapers.fields)."""
+        return wanted(field)
+    
+    async def _challenge_reason(self, page, response=None) -> Optional[str]:
+        """Check a page for a challenge and count the navigation."""
+        try:
+            reason = await detect_challenge(page, response)
+        except Exception:
+            reason = None
+        self.warm_sessions.record_navigation(reason is not None)
+        metrics.NAVIGATIONS.inc(store=self.store_name, outcome="challenge" if reason else "ok")
+        if reason:
+            self.logger.warning(f"Anti-bot challenge detected: {reason}")
+        return reason
+    
+    async def _prepare_context(self, context) -> None:
+        """Hook run on each new browser context before browsing (e.g. add cookies)."""
+        pass
+    
+    async def _extract_listing(self, page, label: str, max_results: int) -> List[Product]:
+        """
+        Extract products from a listing page (search results or category).
+        
+        Args:
+            page: Playwright page showing the listing
+            label: Query or page URL (for logging)
+            max_results: Number of unique products wanted
+            
+        Returns:
+            List of Product objects
+        """
+        return await self._extract_tiles(page, label, self.PRODUCT_SELECTORS, max_results)
+    
+    async def _extract_search_results(self, page, query: str, max_results: int) -> List[Product]:
+        """
+        Extract search results, reusing the last scrape when the grid is unchanged.
+        
+        Args:
+            page: Playwright page showing the first results
+            query: Search query
+            max_results: Number of unique products wanted
+            
+        Returns:
+            List of Product objects
+        """
+        fingerprint = await self._fingerprint(page)
+        if fingerprint is not None:
+            previous = await self._get_fingerprinted(query, fingerprint, max_results)
+            if previous is not None:
+                metrics.FINGERPRINT_CHECKS.inc(store=self.store_name, result="unchanged")
+                self.logger.info(f"Result grid unchanged for query: {query} - reusing {len(previous)} products")
+                return previous
+            metrics.FINGERPRINT_CHECKS.inc(store=self.store_name, result="changed")
+        
+        products = await self._extract_listing(page, query, max_results)
+        if fingerprint is not None and products:
+            await self._set_fingerprinted(query, fingerprint, products, max_results)
+        return products
+    
+    async def _fingerprint(self, page) -> Optional[str]:
+        """Hash of the product tiles' ids and prices, None without tiles or cache."""
+        if not self.cache or not self.PRODUCT_SELECTORS:
+            return None
+        try:
+            with self._phase("fingerprint"):
+                grid = await page.evaluate(self.FINGERPRINT_SCRIPT, self.PRODUCT_SELECTORS)
+        except Exception as e:
+            self.logger.warning(f"Fingerprint failed: {e}")
+            return None
+        return hashlib.md5(grid.encode()).hexdigest() if grid else None
+    
+    def _get_fingerprint_key(self, query: str) -> str:
+        # Products reused on a match must have the fields of the current search
+        projection = fields_key(current_fields())
+        suffix = f":{projection}" if projection else ""
+        return f"scraper:{self.cache_namespace}:fingerprint:{hashlib.md5(query.encode()).hexdigest()}{suffix}"
+    
+    async def _get_fingerprinted(
+        self, query: str, fingerprint: str, max_results: int
+    ) -> Optional[List[Product]]:
+        """Products of the last scrape of query if its fingerprint matches and it has enough of them."""
+        try:
+            cached = await asyncio.to_thread(self.cache.get, self._get_fingerprint_key(query))
+            if not cached:
+                return None
+            data = json.loads(cached)
+        except Exception as e:
+            self.logger.warning(f"Fingerprint read error: {e}")
             return None
         
+        products = data["products"]
+        # A smaller previous scrape only answers if it found every product there was
+        if data["fingerprint"] != fingerprint or (len(products) < max_results and len(products) == data["max_results"]):
+            return None
+        
+        scraped_at = datetime.now().isoformat()
+        return [Product.from_dict({**p, "scraped_at": scraped_at}) for p in products[:max_results]]
+    
+    async def _set_fingerprinted(
+        self, query: str, fingerprint: str, products: List[Product], max_results: int
+    ) -> None:
         try:
-            cache_key = self._get_cache_key(query)
-            cached = await asyncio.to_thread(self.cache.get, cache_key)
+            data = json.dumps({
+                "fingerprint": fingerprint,
+                "max_results": max_results,
+                "products": [p.to_dict() for p in products],
+            })
+            await asyncio.to_thread(self.cache.setex, self._get_fingerprint_key(query), self.FINGERPRINT_TTL, data)
+        except Exception as e:
+            self.logger.warning(f"Fingerprint write error: {e}")
+    
+    async def crawl_page(
+        self, context, url: str, max_products: int = 1000
+    ) -> Tuple[List[Product], List[Tuple[str, str]]]:
+        """
+        Visit one category page of the catalog.
+        
+        Category links are collected before the products, since paginating
+        may navigate away from the page.
+        
+        Args:
+            context: Browser context prepared with _prepare_context()
+            url: Category page URL
+            max_products: Products extracted at most, across result pages
             
-            if cached:
-                self.logger.info(f"Cache HIT for query: {query}")
+        Returns:
+            (products, links) where links are (absolute URL, link text) pairs
+        """
+        page = await self._new_page(context)
+        try:
+            with self._phase("goto"):
+                await self._goto(page, url)
+            with self._phase("extract"):
+                links = await page.evaluate(
+                    """(selectors) => {
+                        const links = [];
+                        for (const selector of selectors) {
+                            document.querySelectorAll(selector).forEach(a => {
+                                if (a.href) links.push([a.href, a.textContent.trim()]);
+                            });
+                        }
+                        return links;
+                    }""",
+                    self.CATEGORY_LINK_SELECTORS,
+                )
+            products = await self._extract_listing(page, url, max_products)
+            return products, [(href, text) for href, text in links]
+        finally:
+            await page.close()
+    
+    async def _extract_tiles(
+        self, page, query: str, selectors: List[str], max_results: int
+    ) -> List[Product]:
+        """
+        Extract products from result tiles, paginating until max_results.
+        
+        Tiles are parsed with self._extract_product(element, page). When the
+        page holds fewer unique products than max_results, more are revealed
+        with _next_page() on the same page, at most MAX_PAGES times.
+        
+        Args:
+            page: Playwright page showing the first results
+            query: Search query (for logging)
+            selectors: Candidate tile selectors, the first one matching is used
+            max_results: Number of unique products wanted
+            
+        Returns:
+            List of Product objects
+        """
+        products: List[Product] = []
+        seen = set()
+        selector = None
+        parsed = 0  # tiles of the current page already handled
+        
+        for page_number in range(1, self.MAX_PAGES + 1):
+            with self._phase("extract"):
+                elements = []
+                if selector:
+                    elements = await page.query_selector_all(selector)
+                else:
+                    for candidate in self.selector_stats.order(self.store_name, "products", selectors):
+                        elements = await page.query_selector_all(candidate)
+                        metrics.SELECTOR_PROBES.inc(
+                            store=self.store_name, field="products", result="hit" if elements else "miss"
+                        )
+                        if elements:
+                            self.logger.info(f"Found {len(elements)} products with selector: {candidate}")
+                            selector = candidate
+                            break
+                    self.selector_stats.record(self.store_name, "products", selector)
+                
+                if not elements and not products:
+                    self.logger.warning(f"No products found for query: {query}")
+                    return []
+                
+                for element in elements[parsed:]:
+                    try:
+                        product = await self._extract_product(element, page)
+                    except Exception as e:
+                        self.logger.warning(f"Failed to extract product: {e}")
+                        continue
+                    if not product or (product.name, product.price) in seen:
+                        continue
+                    seen.add((product.name, product.price))
+                    products.append(product)
+                    if len(products) >= max_results:
+                        return products
+                parsed = len(elements)
+            
+            if page_number == self.MAX_PAGES:
+                break
+            advanced = await self._next_page(page, selector)
+            if advanced is None:
+                break
+            if advanced == PAGE_REPLACED:
+                parsed = 0
+        
+        return products
+    
+    async def _query_chain(self, element, field: str, selectors: List[str]):
+        """
+        First match of a fallback selector chain inside element.
+        
+        Selectors are tried in the order learned by self.selector_stats (the
+        last one that matched first), and the outcome is recorded.
+        
+        Args:
+            element: Playwright element handle (or page)
+            field: Field the chain extracts, e.g. "price"
+            selectors: The chain in its default order
+            
+        Returns:
+            Matching element handle, or None if no selector matched
+        """
+        store = self.store_name
+        for selector in self.selector_stats.order(store, field, selectors):
+            found = await element.query_selector(selector)
+            if found:
+                metrics.SELECTOR_PROBES.inc(store=store, field=field, result="hit")
+                self.selector_stats.record(store, field, selector)
+                return found
+            metrics.SELECTOR_PROBES.inc(store=store, field=field, result="miss")
+        self.selector_stats.record(store, field, None)
+        return None
+    
+    async def _next_page(self, page, tile_selector: str) -> Optional[str]:
+        """
+        Reveal more results: click "load more", follow the next page or scroll.
+        
+        The time spent is recorded as the "paginate" phase and in the
+        scraper_extra_page_duration_seconds metric.
+        
+        Args:
+            page: Playwright page, reused for the next results
+            tile_selector: CSS selector of product tiles, used to detect new ones
+            
+        Returns:
+            PAGE_APPENDED, PAGE_REPLACED, or None when there are no more results
+        """
+        start = time.perf_counter()
+        try:
+            with self._phase("paginate"):
+                outcome = await self._advance(page, tile_selector)
+        except Exception as e:
+            self.logger.info(f"Stopped paginating: {e}")
+            return None
+        
+        if outcome is not None:
+            metrics.EXTRA_PAGE_DURATION.observe(time.perf_counter() - start, store=self.store_name)
+            self.logger.info(f"Loaded more results ({outcome})")
+        return outcome
+    
+    async def _advance(self, page, tile_selector: str) -> Optional[str]:
+        """Try load-more buttons, next-page links, then scrolling."""
+        count = len(await page.query_selector_all(tile_selector))
+        more_tiles = "([selector, count]) => document.querySelectorAll(selector).length > count"
+        
+        for selector in self.LOAD_MORE_SELECTORS:
+            button = await page.query_selector(selector)
+            if button and await button.is_visible():
+                await button.click()
+                await page.wait_for_function(more_tiles, arg=[tile_selector, count], timeout=self.PAGE_TIMEOUT)
+                return PAGE_APPENDED
+        
+        for selector in self.NEXT_PAGE_SELECTORS:
+            link = await page.query_selector(selector)
+            href = await link.get_attribute("href") if link else None
+            if href:
+                await self._goto(page, urljoin(page.url, href))
+                return PAGE_REPLACED
+        
+        await page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
+        try:
+            await page.wait_for_function(more_tiles, arg=[tile_selector, count], timeout=self.SCROLL_TIMEOUT)
+        except Exception:
+            return None
+        return PAGE_APPENDED
+    
+    async def _page_loaded(self, page, query: str) -> None:
+        """Hook run once search results are rendered (saves recordings)."""
+        if self.cassette is not None:
+            await self.cassette.page_loaded(page, self.store_name, query)
+    
+    def _phase(self, name: str):
+        """Time a scrape phase (see scrapers.phases)."""
+        return phase(name)
+    
+    @property
+    def cache_namespace(self) -> str:
+        """Store (and location) part of the cache keys."""
+        store = self.store_name.lower()
+        return f"{store}@{self.location}" if self.location else store
+    
+    def _get_cache_key(self, query: str, fields: Fields = None) -> str:
+        """Generate cache key for a search query (and field projection)."""
+        key = f"scraper:{self.cache_namespace}:{hashlib.md5(query.encode()).hexdigest()}"
+        return f"{key}:{fields_key(fields)}" if fields is not None else key
+    
+    async def _get_cached(
+        self, query: str, fields: Fields = None, max_results: Optional[int] = None
+    ) -> Optional[List[Product]]:
+        """
+        Get cached results if available (full results also answer projected searches).
+        
+        An entry with fewer than max_results products only answers if the
+        scrape that wrote it ran out of results, like fingerprint matches.
+        """
+        if not self.cache:
+            return None
+        
+        keys = [self._get_cache_key(query)]
+        if fields is not None:
+            keys.append(self._get_cache_key(query, fields))
+        try:
+            for cache_key in keys:
+                cached = await asyncio.to_thread(self.cache.get, cache_key)
+                if not cached:
+                    continue
                 data = json.loads(cached)
-                return [
-                    Product(
-                        name=p["name"],
-                        price=p["price"],
-                        unit=p["unit"],
-                        store=p["store"],
-                        url=p["url"],
-                        image_url=p.get("image_url"),
-                        brand=p.get("brand"),
-                        category=p.get("category"),
-                        unit_price=p.get("unit_price"),
-                        unit_label=p.get("unit_label"),
-                    )
-                    for p in data
-                ]
+                if isinstance(data, list):
+                    # Entry written before max_results was stored
+                    data = {"max_results": len(data), "products": data}
+                products = data["products"]
+                if not products:
+                    continue
+                if max_results is not None and len(products) < max_results and len(products) == data["max_results"]:
+                    self.logger.info(f"Cache entry for query {query} has {len(products)} of {max_results} results")
+                    continue
+                self.logger.info(f"Cache HIT for query: {query}")
+                return [Product.from_dict(p) for p in products[:max_results]]
         except Exception as e:
             self.logger.warning(f"Cache read error: {e}")
         
         return None
     
-    async def _set_cached(self, query: str, products: List[Product]) -> None:
-        """Cache search results."""
+    async def _get_cached_max_results(self, query: str, fields: Fields = None) -> Optional[int]:
+        """Number of results asked for by the scrape that wrote a cache entry, None if not cached."""
+        if not self.cache:
+            return None
+        
+        try:
+            cached = await asyncio.to_thread(self.cache.get, self._get_cache_key(query, fields))
+            if not cached:
+                return None
+            data = json.loads(cached)
+            return len(data) if isinstance(data, list) else data["max_results"]
+        except Exception as e:
+            self.logger.warning(f"Cache read error: {e}")
+            return None
+    
+    async def _set_cached(
+        self, query: str, products: List[Product], fields: Fields = None, max_results: Optional[int] = None
+    ) -> None:
+        """Cache search results, with the number of results asked for (default: as many as found)."""
         if not self.cache:
             return
         
         try:
-            cache_key = self._get_cache_key(query)
-            data = json.dumps([p.to_dict() for p in products])
+            cache_key = self._get_cache_key(query, fields)
+            data = json.dumps({
+                "max_results": max_results if max_results is not None else len(products),
+                "products": [p.to_dict() for p in products],
+            })
             await asyncio.to_thread(self.cache.setex, cache_key, self.cache_ttl, data)
             self.logger.info(f"Cached {len(products)} results for query: {query}")
         except Exception as e:
             self.logger.warning(f"Cache write error: {e}")
     
-    async def search_with_cache(self, query: str, max_results: int = 10) -> List[Product]:
+    async def search_with_cache(
+        self,
+        query: str,
+        max_results: int = 10,
+        fields: Optional[Iterable[str]] = None,
+        force_refresh: bool = False,
+    ) -> List[Product]:
         """
         Search with automatic caching.
         
         Args:
             query: Search query
             max_results: Maximum number of results
+            fields: Product fields to extract, e.g. "name,price" (default: all);
+                the others are not queried and are None
+            force_refresh: Scrape even if the query is cached, and rewrite
+                its entry (e.g. pre-warming before it expires)
             
         Returns:
             List of Product objects
         """
+        store = self.store_name
+        tier = getattr(self.cache, "tier", "redis")
+        fields = parse_fields(fields)
+        
         # Try cache first
-        cached = await self._get_cached(query)
-        if cached:
-            return cached[:max_results]
+        if not force_refresh:
+            with tracing.span("cache_get", tier=tier) as current:
+                cached = await self._get_cached(query, fields, max_results)
+                if current:
+                    current.set_attribute("hit", bool(cached))
+            if cached:
+                metrics.CACHE_REQUESTS.inc(store=store, tier=tier, result="hit")
+                return cached
+            if self.cache:
+                metrics.CACHE_REQUESTS.inc(store=store, tier=tier, result="miss")
         
         # Perform actual search
-        self.logger.info(f"Cache MISS for query: {query} - scraping...")
-        products = await self.search(query, max_results)
+        self.logger.info(f"Cache {'refresh' if force_refresh else 'MISS'} for query: {query} - scraping...")
+        start = time.perf_counter()
+        try:
+            with tracing.span("scrape", store=store, query=query) as current, record_phases() as timings:
+                with project(fields):
+                    products = await self.search(query, max_results)
+                if current:
+                    current.set_attribute("products", len(products))
+        except Exception as e:
+            metrics.SCRAPE_FAILURES.inc(store=store, error=type(e).__name__)
+            raise
+        finally:
+            metrics.SCRAPE_DURATION.observe(time.perf_counter() - start, store=store)
+            for name, duration in timings.items():
+                metrics.SCRAPE_PHASE_DURATION.observe(duration, store=store, phase=name)
+        metrics.SCRAPE_PRODUCTS.observe(len(products), store=store)
+        if self.location:
+            for product in products:
+                product.location = self.location
         
         # Cache results
-        await self._set_cached(query, products)
+        with tracing.span("cache_set", tier=tier):
+            await self._set_cached(query, products, fields, max_results)
+        self._publish(query, products)
         
         return products
     
+    def _publish(self, query: str, products: List[Product]) -> None:
+        """Hand freshly scraped products to the result sinks."""
+        for sink in self.sinks:
+            try:
+                sink.add(query, products)
+            except Exception as e:
+                self.logger.warning(f"Result sink error: {e}")
+    
     async def retry_on_failure(self, coro, max_retries: int = 3, delay: float = 2.0):
         """
         Retry a coroutine on failure.
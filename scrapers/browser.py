@@ -0,0 +1,262 @@
+"""Shared browser pool so scrapers can reuse a warm Chromium instance.
+
+Playwright is imported when the browser is first launched, not on import.
+
+A long-lived browser grows: the pool counts pages per context and per
+browser and samples the RSS of the Chromium processes. Past the configured
+limits the browser is recycled: new contexts go to a fresh browser while the
+old one drains (its open contexts finish, then it is closed).
+"""
+
+from contextlib import asynccontextmanager
+from typing import TYPE_CHECKING, Dict, Optional
+import asyncio
+import logging
+import os
+import time
+from . import metrics, procinfo
+from .phases import phase
+
+if TYPE_CHECKING:
+    from playwright.async_api import Browser, BrowserContext
+
+logger = logging.getLogger(__name__)
+
+
+def chromium_rss(root_pid: Optional[int] = None) -> Optional[int]:
+    """
+    Resident memory of the Chromium processes started by a process.
+
+    Shared pages are counted once per process, so this is an upper bound.
+
+    Args:
+        root_pid: Ancestor of the browsers (default: this process)
+
+    Returns:
+        Bytes, or None where /proc is not available
+    """
+    if not os.path.isdir("/proc"):
+        return None
+    return sum(procinfo.rss_bytes(pid) for pid in procinfo.browser_pids(root_pid))
+
+
+class BrowserPool:
+    """Keep one Chromium instance alive and hand out isolated contexts."""
+
+    def __init__(
+        self,
+        headless: bool = True,
+        launch_options: Optional[Dict] = None,
+        max_context_pages: Optional[int] = None,
+        max_browser_pages: Optional[int] = None,
+        max_rss_mb: Optional[float] = None,
+        watch_interval: float = 15.0,
+        drain_timeout: float = 120.0,
+    ):
+        """
+        Initialize browser pool.
+
+        Args:
+            headless: Launch Chromium without a window
+            launch_options: Extra keyword arguments for chromium.launch()
+            max_context_pages: Pages after which a reused context should be
+                recycled (see recycle_reason(); default: no limit)
+            max_browser_pages: Pages after which the browser is recycled
+                (default: no limit)
+            max_rss_mb: Chromium RSS above which the browser is recycled
+                (default: no limit; RSS is still sampled and exported)
+            watch_interval: Seconds between memory samples
+            drain_timeout: Seconds a recycled browser may keep open contexts
+                before it is closed anyway
+        """
+        self.headless = headless
+        self.launch_options = launch_options or {}
+        self.max_context_pages = max_context_pages
+        self.max_browser_pages = max_browser_pages
+        self.max_rss_mb = max_rss_mb
+        self.watch_interval = watch_interval
+        self.drain_timeout = drain_timeout
+        self._playwright = None
+        self._browser: Optional["Browser"] = None
+        self._lock = asyncio.Lock()
+        self.contexts_in_use = 0
+        self.browser_pages = 0  # pages opened on the current browser
+        self._contexts: Dict["BrowserContext", "Browser"] = {}
+        self._context_pages: Dict["BrowserContext", int] = {}
+        self._draining: Dict["Browser", float] = {}  # recycled browser -> when
+        self._watchdog: Optional[asyncio.Task] = None
+        self.rss_bytes: Optional[int] = None
+        self.peak_rss_bytes = 0
+        self.recycles: Dict[str, int] = {}
+
+    async def get_browser(self) -> "Browser":
+        """Return the warm browser, launching it on first use or after a crash."""
+        async with self._lock:
+            if self._browser is None or not self._browser.is_connected():
+                if self._playwright is None:
+                    from playwright.async_api import async_playwright
+
+                    self._playwright = await async_playwright().start()
+                self._browser = await self._playwright.chromium.launch(
+                    headless=self.headless, **self.launch_options
+                )
+                metrics.BROWSER_LAUNCHES.inc(kind="pooled")
+                logger.info("Launched warm Chromium instance")
+                self.browser_pages = 0
+                if self._watchdog is None:
+                    self._watchdog = asyncio.create_task(self._watch())
+            return self._browser
+
+    async def new_context(self, **options) -> "BrowserContext":
+        """
+        Open a browser context on the warm browser, to release with close_context().
+
+        Args:
+            **options: Keyword arguments for browser.new_context()
+
+        Returns:
+            BrowserContext
+        """
+        with phase("context"):
+            browser = await self.get_browser()
+            context = await browser.new_context(**options)
+        self.contexts_in_use += 1
+        metrics.BROWSER_CONTEXTS_IN_USE.inc()
+        self._contexts[context] = browser
+        self._context_pages[context] = 0
+        context.on("page", lambda page: self._page_opened(context, browser))
+        return context
+
+    async def close_context(self, context: "BrowserContext") -> None:
+        """Close a context opened with new_context()."""
+        self.contexts_in_use -= 1
+        metrics.BROWSER_CONTEXTS_IN_USE.dec()
+        browser = self._contexts.pop(context, None)
+        metrics.BROWSER_CONTEXT_PAGES.observe(self._context_pages.pop(context, 0))
+        try:
+            await context.close()
+        except Exception as e:
+            logger.warning(f"Failed to close browser context: {e}")
+        if browser in self._draining and browser not in self._contexts.values():
+            await self._close_browser(browser)
+
+    def _page_opened(self, context: "BrowserContext", browser: "Browser") -> None:
+        if context in self._context_pages:
+            self._context_pages[context] += 1
+        if browser is self._browser:
+            self.browser_pages += 1
+            if self.max_browser_pages and self.browser_pages >= self.max_browser_pages:
+                self.recycle("pages")
+
+    def recycle_reason(self, context: "BrowserContext") -> Optional[str]:
+        """
+        Why a context kept between uses should be closed now, if it should.
+
+        Returns:
+            "draining" if its browser is being recycled, "pages" past
+            max_context_pages, else None
+        """
+        if self._contexts.get(context) in self._draining:
+            return "draining"
+        if self.max_context_pages and self._context_pages.get(context, 0) >= self.max_context_pages:
+            return "pages"
+        return None
+
+    def record_recycle(self, kind: str, reason: str) -> None:
+        """Count a context or browser recycle."""
+        key = f"{kind}:{reason}"
+        self.recycles[key] = self.recycles.get(key, 0) + 1
+        metrics.BROWSER_RECYCLES.inc(kind=kind, reason=reason)
+
+    def recycle(self, reason: str) -> None:
+        """
+        Retire the current browser: the next context launches a fresh one,
+        and the old one is closed once its open contexts are closed.
+        """
+        browser = self._browser
+        if browser is None:
+            return
+        self._browser = None
+        self.record_recycle("browser", reason)
+        logger.info(f"Recycling Chromium after {self.browser_pages} pages ({reason})")
+        if browser in self._contexts.values():
+            self._draining[browser] = time.monotonic()
+        else:
+            asyncio.ensure_future(self._close_browser(browser))
+
+    async def _close_browser(self, browser: "Browser") -> None:
+        self._draining.pop(browser, None)
+        try:
+            await browser.close()
+        except Exception as e:
+            logger.warning(f"Failed to close browser: {e}")
+
+    async def _watch(self) -> None:
+        """Sample Chromium memory, recycle above max_rss_mb and close stuck drains."""
+        while True:
+            await asyncio.sleep(self.watch_interval)
+            try:
+                rss = await asyncio.to_thread(chromium_rss)
+            except Exception as e:
+                logger.warning(f"Cannot read Chromium memory: {e}")
+                rss = None
+            if rss is not None:
+                self.rss_bytes = rss
+                self.peak_rss_bytes = max(self.peak_rss_bytes, rss)
+                metrics.BROWSER_RSS_BYTES.set(rss)
+                # While a browser drains the total stays high: wait for it
+                if self.max_rss_mb and rss > self.max_rss_mb * 2 ** 20 and not self._draining:
+                    logger.warning(f"Chromium uses {rss / 2 ** 20:.0f} MB (limit {self.max_rss_mb} MB)")
+                    self.recycle("memory")
+
+            now = time.monotonic()
+            for browser, since in list(self._draining.items()):
+                if now - since > self.drain_timeout:
+                    logger.warning("Closing recycled Chromium with contexts still open")
+                    await self._close_browser(browser)
+
+    def stats(self) -> Dict:
+        """Contexts, pages, memory and recycles of the pool."""
+        return {
+            "contexts_in_use": self.contexts_in_use,
+            "browser_pages": self.browser_pages,
+            "draining_browsers": len(self._draining),
+            "rss_mb": round(self.rss_bytes / 2 ** 20, 1) if self.rss_bytes is not None else None,
+            "peak_rss_mb": round(self.peak_rss_bytes / 2 ** 20, 1),
+            "recycles": dict(self.recycles),
+        }
+
+    @asynccontextmanager
+    async def context(self, **options) -> "BrowserContext":
+        """
+        Open a fresh browser context on the warm browser.
+
+        Args:
+            **options: Keyword arguments for browser.new_context()
+
+        Yields:
+            BrowserContext, closed when the block exits
+        """
+        context = await self.new_context(**options)
+        try:
+            yield context
+        finally:
+            await self.close_context(context)
+
+    async def close(self) -> None:
+        """Close the browsers and stop Playwright."""
+        if self._watchdog is not None:
+            self._watchdog.cancel()
+            self._watchdog = None
+        for browser in list(self._draining):
+            await self._close_browser(browser)
+        async with self._lock:
+            if self._browser is not None:
+                try:
+                    await self._browser.close()
+                except Exception as e:
+                    logger.warning(f"Failed to close browser: {e}")
+                self._browser = None
+            if self._playwright is not None:
+                await self._playwright.stop()
+                self._playwright = None
@@ -0,0 +1,222 @@
+"""In-process cache with the subset of the Redis API used by the scrapers.
+
+The cache can be snapshotted to disk and restored, so a restart without
+Redis keeps its hot entries (with their expiry times). A snapshot is the
+zlib-compressed values back to back, then an index of (key, offset, length,
+expiry) and a fixed-size footer pointing at it:
+
+    MAGIC | value... | zlib(JSON index) | index offset, index length | MAGIC
+
+restore() only reads the index, through a memory map; each value is
+decompressed the first time it is read, so large snapshots load in
+milliseconds.
+"""
+
+from collections import OrderedDict
+from typing import Optional, Tuple, Union
+import json
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+import zlib
+
+SNAPSHOT_MAGIC = b"PCSNAP1\0"
+SNAPSHOT_FOOTER = struct.Struct("<QQ")
+
+
+class SnapshotError(Exception):
+    """A cache snapshot is missing, truncated or not a snapshot."""
+
+
+class _StoredValue:
+    """Value still compressed in a memory-mapped snapshot."""
+
+    __slots__ = ("buffer", "offset", "length")
+
+    def __init__(self, buffer: mmap.mmap, offset: int, length: int):
+        self.buffer = buffer
+        self.offset = offset
+        self.length = length
+
+    def raw(self) -> bytes:
+        return self.buffer[self.offset:self.offset + self.length]
+
+    def load(self) -> str:
+        return zlib.decompress(self.raw()).decode()
+
+
+class MemoryCache:
+    """Thread-safe LRU cache with per-key expiry, usable in place of Redis."""
+
+    tier = "memory"  # label in cache metrics (Redis clients report "redis")
+
+    def __init__(self, max_entries: int = 10000):
+        """
+        Initialize memory cache.
+
+        Args:
+            max_entries: Entries kept before the least recently used are evicted
+        """
+        self.max_entries = max_entries
+        self._data: "OrderedDict[str, Tuple[Union[str, _StoredValue], Optional[float]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __bool__(self) -> bool:
+        # Scrapers test "if self.cache:" for a configured cache, even an empty one
+        return True
+
+    def _live(self, key: str, now: float) -> Optional[Tuple[str, Optional[float]]]:
+        """Return the entry for key, dropping it if expired. Caller holds the lock."""
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        if entry[1] is not None and entry[1] <= now:
+            del self._data[key]
+            return None
+        return entry
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the value for key, or None if missing or expired."""
+        with self._lock:
+            entry = self._live(key, time.time())
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if isinstance(value, _StoredValue):
+                value = value.load()
+                self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: str, ex: Optional[int] = None) -> bool:
+        """Store a value, optionally expiring after ex seconds."""
+        expires_at = time.time() + ex if ex else None
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+        return True
+
+    def setex(self, key: str, ttl: int, value: str) -> bool:
+        """Store a value expiring after ttl seconds (Redis argument order)."""
+        return self.set(key, value, ex=ttl)
+
+    def ttl(self, key: str) -> int:
+        """Return remaining seconds, -1 without expiry, -2 if missing (like Redis)."""
+        with self._lock:
+            entry = self._live(key, time.time())
+            if entry is None:
+                return -2
+            if entry[1] is None:
+                return -1
+            return max(0, int(entry[1] - time.time()))
+
+    def exists(self, key: str) -> int:
+        """Return 1 if key holds a live value, else 0."""
+        with self._lock:
+            return 1 if self._live(key, time.time()) is not None else 0
+
+    def delete(self, key: str) -> int:
+        """Remove key, returning the number of keys removed."""
+        with self._lock:
+            return 1 if self._data.pop(key, None) is not None else 0
+
+    def snapshot(self, path: str, level: int = 6) -> int:
+        """
+        Write the live entries to path, least recently used first.
+
+        The file is written next to path and renamed over it, so a crash
+        never leaves a partial snapshot behind.
+
+        Args:
+            path: Snapshot file
+            level: zlib compression level of the values
+
+        Returns:
+            Number of entries written
+        """
+        now = time.time()
+        with self._lock:
+            entries = [(k, v, exp) for k, (v, exp) in self._data.items() if exp is None or exp > now]
+
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, tmp_path = tempfile.mkstemp(prefix=".cache-snapshot-", dir=directory)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(SNAPSHOT_MAGIC)
+                index = []
+                offset = len(SNAPSHOT_MAGIC)
+                for key, value, expires_at in entries:
+                    # Values restored and never read are copied still compressed
+                    data = value.raw() if isinstance(value, _StoredValue) else zlib.compress(value.encode(), level)
+                    f.write(data)
+                    index.append((key, offset, len(data), expires_at))
+                    offset += len(data)
+                encoded = zlib.compress(json.dumps(index, separators=(",", ":")).encode())
+                f.write(encoded)
+                f.write(SNAPSHOT_FOOTER.pack(offset, len(encoded)) + SNAPSHOT_MAGIC)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        return len(entries)
+
+    def restore(self, path: str) -> int:
+        """
+        Load a snapshot written by snapshot(), keeping expiry times.
+
+        Only the index is read; values stay in the memory-mapped file until
+        first read. Expired entries are skipped, and entries already in the
+        cache win over the snapshot.
+
+        Args:
+            path: Snapshot file
+
+        Returns:
+            Number of entries restored
+
+        Raises:
+            SnapshotError: If path is missing or not a valid snapshot
+        """
+        try:
+            with open(path, "rb") as f:
+                buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError) as e:
+            raise SnapshotError(f"Cannot read cache snapshot {path}: {e}")
+
+        tail = len(SNAPSHOT_MAGIC) + SNAPSHOT_FOOTER.size
+        if (
+            len(buffer) < len(SNAPSHOT_MAGIC) + tail
+            or buffer[:len(SNAPSHOT_MAGIC)] != SNAPSHOT_MAGIC
+            or buffer[-len(SNAPSHOT_MAGIC):] != SNAPSHOT_MAGIC
+        ):
+            buffer.close()
+            raise SnapshotError(f"Not a cache snapshot (or truncated): {path}")
+        index_offset, index_length = SNAPSHOT_FOOTER.unpack(buffer[-tail:-len(SNAPSHOT_MAGIC)])
+        try:
+            index = json.loads(zlib.decompress(buffer[index_offset:index_offset + index_length]))
+        except (zlib.error, ValueError) as e:
+            buffer.close()
+            raise SnapshotError(f"Corrupt cache snapshot index in {path}: {e}")
+
+        now = time.time()
+        restored = 0
+        with self._lock:
+            # Most recently used last in the file: keep those if the cache is too
+            # small, and place them before the live entries in the same order
+            for key, offset, length, expires_at in reversed(index[-self.max_entries:]):
+                if (expires_at is not None and expires_at <= now) or key in self._data:
+                    continue
+                self._data[key] = (_StoredValue(buffer, offset, length), expires_at)
+                self._data.move_to_end(key, last=False)
+                restored += 1
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+        return restored
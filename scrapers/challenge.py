@@ -0,0 +1,215 @@
+"""Anti-bot challenge detection and warmed browser sessions.
+
+Stores behind Cloudflare or DataDome sometimes answer with a challenge page
+("Just a moment...", "Un instant...") instead of results. Scrapers check
+every navigation with detect_challenge() and fail fast with
+ChallengeDetected rather than waiting for product tiles that never come.
+
+A browser context that got through is worth keeping: its clearance cookies
+let later searches skip the challenge. WarmSessionPool keeps such contexts
+on the shared browser, checks one out per search and retires it when it
+gets challenged again (or grows too old).
+"""
+
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Dict, List, Optional
+import logging
+import statistics
+import time
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+# Lower-case fragments of challenge page titles
+CHALLENGE_TITLES = (
+    "just a moment",
+    "un instant",
+    "attention required",
+    "access denied",
+    "checking your browser",
+    "vérification de sécurité",
+)
+# Elements only found on challenge pages (Cloudflare, DataDome)
+CHALLENGE_SELECTORS = (
+    "#challenge-form",
+    "#challenge-running",
+    "#cf-challenge-running",
+    "iframe[src*='challenges.cloudflare.com']",
+    "iframe[src*='captcha-delivery.com']",
+)
+# Statuses answered by anti-bot walls
+CHALLENGE_STATUSES = (403, 429, 503)
+
+
+class ChallengeDetected(Exception):
+    """A store answered with an anti-bot challenge instead of the page."""
+
+    def __init__(self, store: str, url: str, reason: str):
+        super().__init__(f"{store} challenge on {url} ({reason})")
+        self.store = store
+        self.url = url
+        self.reason = reason
+
+
+async def detect_challenge(page, response=None) -> Optional[str]:
+    """
+    Check whether a page shows an anti-bot challenge.
+
+    Args:
+        page: Playwright page, after navigation
+        response: Response of the navigation (optional)
+
+    Returns:
+        The marker found (title, element or status), or None
+    """
+    title = (await page.title()).strip()
+    if any(marker in title.lower() for marker in CHALLENGE_TITLES):
+        return f"title {title!r}"
+    for selector in CHALLENGE_SELECTORS:
+        if await page.query_selector(selector):
+            return f"element {selector}"
+    if response is not None and response.status in CHALLENGE_STATUSES:
+        return f"HTTP {response.status}"
+    return None
+
+
+class WarmSession:
+    """A browser context kept between searches."""
+
+    def __init__(self, context, browser_pool):
+        self.context = context
+        self.browser_pool = browser_pool
+        self.created_at = time.monotonic()
+        self.uses = 0
+
+    @property
+    def age(self) -> float:
+        return time.monotonic() - self.created_at
+
+
+class WarmSessionPool:
+    """Reusable browser contexts of one store, retired when challenged."""
+
+    def __init__(self, store: str, max_idle: int = 4, max_age: float = 1800.0, max_uses: int = 100):
+        """
+        Initialize pool.
+
+        Args:
+            store: Store name (metrics and stats)
+            max_idle: Idle sessions kept; extra ones are closed on check-in
+            max_age: Seconds after which a session is retired
+            max_uses: Searches after which a session is retired
+        """
+        self.store = store
+        self.max_idle = max_idle
+        self.max_age = max_age
+        self.max_uses = max_uses
+        self._idle: List[WarmSession] = []
+        self.in_use = 0
+        self.created = 0
+        self.navigations = 0
+        self.challenges = 0
+        self.retired: Dict[str, int] = {}
+        self._lifetimes: deque = deque(maxlen=200)
+
+    async def checkout(self, browser_pool) -> WarmSession:
+        """Take an idle session, or open a new context on the browser pool."""
+        while self._idle:
+            session = self._idle.pop()
+            browser = session.context.browser
+            if browser is None or not browser.is_connected():
+                await self.retire(session, "disconnected")
+            elif await self._recycled(session):
+                continue
+            else:
+                break
+        else:
+            session = WarmSession(await browser_pool.new_context(), browser_pool)
+            self.created += 1
+        session.uses += 1
+        self.in_use += 1
+        return session
+
+    async def checkin(self, session: WarmSession) -> None:
+        """Return a session after a search that was not challenged."""
+        self.in_use -= 1
+        # Pages left open by a search that failed before closing them
+        for page in session.context.pages:
+            try:
+                await page.close()
+            except Exception:
+                pass
+        if await self._recycled(session):
+            return
+        if session.age > self.max_age:
+            await self.retire(session, "expired")
+        elif session.uses >= self.max_uses:
+            await self.retire(session, "used")
+        elif len(self._idle) >= self.max_idle:
+            await self.retire(session, "surplus")
+        else:
+            self._idle.append(session)
+
+    async def _recycled(self, session: WarmSession) -> bool:
+        """Retire the session if the browser pool asks for its context back."""
+        reason = session.browser_pool.recycle_reason(session.context)
+        if reason is None:
+            return False
+        session.browser_pool.record_recycle("context", reason)
+        await self.retire(session, "recycled")
+        return True
+
+    async def retire(self, session: WarmSession, reason: str) -> None:
+        """Close a session and record its lifetime."""
+        self.retired[reason] = self.retired.get(reason, 0) + 1
+        self._lifetimes.append(session.age)
+        metrics.WARM_SESSION_LIFETIME.observe(session.age, store=self.store, reason=reason)
+        metrics.WARM_SESSION_USES.observe(session.uses, store=self.store)
+        logger.info(f"Retired {self.store} session after {session.uses} searches ({reason})")
+        await session.browser_pool.close_context(session.context)
+
+    @asynccontextmanager
+    async def session(self, browser_pool):
+        """
+        Check out a warm context for one search.
+
+        Yields:
+            BrowserContext; retired if the search raises ChallengeDetected
+        """
+        session = await self.checkout(browser_pool)
+        try:
+            yield session.context
+        except ChallengeDetected:
+            self.in_use -= 1
+            await self.retire(session, "challenged")
+            raise
+        except BaseException:
+            await self.checkin(session)
+            raise
+        await self.checkin(session)
+
+    def record_navigation(self, challenged: bool) -> None:
+        self.navigations += 1
+        if challenged:
+            self.challenges += 1
+
+    async def close(self) -> None:
+        """Close the idle sessions."""
+        while self._idle:
+            await self.retire(self._idle.pop(), "closed")
+
+    def stats(self) -> Dict:
+        """Challenge rate and session counts and lifetimes."""
+        lifetimes = list(self._lifetimes)
+        return {
+            "navigations": self.navigations,
+            "challenges": self.challenges,
+            "challenge_rate": round(self.challenges / self.navigations, 4) if self.navigations else 0.0,
+            "sessions_created": self.created,
+            "sessions_idle": len(self._idle),
+            "sessions_in_use": self.in_use,
+            "sessions_retired": dict(self.retired),
+            "median_lifetime_s": round(statistics.median(lifetimes), 1) if lifetimes else None,
+            "max_lifetime_s": round(max(lifetimes), 1) if lifetimes else None,
+        }
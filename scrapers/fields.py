@@ -0,0 +1,91 @@
+"""Field projection: extract only the product fields a caller needs.
+
+Every optional field costs element queries per tile (and images cost
+downloads), so searches can ask for a subset, which scrapers check while
+extracting:
+
+    with project(parse_fields("name,price")):
+        products = await scraper.search("lait")  # no brand, unit price, images...
+
+Like phase timings, the projection is bound to the current asyncio task, so
+concurrent searches sharing a scraper instance may ask for different fields.
+Products keep every attribute; unrequested ones are None (unless read anyway,
+like the URL when it holds the barcode).
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import FrozenSet, Iterable, Iterator, Optional, Union
+
+# Product.to_dict() keys
+PRODUCT_FIELDS = (
+    "name", "price", "unit", "store", "url", "image_url", "brand", "category",
+    "unit_price", "unit_label", "scraped_at", "location", "ean",
+)
+# Always present: they identify a price
+BASE_FIELDS = frozenset({"name", "price", "store", "location", "scraped_at"})
+# Extracted together
+LINKED_FIELDS = [frozenset({"unit_price", "unit_label"})]
+
+Fields = Optional[FrozenSet[str]]
+
+_fields: ContextVar[Fields] = ContextVar("product_fields", default=None)
+
+
+def parse_fields(fields: Optional[Union[str, Iterable[str]]]) -> Fields:
+    """
+    Parse a field selection.
+
+    Args:
+        fields: Comma-separated string or names, e.g. "name,price" (None or
+            empty: every field)
+
+    Returns:
+        The fields to extract, base fields included, or None for all fields
+
+    Raises:
+        ValueError: If a field is unknown
+    """
+    if fields is None:
+        return None
+    if isinstance(fields, str):
+        fields = fields.split(",")
+    selected = {f.strip().lower() for f in fields if f.strip()}
+    if not selected:
+        return None
+    unknown = selected.difference(PRODUCT_FIELDS)
+    if unknown:
+        raise ValueError(
+            f"Unknown fields: {', '.join(sorted(unknown))} (available: {', '.join(PRODUCT_FIELDS)})"
+        )
+    for linked in LINKED_FIELDS:
+        if selected & linked:
+            selected |= linked
+    selected |= BASE_FIELDS
+    return None if selected.issuperset(PRODUCT_FIELDS) else frozenset(selected)
+
+
+@contextmanager
+def project(fields: Fields) -> Iterator[None]:
+    """Extract only fields (see parse_fields) in scrapes run inside the block."""
+    token = _fields.set(fields)
+    try:
+        yield
+    finally:
+        _fields.reset(token)
+
+
+def current_fields() -> Fields:
+    """Fields requested by the current search, None for all."""
+    return _fields.get()
+
+
+def wanted(field: str) -> bool:
+    """Whether the current search needs field."""
+    fields = _fields.get()
+    return fields is None or field in fields
+
+
+def fields_key(fields: Fields) -> str:
+    """Stable name of a projection, for cache keys ("" for all fields)."""
+    return "" if fields is None else ",".join(sorted(fields - BASE_FIELDS))
@@ -1,8 +1,9 @@
 """Intermarché scraper implementation."""
 
 from typing import List, Optional
-from playwright.async_api import async_playwright, Browser, Page
+from playwright.async_api import BrowserContext, Page
 import re
+from .barcode import find_ean
 from .base import BaseScraper, Product
 
 
@@ -10,7 +11,15 @@ class IntermarcheScraper(BaseScraper):
     """Scraper for Intermarché online store."""
     
     BASE_URL = "https://www.intermarche.com"
+    CATEGORY_URL = "https://www.intermarche.com/rayons"
+    CATEGORY_LINK_SELECTORS = ['a.category-link', 'a[href*="/rayons/"]']
     SEARCH_URL = "https://www.intermarche.com/courses-en-ligne/recherche"
+    LOAD_MORE_SELECTORS = ['button:has-text("Afficher plus")', 'button:has-text("Voir plus")']
+    NEXT_PAGE_SELECTORS = ['a[rel="next"]', 'a[aria-label*="suivante"]']
+    PRODUCT_SELECTORS = ['.product', '.product-item', '[data-product]', '.product-card']
+    # Fallback chains inside a tile, tried in learned order (see BaseScraper._query_chain)
+    NAME_SELECTORS = ['.product-title', '.product-name', 'h3', 'h2', '.title']
+    PRICE_SELECTORS = ['.product-price', '.price', '.price-value', '[data-price]']
     
     @property
     def store_name(self) -> str:
@@ -27,62 +36,31 @@ class IntermarcheScraper(BaseScraper):
         Returns:
             List of Product objects
         """
-        async with async_playwright() as p:
-            browser = await p.chromium.launch(headless=True)
-            try:
-                products = await self._scrape_search_page(browser, query, max_results)
-                return products
-            finally:
-                await browser.close()
+        async with self._open_context(query) as context:
+            products = await self._scrape_search_page(context, query, max_results)
+            return products
     
     async def _scrape_search_page(
-        self, browser: Browser, query: str, max_results: int
+        self, context: BrowserContext, query: str, max_results: int
     ) -> List[Product]:
         """Scrape search results page."""
-        page = await browser.new_page()
+        page = await self._new_page(context)
         
         try:
             # Navigate to search page
             search_url = f"{self.SEARCH_URL}?search={query.replace(' ', '+')}"
             self.logger.info(f"Navigating to: {search_url}")
             
-            await page.goto(search_url, wait_until="networkidle", timeout=30000)
+            with self._phase("goto"):
+                await self._goto(page, search_url, timeout=30000)
             
             # Wait for product grid
-            await page.wait_for_selector('.product, .product-item, [data-product]', timeout=10000)
-            
-            # Extract products
-            products = []
-            
-            product_selectors = [
-                '.product',
-                '.product-item',
-                '[data-product]',
-                '.product-card'
-            ]
-            
-            product_elements = None
-            for selector in product_selectors:
-                elements = await page.query_selector_all(selector)
-                if elements:
-                    product_elements = elements
-                    self.logger.info(f"Found {len(elements)} products with selector: {selector}")
-                    break
-            
-            if not product_elements:
-                self.logger.warning(f"No products found for query: {query}")
-                return []
-            
-            for element in product_elements[:max_results]:
-                try:
-                    product = await self._extract_product(element, page)
-                    if product:
-                        products.append(product)
-                except Exception as e:
-                    self.logger.warning(f"Failed to extract product: {e}")
-                    continue
+            with self._phase("wait"):
+                await page.wait_for_selector('.product, .product-item, [data-product]', timeout=10000)
+            await self._page_loaded(page, query)
             
-            return products
+            # Extract products (unless unchanged), loading more pages if needed
+            return await self._extract_search_results(page, query, max_results)
             
         finally:
             await page.close()
@@ -91,85 +69,81 @@ class IntermarcheScraper(BaseScraper):
         """Extract product data from a product element."""
         try:
             # Extract name
-            name_selectors = [
-                '.product-title',
-                '.product-name',
-                'h3',
-                'h2',
-                '.title'
-            ]
-            name = None
-            for selector in name_selectors:
-                name_elem = await element.query_selector(selector)
-                if name_elem:
-                    name = (await name_elem.inner_text()).strip()
-                    break
+            name_elem = await self._query_chain(element, "name", self.NAME_SELECTORS)
+            name = (await name_elem.inner_text()).strip() if name_elem else None
             
             if not name:
                 return None
             
             # Extract price
-            price_selectors = [
-                '.product-price',
-                '.price',
-                '.price-value',
-                '[data-price]'
-            ]
-            price_text = None
-            for selector in price_selectors:
-                price_elem = await element.query_selector(selector)
-                if price_elem:
-                    price_text = (await price_elem.inner_text()).strip()
-                    break
+            price_elem = await self._query_chain(element, "price", self.PRICE_SELECTORS)
+            price_text = (await price_elem.inner_text()).strip() if price_elem else None
             
             if not price_text:
                 return None
             
             # Parse price
-            price_match = re.search(r'(\d+)[,.](\d+)', price_text)
+            with self._phase("parse"):
+                price_match = re.search(r'(\d+)[,.](\d+)', price_text)
             if not price_match:
                 return None
             
             price = float(f"{price_match.group(1)}.{price_match.group(2)}")
             
             # Extract unit
-            unit = "pièce"
-            unit_elem = await element.query_selector('.product-unit, .unit')
-            if unit_elem:
-                unit = (await unit_elem.inner_text()).strip()
-            
-            # Extract URL
-            link_elem = await element.query_selector('a[href]')
-            url = self.BASE_URL
-            if link_elem:
-                href = await link_elem.get_attribute('href')
-                if href:
-                    url = href if href.startswith('http') else f"{self.BASE_URL}{href}"
+            unit = None
+            if self._wants("unit"):
+                unit = "pièce"
+                unit_elem = await element.query_selector('.product-unit, .unit')
+                if unit_elem:
+                    unit = (await unit_elem.inner_text()).strip()
+            
+            # Extract URL (also needed for barcodes found in it)
+            url = None
+            if self._wants("url") or self._wants("ean"):
+                link_elem = await element.query_selector('a[href]')
+                url = self.BASE_URL
+                if link_elem:
+                    href = await link_elem.get_attribute('href')
+                    if href:
+                        url = href if href.startswith('http') else f"{self.BASE_URL}{href}"
             
             # Extract image
             image_url = None
-            img_elem = await element.query_selector('img')
-            if img_elem:
-                image_url = await img_elem.get_attribute('src') or await img_elem.get_attribute('data-src')
-                if image_url and not image_url.startswith('http'):
-                    image_url = f"{self.BASE_URL}{image_url}"
+            if self._wants("image_url"):
+                img_elem = await element.query_selector('img')
+                if img_elem:
+                    image_url = await img_elem.get_attribute('src') or await img_elem.get_attribute('data-src')
+                    if image_url and not image_url.startswith('http'):
+                        image_url = f"{self.BASE_URL}{image_url}"
             
             # Extract brand
             brand = None
-            brand_elem = await element.query_selector('.product-brand, .brand')
-            if brand_elem:
-                brand = (await brand_elem.inner_text()).strip()
+            if self._wants("brand"):
+                brand_elem = await element.query_selector('.product-brand, .brand')
+                if brand_elem:
+                    brand = (await brand_elem.inner_text()).strip()
             
             # Extract unit price
             unit_price = None
             unit_label = None
-            unit_price_elem = await element.query_selector('.unit-price, .price-per-unit')
-            if unit_price_elem:
-                unit_price_text = (await unit_price_elem.inner_text()).strip()
-                unit_match = re.search(r'(\d+)[,.](\d+)\s*€\s*/\s*(\w+)', unit_price_text)
-                if unit_match:
-                    unit_price = float(f"{unit_match.group(1)}.{unit_match.group(2)}")
-                    unit_label = f"€/{unit_match.group(3)}"
+            if self._wants("unit_price"):
+                unit_price_elem = await element.query_selector('.unit-price, .price-per-unit')
+                if unit_price_elem:
+                    unit_price_text = (await unit_price_elem.inner_text()).strip()
+                    unit_match = re.search(r'(\d+)[,.](\d+)\s*€\s*/\s*(\w+)', unit_price_text)
+                    if unit_match:
+                        unit_price = float(f"{unit_match.group(1)}.{unit_match.group(2)}")
+                        unit_label = f"€/{unit_match.group(3)}"
+            
+            # Extract barcode (tile attribute, or the end of the product URL)
+            ean = None
+            if self._wants("ean"):
+                ean = find_ean(
+                    await element.get_attribute('data-ean'),
+                    await element.get_attribute('data-gtin'),
+                    url,
+                )
             
             return Product(
                 name=name,
@@ -181,6 +155,7 @@ class IntermarcheScraper(BaseScraper):
                 brand=brand,
                 unit_price=unit_price,
                 unit_label=unit_label,
+                ean=ean,
             )
             
         except Exception as e:
@@ -1,11 +1,15 @@
 """Improved E.Leclerc scraper with accurate product name extraction."""
 
-from typing import List
-from playwright.async_api import async_playwright
+from typing import Dict, List
+import asyncio
 import re
-import json
+import weakref
 from pathlib import Path
-from .base import BaseScraper, Product
+from .barcode import find_ean
+from .base import BaseScraper, Product, PAGE_REPLACED
+from .session import SessionManager
+
+ROOT = Path(__file__).parent.parent
 
 
 class LeclercScraper(BaseScraper):
@@ -13,11 +17,60 @@ class LeclercScraper(BaseScraper):
     
     BASE_URL = "https://www.e.leclerc"
     SEARCH_URL = "https://www.e.leclerc/recherche"
+    CATEGORY_URL = "https://www.e.leclerc/cat/rayons"
+    CATEGORY_LINK_SELECTORS = ['a.category-link', 'a[href*="/cat/"]']
+    
+    # The search page is an Angular SPA. Live searches give it FIXED_WAIT s to
+    # render; replays, and scrapers with FIXED_WAIT set to None (e.g. against
+    # the fake store), wait until priced product tiles are rendered (up to
+    # READY_TIMEOUT ms), then give late tiles SETTLE_DELAY s
+    FIXED_WAIT = 10.0
+    READY_TIMEOUT = 10000
+    SETTLE_DELAY = 1.0
+    READY_SCRIPT = """() => Array.from(document.querySelectorAll('[class*="product"]'))
+        .some(el => el.textContent.trim().length > 20 && el.textContent.includes('€'))"""
+    # Product blocks are read as text (with their first link and barcode
+    # attribute, if any); more appear after "load more" or scrolling
+    TILE_SELECTOR = '[class*="product"]'
+    PRODUCT_SELECTORS = [TILE_SELECTOR]  # for result grid fingerprints
+    EXTRACT_SCRIPT = """() => {
+        const elements = document.querySelectorAll('[class*="product"]');
+        const results = [];
+        elements.forEach(el => {
+            const text = el.textContent.trim();
+            if (text.length > 20 && text.includes('€')) {
+                const link = el.querySelector('a[href]');
+                results.push({
+                    text: text,
+                    href: link ? link.href : null,
+                    ean: el.getAttribute('data-ean') || el.getAttribute('data-gtin'),
+                });
+            }
+        });
+        return results;
+    }"""
+    LOAD_MORE_SELECTORS = ['button:has-text("Afficher plus")', 'button:has-text("Voir plus")']
+    # Candidate cookie exports, and the storage state saved after successful
+    # searches (tried first); a set whose DataDome cookie expired is skipped
+    COOKIE_FILES = ["leclerc_cookies.json", "leclerc_drive_cookies_updated.json", "leclerc_drive_cookies.json"]
+    STATE_FILE = "leclerc_storage_state.json"
+    REQUIRED_COOKIES = ["datadome"]
+    # With a location (drive), cookies come from <LOCATIONS_DIR>/<location>.json
+    # and its storage state is saved next to them
+    LOCATIONS_DIR = ROOT / "locations" / "leclerc"
     
-    def __init__(self, cache_client=None, cache_ttl: int = 3600):
-        """Initialize Leclerc scraper with cookies."""
-        super().__init__(cache_client, cache_ttl)
-        self.cookie_file = Path(__file__).parent.parent / "leclerc_cookies.json"
+    def __init__(self, cache_client=None, cache_ttl: int = 3600, **kwargs):
+        """Initialize Leclerc scraper with the cookie session of its location."""
+        super().__init__(cache_client, cache_ttl, **kwargs)
+        if self.location:
+            cookie_files = [self.LOCATIONS_DIR / f"{self.location}.json"]
+            state_file = self.LOCATIONS_DIR / f"{self.location}.state.json"
+        else:
+            cookie_files = [ROOT / name for name in self.COOKIE_FILES]
+            state_file = ROOT / self.STATE_FILE
+        self.session = SessionManager(cookie_files, state_file=state_file, required_cookies=self.REQUIRED_COOKIES)
+        # Context -> (cookie set, version) whose cookies it was given
+        self._context_cookies = weakref.WeakKeyDictionary()
     
     @property
     def store_name(self) -> str:
@@ -25,55 +78,113 @@ class LeclercScraper(BaseScraper):
     
     async def search(self, query: str, max_results: int = 10) -> List[Product]:
         """Search for products on E.Leclerc."""
-        if not self.cookie_file.exists():
-            self.logger.error(f"Cookie file not found: {self.cookie_file}")
+        replaying = self.cassette is not None and self.cassette.replaying
+        cookie_set = self.session.choose()
+        if cookie_set is None and not replaying:
+            files = ", ".join(str(s.path) for s in self.session.sets)
+            self.logger.error(f"No usable cookies (missing or expired) in: {files}")
             return []
         
-        with open(self.cookie_file) as f:
-            cookies = json.load(f)
-        
-        async with async_playwright() as p:
-            browser = await p.chromium.launch(headless=True)
-            context = await browser.new_context()
-            await context.add_cookies(cookies)
-            page = await context.new_page()
+        async with self._open_context(query) as context:
+            if cookie_set is not None:
+                await self._apply_cookies(context, cookie_set)
+            page = await self._new_page(context)
             
             try:
                 products = await self._scrape_products(page, query, max_results)
-                return products
+            except Exception:
+                self.session.record(cookie_set, False)
+                raise
             finally:
-                await browser.close()
+                await page.close()
+            
+            self.session.record(cookie_set, bool(products))
+            if products and not replaying:
+                await self.session.save_state(context, cookie_set)
+            return products
+    
+    async def _prepare_context(self, context) -> None:
+        """Add the cookies of the best usable session, if any."""
+        cookie_set = self.session.choose()
+        if cookie_set is not None:
+            await self._apply_cookies(context, cookie_set)
+    
+    async def _apply_cookies(self, context, cookie_set) -> None:
+        """
+        Give a context the cookies of a cookie set.
+        
+        Warm contexts keep the cookies refreshed by earlier searches while the
+        chosen set and its file stay the same; when another set is chosen or
+        the file was reloaded, the context's cookies are replaced.
+        
+        Args:
+            context: Playwright BrowserContext
+            cookie_set: Cookie set the search will be recorded against
+        """
+        applied = (cookie_set, cookie_set.version)
+        if self._context_cookies.get(context) == applied:
+            return
+        if context in self._context_cookies:
+            await context.clear_cookies()
+        await context.add_cookies(cookie_set.valid_cookies())
+        self._context_cookies[context] = applied
     
     async def _scrape_products(self, page, query: str, max_results: int) -> List[Product]:
         """Scrape products from page."""
         search_url = f"{self.SEARCH_URL}?q={query}"
         self.logger.info(f"Navigating to: {search_url}")
         
-        await page.goto(search_url, wait_until="networkidle", timeout=40000)
+        with self._phase("goto"):
+            await self._goto(page, search_url, timeout=40000)
         
         # Wait for content
-        import asyncio
-        await asyncio.sleep(10)
-        
-        # Extract product blocks
-        product_texts = await page.evaluate('''() => {
-            const elements = document.querySelectorAll('[class*="product"]');
-            const results = [];
-            elements.forEach(el => {
-                const text = el.textContent.trim();
-                if (text.length > 20 && text.includes('€')) {
-                    results.push(text);
-                }
-            });
-            return results;
-        }''')
+        replaying = self.cassette is not None and self.cassette.replaying
+        with self._phase("wait"):
+            if self.FIXED_WAIT is not None and not replaying:
+                await asyncio.sleep(self.FIXED_WAIT)
+            else:
+                try:
+                    await page.wait_for_function(self.READY_SCRIPT, timeout=self.READY_TIMEOUT)
+                except Exception:
+                    self.logger.warning(f"No priced products rendered after {self.READY_TIMEOUT} ms")
+                await asyncio.sleep(self.SETTLE_DELAY)
+        await self._page_loaded(page, query)
         
+        products = await self._extract_search_results(page, query, max_results)
+        self.logger.info(f"Found {len(products)} products")
+        return products
+    
+    async def _extract_listing(self, page, label: str, max_results: int) -> List[Product]:
+        """Extract product blocks, loading more results until max_results."""
         products = []
         seen_products = set()
+        parsed = 0  # blocks of the current page already handled
+        for page_number in range(1, self.MAX_PAGES + 1):
+            with self._phase("extract"):
+                blocks = await page.evaluate(self.EXTRACT_SCRIPT)
+            
+            with self._phase("parse"):
+                self._parse_blocks(blocks[parsed:], page.url, products, seen_products, max_results)
+            parsed = len(blocks)
+            
+            if len(products) >= max_results or page_number == self.MAX_PAGES:
+                break
+            advanced = await self._next_page(page, self.TILE_SELECTOR)
+            if advanced is None:
+                break
+            if advanced == PAGE_REPLACED:
+                parsed = 0
         
-        for text in product_texts:
+        return products
+    
+    def _parse_blocks(
+        self, blocks: List[Dict], page_url: str, products: List[Product], seen_products: set, max_results: int
+    ) -> None:
+        """Parse product blocks ({text, href, ean}) into products, skipping duplicates."""
+        for block in blocks:
             if len(products) >= max_results:
                 break
+            text = block["text"]
             
             # Pattern: "Product Name  Brand  XX € ,YY ZZ,ZZ € / Unit Vendu par ..."
             # Extract price first
@@ -99,13 +210,15 @@ class LeclercScraper(BaseScraper):
             
             # Extract brand (second line if exists and short)
             brand = None
-            if len(lines) > 1 and len(lines[1]) < 30 and not re.search(r'\d+.*€', lines[1]):
+            if self._wants("brand") and len(lines) > 1 and len(lines[1]) < 30 and not re.search(r'\d+.*€', lines[1]):
                 brand = lines[1]
             
             # Extract unit price
             unit_price = None
             unit_label = None
-            unit_match = re.search(r'(\d+[,.]?\d*)\s*€\s*/\s*(Kg|kg|L|l|Kilo)', text)
+            unit_match = None
+            if self._wants("unit_price"):
+                unit_match = re.search(r'(\d+[,.]?\d*)\s*€\s*/\s*(Kg|kg|L|l|Kilo)', text)
             if unit_match:
                 unit_price = float(unit_match.group(1).replace(',', '.'))
                 unit_str = unit_match.group(2)
@@ -116,16 +229,15 @@ class LeclercScraper(BaseScraper):
             product = Product(
                 name=name,
                 price=price,
-                unit="pièce",
+                unit="pièce" if self._wants("unit") else None,
                 store=self.store_name,
-                url=search_url,
+                url=block.get("href") or page_url,
                 brand=brand,
                 unit_price=unit_price,
                 unit_label=unit_label,
+                # Product URLs end with the EAN: /fp/<name>-<ean>
+                ean=find_ean(block.get("ean"), block.get("href")) if self._wants("ean") else None,
             )
             
             products.append(product)
             self.logger.debug(f"Extracted: {name} - {price}€")
-        
-        self.logger.info(f"Found {len(products)} products")
-        return products
@@ -0,0 +1,307 @@
+"""Process-wide metrics rendered in the Prometheus text exposition format.
+
+A minimal in-house registry (counters, gauges, histograms with labels) so
+the scrapers can be instrumented without an extra dependency:
+
+    SCRAPE_FAILURES.inc(store="Leclerc", error="TimeoutError")
+    with SCRAPE_DURATION.time(store="Leclerc"):
+        ...
+    REGISTRY.render()  # body for GET /metrics
+"""
+
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+import threading
+import time
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if value == float("-inf"):
+        return "-Inf"
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{n}="{_escape(v)}"' for n, v in zip(names, values)) + "}"
+
+
+class Registry:
+    """Collection of metrics rendered together."""
+
+    def __init__(self):
+        self._metrics: Dict[str, "Metric"] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: "Metric") -> None:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric already registered: {metric.name}")
+            self._metrics[metric.name] = metric
+
+    def render(self) -> str:
+        """Return all metrics in the Prometheus text format."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines: List[str] = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+
+class Metric(ABC):
+    """Base class: a named metric with a fixed set of label names."""
+
+    kind = "untyped"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        registry: Optional[Registry] = REGISTRY,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        if registry is not None:
+            registry.register(self)
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    @abstractmethod
+    def samples(self) -> List[str]:
+        """Exposition lines of the metric's series, without HELP/TYPE headers."""
+        pass
+
+
+class Counter(Metric):
+    """Monotonically increasing value."""
+
+    kind = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        if not self.labelnames:
+            self._values[()] = 0.0
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, k)} {_format_value(v)}" for k, v in items]
+
+
+class Gauge(Counter):
+    """Value that can go up and down, or be read from a callback."""
+
+    kind = "gauge"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._function: Optional[Callable[[], float]] = None
+
+    def set(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = float(value)
+
+    def dec(self, amount: float = 1.0, **labels) -> None:
+        self.inc(-amount, **labels)
+
+    def set_function(self, function: Optional[Callable[[], float]]) -> None:
+        """Read the (unlabelled) value from function at render time."""
+        self._function = function
+
+    def samples(self) -> List[str]:
+        if self._function is not None:
+            try:
+                return [f"{self.name} {_format_value(self._function())}"]
+            except Exception:
+                return []
+        return super().samples()
+
+
+class Histogram(Metric):
+    """Distribution of observations in cumulative buckets."""
+
+    kind = "histogram"
+
+    def __init__(self, *args, buckets: Sequence[float] = DEFAULT_BUCKETS, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.buckets = tuple(sorted(float(b) for b in buckets)) + (float("inf"),)
+        # label values -> [per-bucket counts..., sum, count]
+        self._values: Dict[Tuple[str, ...], List[float]] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [0.0] * (len(self.buckets) + 2)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[i] += 1
+                    break
+            state[-2] += value
+            state[-1] += 1
+
+    @contextmanager
+    def time(self, **labels) -> Iterator[None]:
+        """Observe the duration of the block in seconds."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = sorted((k, list(v)) for k, v in self._values.items())
+        lines = []
+        names = self.labelnames + ("le",)
+        for key, state in items:
+            cumulative = 0.0
+            for bound, count in zip(self.buckets, state):
+                cumulative += count
+                labels = _format_labels(names, key + (_format_value(bound),))
+                lines.append(f"{self.name}_bucket{labels} {_format_value(cumulative)}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(state[-2])}")
+            lines.append(f"{self.name}_count{labels} {_format_value(state[-1])}")
+        return lines
+
+
+# Scrapers (BaseScraper.search_with_cache)
+SCRAPE_DURATION = Histogram(
+    "scraper_scrape_duration_seconds", "Duration of live scrapes.", ["store"]
+)
+SCRAPE_PHASE_DURATION = Histogram(
+    "scraper_scrape_phase_duration_seconds", "Duration of scrape phases (inclusive).", ["store", "phase"]
+)
+SCRAPE_PRODUCTS = Histogram(
+    "scraper_scrape_products", "Products returned per live scrape.", ["store"], buckets=COUNT_BUCKETS
+)
+EXTRA_PAGE_DURATION = Histogram(
+    "scraper_extra_page_duration_seconds",
+    "Cost of each extra result page (load more, next page or scroll).",
+    ["store"],
+)
+FINGERPRINT_CHECKS = Counter(
+    "scraper_fingerprint_checks_total",
+    "Result grid fingerprint checks: unchanged (products reused, parsing skipped) or changed.",
+    ["store", "result"],
+)
+SCRAPE_FAILURES = Counter(
+    "scraper_scrape_failures_total", "Failed live scrapes by error class.", ["store", "error"]
+)
+CACHE_REQUESTS = Counter(
+    "scraper_cache_requests_total",
+    "Result lookups by cache tier (memory, redis, catalog) and result (hit, miss, stale).",
+    ["store", "tier", "result"],
+)
+CACHE_SNAPSHOT_LOAD_SECONDS = Gauge(
+    "cache_snapshot_load_seconds", "Time spent restoring the in-process cache snapshot at startup."
+)
+CACHE_SNAPSHOT_ENTRIES = Gauge(
+    "cache_snapshot_entries", "Entries restored from (restore) or written to (write) the cache snapshot.", ["op"]
+)
+CACHE_SNAPSHOT_DURATION = Histogram(
+    "cache_snapshot_duration_seconds", "Time spent writing a cache snapshot."
+)
+
+# Fallback selector chains (scrapers.selector_stats)
+SELECTOR_PROBES = Counter(
+    "scraper_selector_probes_total",
+    "Selectors tried in fallback chains by store, field and result (hit, miss).",
+    ["store", "field", "result"],
+)
+SELECTOR_ALERTS = Counter(
+    "scraper_selector_alerts_total",
+    "Fields whose selectors all stopped matching (layout change).",
+    ["store", "field"],
+)
+SELECTOR_CHAIN_FAILING = Gauge(
+    "scraper_selector_chain_failing", "1 while no selector of a field matches.", ["store", "field"]
+)
+
+# Anti-bot challenges and warm sessions (scrapers.challenge)
+NAVIGATIONS = Counter(
+    "scraper_navigations_total", "Page loads by outcome (ok, challenge).", ["store", "outcome"]
+)
+WARM_SESSION_LIFETIME = Histogram(
+    "scraper_warm_session_lifetime_seconds",
+    "Lifetime of retired warm sessions by reason (challenged, expired, used, ...).",
+    ["store", "reason"],
+    buckets=(1, 10, 60, 300, 900, 1800, 3600, 7200),
+)
+WARM_SESSION_USES = Histogram(
+    "scraper_warm_session_uses", "Searches served by each retired warm session.", ["store"], buckets=COUNT_BUCKETS
+)
+
+# Comparator (PriceComparator.search_all)
+SEARCH_DURATION = Histogram(
+    "comparator_search_duration_seconds", "Duration of multi-store searches."
+)
+STORE_RESULTS = Counter(
+    "comparator_store_results_total",
+    "Per-store outcomes of multi-store searches (ok, empty, error, timeout).",
+    ["store", "outcome"],
+)
+
+# Browsers (BrowserPool and throwaway browsers)
+BROWSER_LAUNCHES = Counter(
+    "browser_launches_total", "Chromium launches.", ["kind"]
+)
+BROWSER_CONTEXTS_IN_USE = Gauge(
+    "browser_contexts_in_use", "Open browser contexts (one page each)."
+)
+BROWSER_CONTEXT_PAGES = Histogram(
+    "browser_context_pages", "Pages opened by each closed pooled context.", buckets=COUNT_BUCKETS
+)
+BROWSER_RECYCLES = Counter(
+    "browser_recycles_total",
+    "Pooled contexts and browsers recycled, by reason (pages, memory, draining).",
+    ["kind", "reason"],
+)
+BROWSER_RSS_BYTES = Gauge(
+    "browser_rss_bytes", "Resident memory of the pooled Chromium processes (sum of RSS)."
+)
+
+# HTTP API
+HTTP_REQUESTS_IN_FLIGHT = Gauge(
+    "http_requests_in_flight", "HTTP requests being served."
+)
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds", "HTTP request duration by route and status.", ["route", "status"]
+)
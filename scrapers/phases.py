@@ -0,0 +1,70 @@
+"""Per-phase timing of scrapes (launch, navigation, readiness wait, extraction...).
+
+Timings are collected into a dict bound to the current asyncio task, so
+concurrent searches sharing a scraper instance do not mix their numbers:
+
+    with record_phases() as timings:
+        await scraper.search("poulet")
+    print(timings)  # {"context": 0.41, "goto": 2.3, "wait": 0.8, ...}
+
+Phases may nest (e.g. "parse" inside "extract"); durations are inclusive
+and accumulate when a phase runs several times. record_phases() blocks may
+nest too: the inner timings are added to the outer ones when it exits.
+
+Each phase is also a tracing span when a trace is active (scrapers.tracing),
+except the AGGREGATED_PHASES, which run once per product tile: their count
+and total duration are added to the enclosing span's attributes instead
+(e.g. "parse.count" and "parse.ms").
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, Optional
+import time
+from .tracing import current_span, span
+
+# Run per tile: counted on the enclosing span rather than traced one by one
+AGGREGATED_PHASES = frozenset({"parse"})
+
+_timings: ContextVar[Optional[Dict[str, float]]] = ContextVar("phase_timings", default=None)
+
+
+@contextmanager
+def record_phases() -> Iterator[Dict[str, float]]:
+    """Collect phase durations (seconds) of scrapes run inside the block."""
+    timings: Dict[str, float] = {}
+    outer = _timings.get()
+    token = _timings.set(timings)
+    try:
+        yield timings
+    finally:
+        _timings.reset(token)
+        if outer is not None:
+            for name, duration in timings.items():
+                outer[name] = outer.get(name, 0.0) + duration
+
+
+@contextmanager
+def phase(name: str) -> Iterator[None]:
+    """Time a scrape phase if a record_phases() block is active, and trace it."""
+    timings = _timings.get()
+    start = time.perf_counter()
+    if name in AGGREGATED_PHASES:
+        parent = current_span()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            if timings is not None:
+                timings[name] = timings.get(name, 0.0) + elapsed
+            if parent is not None:
+                attributes = parent.attributes
+                attributes[f"{name}.count"] = attributes.get(f"{name}.count", 0) + 1
+                attributes[f"{name}.ms"] = round(attributes.get(f"{name}.ms", 0.0) + elapsed * 1000, 3)
+        return
+    with span(name):
+        try:
+            yield
+        finally:
+            if timings is not None:
+                timings[name] = timings.get(name, 0.0) + time.perf_counter() - start
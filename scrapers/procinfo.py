@@ -0,0 +1,80 @@
+"""Process tree inspection via /proc (Linux), used to size browser memory."""
+
+from typing import Dict, List, Optional, Set
+import os
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def _parent_map() -> Dict[int, int]:
+    """Map every visible pid to its parent pid."""
+    parents = {}
+    try:
+        entries = os.listdir("/proc")
+    except OSError:
+        return parents
+    for entry in entries:
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                # The command name may contain spaces; fields resume after ")"
+                fields = f.read().rsplit(")", 1)[1].split()
+            parents[int(entry)] = int(fields[1])
+        except (OSError, IndexError, ValueError):
+            continue
+    return parents
+
+
+def descendants(pid: int) -> List[int]:
+    """Return all descendant pids of pid (not including pid)."""
+    children: Dict[int, List[int]] = {}
+    for child, parent in _parent_map().items():
+        children.setdefault(parent, []).append(child)
+
+    found: List[int] = []
+    stack = list(children.get(pid, []))
+    seen: Set[int] = set()
+    while stack:
+        current = stack.pop()
+        if current in seen:
+            continue
+        seen.add(current)
+        found.append(current)
+        stack.extend(children.get(current, []))
+    return found
+
+
+def cmdline(pid: int) -> str:
+    """Return the command line of pid, or "" if it is gone."""
+    try:
+        with open(f"/proc/{pid}/cmdline", "rb") as f:
+            return f.read().replace(b"\0", b" ").decode(errors="replace")
+    except OSError:
+        return ""
+
+
+def rss_bytes(pid: int) -> int:
+    """Resident set size of one process in bytes (0 if it is gone)."""
+    try:
+        with open(f"/proc/{pid}/statm") as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except (OSError, IndexError, ValueError):
+        return 0
+
+
+def browser_pids(pid: Optional[int] = None) -> List[int]:
+    """Return Chromium processes started (directly or not) by pid."""
+    pid = pid or os.getpid()
+    return [p for p in descendants(pid) if "chrom" in cmdline(p).lower()]
+
+
+def browser_instances(pid: Optional[int] = None) -> int:
+    """Count Chromium browser instances (main processes, not renderers/helpers)."""
+    return sum(1 for p in browser_pids(pid) if "--type=" not in cmdline(p))
+
+
+def tree_rss_bytes(pid: Optional[int] = None) -> int:
+    """Total RSS of pid and all its descendants in bytes."""
+    pid = pid or os.getpid()
+    return rss_bytes(pid) + sum(rss_bytes(p) for p in descendants(pid))
@@ -0,0 +1,123 @@
+"""Registry of store scrapers, imported on first use.
+
+Built-in stores are listed by name with the "module:Class" path of their
+scraper, so that importing the package does not load every scraper (and
+Playwright). Third-party stores can be added with register() or through
+the ``french_supermarket_scrapers`` entry point group:
+
+    [project.entry-points.french_supermarket_scrapers]
+    lidl = "lidl_scraper:LidlScraper"
+"""
+
+from importlib import import_module
+from typing import Dict, Iterable, List, Optional, Union
+import logging
+import threading
+import unicodedata
+
+logger = logging.getLogger(__name__)
+
+ENTRY_POINT_GROUP = "french_supermarket_scrapers"
+
+# store name -> "module:Class" or scraper class
+_stores: Dict[str, Union[str, type]] = {
+    "leclerc": "scrapers.leclerc:LeclercScraper",
+    "carrefour": "scrapers.carrefour:CarrefourScraper",
+    "intermarche": "scrapers.intermarche:IntermarcheScraper",
+}
+_loaded: Dict[str, type] = {}
+_entry_points_loaded = False
+_lock = threading.RLock()  # scraper modules may register() while being imported
+
+
+def normalize(name: str) -> str:
+    """Registry key for a store name ("Intermarché" -> "intermarche")."""
+    decomposed = unicodedata.normalize("NFKD", name.strip().lower())
+    return "".join(c for c in decomposed if not unicodedata.combining(c))
+
+
+def register(name: str, target: Union[str, type]) -> None:
+    """
+    Register a store scraper.
+
+    Args:
+        name: Store name used for selection, e.g. "lidl"
+        target: Scraper class, or its "module:Class" path to import lazily
+    """
+    with _lock:
+        key = normalize(name)
+        _stores[key] = target
+        _loaded.pop(key, None)
+
+
+def _load_entry_points() -> None:
+    global _entry_points_loaded
+    if _entry_points_loaded:
+        return
+    _entry_points_loaded = True
+    from importlib.metadata import entry_points
+
+    try:
+        found = entry_points(group=ENTRY_POINT_GROUP)
+    except Exception as e:
+        logger.warning(f"Could not read {ENTRY_POINT_GROUP} entry points: {e}")
+        return
+    for entry_point in found:
+        _stores.setdefault(normalize(entry_point.name), entry_point.value)
+
+
+def available() -> List[str]:
+    """Names of all registered stores, built-in ones first."""
+    with _lock:
+        _load_entry_points()
+        return list(_stores)
+
+
+def resolve(stores: Optional[Union[str, Iterable[str]]] = None) -> List[str]:
+    """
+    Turn a store selection into registry names.
+
+    Args:
+        stores: Comma-separated string or iterable of store names;
+            None or empty selects every store
+
+    Returns:
+        Normalized store names, in the order given, without duplicates
+
+    Raises:
+        ValueError: If a store is unknown
+    """
+    if isinstance(stores, str):
+        stores = stores.split(",")
+    names = [normalize(s) for s in stores or [] if s.strip()]
+    known = available()
+    if not names:
+        return known
+    unknown = [n for n in names if n not in known]
+    if unknown:
+        raise ValueError(f"Unknown store(s): {', '.join(unknown)} (available: {', '.join(known)})")
+    return list(dict.fromkeys(names))
+
+
+def load(name: str) -> type:
+    """Import and return the scraper class of a store."""
+    key = normalize(name)
+    cls = _loaded.get(key)
+    if cls is not None:
+        return cls
+
+    available()
+    with _lock:
+        target = _stores.get(key)
+        if target is None:
+            raise ValueError(f"Unknown store: {name}")
+        if isinstance(target, str):
+            module, _, attribute = target.partition(":")
+            target = getattr(import_module(module), attribute)
+        _loaded[key] = target
+        return target
+
+
+def create(name: str, *args, **kwargs):
+    """Instantiate the scraper of a store (arguments go to its constructor)."""
+    return load(name)(*args, **kwargs)
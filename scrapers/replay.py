@@ -0,0 +1,105 @@
+"""Record/replay of scraper sessions for deterministic offline runs.
+
+In record mode every network exchange of a search is saved to a HAR file,
+next to the rendered HTML and a JSON file holding the parsed products. In
+replay mode the HAR is served back through Playwright routing with all
+other requests aborted, so the scrapers run with no network at all and
+their output can be compared with the recorded products.
+"""
+
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+import json
+import logging
+import re
+
+logger = logging.getLogger(__name__)
+
+RECORD = "record"
+REPLAY = "replay"
+
+
+def slugify(text: str) -> str:
+    """Make a filesystem-friendly name from a store name or query."""
+    return re.sub(r"[^\w]+", "-", text.lower()).strip("-") or "empty"
+
+
+class Cassette:
+    """Directory of recorded searches, used in record or replay mode."""
+
+    def __init__(self, directory, mode: str = REPLAY):
+        """
+        Initialize cassette.
+
+        Args:
+            directory: Directory holding the recordings
+            mode: "record" or "replay"
+        """
+        if mode not in (RECORD, REPLAY):
+            raise ValueError(f"Unknown cassette mode: {mode}")
+        self.directory = Path(directory)
+        self.mode = mode
+        if mode == RECORD:
+            self.directory.mkdir(parents=True, exist_ok=True)
+
+    @property
+    def replaying(self) -> bool:
+        return self.mode == REPLAY
+
+    def _path(self, store: str, query: str, suffix: str) -> Path:
+        return self.directory / f"{slugify(store)}--{slugify(query)}{suffix}"
+
+    def context_options(self, store: str, query: str) -> Dict:
+        """Extra browser.new_context() options for this search."""
+        if self.mode == RECORD:
+            return {
+                "record_har_path": str(self._path(store, query, ".har")),
+                "record_har_content": "embed",
+            }
+        return {}
+
+    async def attach(self, context, store: str, query: str) -> None:
+        """Route the context from the recorded HAR when replaying."""
+        if self.mode != REPLAY:
+            return
+        har = self._path(store, query, ".har")
+        if not har.exists():
+            raise FileNotFoundError(f"No recording for {store} '{query}': {har}")
+        await context.route_from_har(str(har), not_found="abort")
+
+    async def page_loaded(self, page, store: str, query: str) -> None:
+        """Save the rendered HTML once the results are on the page."""
+        if self.mode != RECORD:
+            return
+        self._path(store, query, ".html").write_text(await page.content(), encoding="utf-8")
+
+    def save_products(self, store: str, query: str, products: List) -> None:
+        """Save the products parsed during recording as the expected output."""
+        if self.mode != RECORD:
+            return
+        data = {
+            "store": store,
+            "query": query,
+            "recorded_at": datetime.now().isoformat(),
+            "products": [p.to_dict() for p in products],
+        }
+        self._path(store, query, ".json").write_text(
+            json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8"
+        )
+
+    def recordings(self) -> List[Dict]:
+        """List recorded searches (store, query, expected products)."""
+        items = []
+        for path in sorted(self.directory.glob("*.json")):
+            data = json.loads(path.read_text(encoding="utf-8"))
+            if self._path(data["store"], data["query"], ".har").exists():
+                items.append(data)
+        return items
+
+    def expected(self, store: str, query: str) -> Optional[List[Dict]]:
+        """Products recorded for a search, or None if it was not recorded."""
+        path = self._path(store, query, ".json")
+        if not path.exists():
+            return None
+        return json.loads(path.read_text(encoding="utf-8"))["products"]
@@ -0,0 +1,223 @@
+"""Learned order of the scrapers' fallback selector chains.
+
+Scrapers try several CSS selectors per field (product tiles, name, price...)
+because store markup varies. Each miss costs a round-trip to the browser, for
+every product, so the selector that matched last is tried first next time:
+
+    for selector in stats.order("Carrefour", "price", PRICE_SELECTORS):
+        ...
+    stats.record("Carrefour", "price", selector)  # or None if none matched
+
+Generic selectors (a bare tag, a one-word class or an attribute test, e.g.
+"h3", ".price", "[data-price]") can also match a unit price or a crossed-out
+price, so learning never moves a generic selector ahead of a specific one:
+only specific selectors can be promoted past them.
+
+The orders and hit counts are saved to a JSON file (SCRAPER_SELECTOR_STATS,
+default selector_stats.json at the repository root, empty for memory only)
+and survive restarts. Saves run in a worker thread at most every
+SAVE_INTERVAL seconds, and when the scrapers are closed.
+
+When a field has ALERT_AFTER misses in a row (no selector matched), the
+store layout probably changed: an error is logged once, the
+scraper_selector_alerts_total counter is incremented and the field is
+reported as failing until a selector matches again.
+"""
+
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Union
+import asyncio
+import json
+import logging
+import os
+import re
+import tempfile
+import threading
+import time
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PATH = Path(__file__).parent.parent / "selector_stats.json"
+
+# Bare tag, one-word class, or attribute test without a distinctive value
+GENERIC_SELECTOR = re.compile(r"[a-z][a-z0-9]*|\.[a-z]+|\[[\w-]+\]", re.IGNORECASE)
+
+
+def is_generic(selector: str) -> bool:
+    """Whether a selector is generic enough to match the wrong element of a tile."""
+    return GENERIC_SELECTOR.fullmatch(selector.strip()) is not None
+
+
+class SelectorStats:
+    """Per-store, per-field selector hit statistics and learned order."""
+
+    ALERT_AFTER = 10
+    SAVE_INTERVAL = 60.0
+
+    def __init__(self, path: Optional[Union[str, Path]] = DEFAULT_PATH, alert_after: Optional[int] = None):
+        """
+        Initialize statistics, loading the saved ones if any.
+
+        Args:
+            path: JSON file the statistics are saved to (None: memory only)
+            alert_after: Consecutive misses of a field before alerting
+                (default: ALERT_AFTER)
+        """
+        self.path = Path(path) if path else None
+        self.alert_after = alert_after or self.ALERT_AFTER
+        # store -> field -> {"order", "hits", "misses", "consecutive_misses", "last_hit", "alerting"}
+        self._chains: Dict[str, Dict[str, Dict]] = {}
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._saved_at = time.monotonic()
+        self._saving: Optional[asyncio.Task] = None
+        self._load()
+
+    def _load(self) -> None:
+        if self.path is None or not self.path.exists():
+            return
+        try:
+            self._chains = json.loads(self.path.read_text()).get("chains", {})
+        except (OSError, ValueError, AttributeError) as e:
+            logger.warning(f"Ignoring selector statistics in {self.path}: {e}")
+
+    def _chain(self, store: str, field: str) -> Dict:
+        """Statistics of one chain, created empty. Caller holds the lock."""
+        fields = self._chains.setdefault(store, {})
+        chain = fields.get(field)
+        if chain is None:
+            chain = fields[field] = {
+                "order": [], "hits": {}, "misses": 0, "consecutive_misses": 0, "last_hit": None, "alerting": False,
+            }
+        return chain
+
+    def order(self, store: str, field: str, selectors: Sequence[str]) -> List[str]:
+        """
+        Selectors of a chain, the most recently successful first.
+
+        A learned selector moves ahead of the ones before it in the chain,
+        except that a generic selector (see is_generic) stops behind the
+        nearest specific one. Selectors never seen matching keep their
+        default order, and learned selectors no longer in the chain are
+        ignored.
+
+        Args:
+            store: Store name
+            field: Field the chain extracts, e.g. "price"
+            selectors: The chain in its default order
+
+        Returns:
+            The selectors to try, in order
+        """
+        with self._lock:
+            learned = self._chains.get(store, {}).get(field, {}).get("order")
+        ordered = list(selectors)
+        # Least recently successful first, so the most recent ends up in front
+        for selector in reversed([s for s in learned or [] if s in ordered]):
+            i = ordered.index(selector)
+            del ordered[i]
+            generic = is_generic(selector)
+            while i > 0 and not (generic and not is_generic(ordered[i - 1])):
+                i -= 1
+            ordered.insert(i, selector)
+        return ordered
+
+    def record(self, store: str, field: str, selector: Optional[str]) -> None:
+        """
+        Record which selector of a chain matched.
+
+        Args:
+            store: Store name
+            field: Field the chain extracts
+            selector: The selector that matched, or None if none did
+        """
+        with self._lock:
+            chain = self._chain(store, field)
+            if selector is not None:
+                chain["hits"][selector] = chain["hits"].get(selector, 0) + 1
+                chain["consecutive_misses"] = 0
+                chain["last_hit"] = time.time()
+                if chain["order"][:1] != [selector]:
+                    chain["order"] = [selector] + [s for s in chain["order"] if s != selector]
+                if chain["alerting"]:
+                    chain["alerting"] = False
+                    logger.info(f"{store} {field} selectors match again ({selector})")
+            else:
+                chain["misses"] += 1
+                chain["consecutive_misses"] += 1
+                if chain["consecutive_misses"] >= self.alert_after and not chain["alerting"]:
+                    chain["alerting"] = True
+                    logger.error(
+                        f"Layout change? No {store} {field} selector matched "
+                        f"{chain['consecutive_misses']} times in a row"
+                    )
+                    metrics.SELECTOR_ALERTS.inc(store=store, field=field)
+            metrics.SELECTOR_CHAIN_FAILING.set(1 if chain["alerting"] else 0, store=store, field=field)
+            self._dirty = True
+            due = self.path is not None and time.monotonic() - self._saved_at >= self.SAVE_INTERVAL
+            if due:
+                self._saved_at = time.monotonic()
+        if due:
+            self._save_in_background()
+
+    def _save_in_background(self) -> None:
+        """Save without blocking the event loop the scrapers run on."""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self.save()
+            return
+        self._saving = loop.create_task(asyncio.to_thread(self.save))
+
+    def alerts(self) -> List[Dict]:
+        """Chains whose selectors all stopped matching."""
+        with self._lock:
+            return [
+                {
+                    "store": store,
+                    "field": field,
+                    "consecutive_misses": chain["consecutive_misses"],
+                    "last_hit": chain["last_hit"],
+                }
+                for store, fields in self._chains.items()
+                for field, chain in fields.items()
+                if chain["alerting"]
+            ]
+
+    def stats(self) -> Dict[str, Dict[str, Dict]]:
+        """Learned order, hit counts and misses of every chain, by store and field."""
+        with self._lock:
+            return json.loads(json.dumps(self._chains))
+
+    def save(self) -> None:
+        """Write the statistics to the file (atomically) if they changed."""
+        with self._lock:
+            if self.path is None or not self._dirty:
+                return
+            data = json.dumps({"chains": self._chains}, indent=2)
+            self._dirty = False
+            self._saved_at = time.monotonic()
+        tmp_path = None
+        try:
+            fd, tmp_path = tempfile.mkstemp(prefix=".selector-stats-", dir=self.path.parent)
+            with os.fdopen(fd, "w") as f:
+                f.write(data)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.warning(f"Could not save selector statistics to {self.path}: {e}")
+            if tmp_path and os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+
+
+_shared: Optional[SelectorStats] = None
+_shared_lock = threading.Lock()
+
+
+def shared_stats() -> SelectorStats:
+    """Statistics shared by the scrapers of this process, saved to $SCRAPER_SELECTOR_STATS or DEFAULT_PATH."""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = SelectorStats(os.environ.get("SCRAPER_SELECTOR_STATS", str(DEFAULT_PATH)) or None)
+        return _shared
@@ -0,0 +1,189 @@
+"""Cookie sessions for stores that need a logged-in or pre-validated browser.
+
+A SessionManager holds several candidate cookie files (exported cookie
+lists or Playwright storage states). Each file is parsed once and reloaded
+when its mtime changes, sets whose required cookies (e.g. DataDome) have
+expired are skipped before any navigation, and the set with the best recent
+record is used. After a successful scrape the context's storage state is
+saved, so refreshed anti-bot cookies survive restarts.
+"""
+
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Union
+import asyncio
+import json
+import logging
+import os
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class CookieSet:
+    """One cookie file, parsed on first use and again when it changes."""
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self.cookies: List[Dict] = []
+        self._mtime: Optional[float] = None
+        # Incremented each time the file is (re)loaded
+        self.version = 0
+        self.successes = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.last_success: Optional[float] = None
+        self.expiry_reported = False
+
+    def load(self) -> bool:
+        """
+        Reload the file if its mtime changed.
+
+        Returns:
+            True if the file exists and holds cookies
+        """
+        try:
+            mtime = self.path.stat().st_mtime
+        except FileNotFoundError:
+            self.cookies, self._mtime = [], None
+            return False
+        if mtime != self._mtime:
+            try:
+                with open(self.path) as f:
+                    data = json.load(f)
+            except (OSError, ValueError) as e:
+                logger.warning(f"Cannot read cookies from {self.path}: {e}")
+                return False
+            # Plain cookie list, or a Playwright storage state
+            self.cookies = data.get("cookies", []) if isinstance(data, dict) else data
+            self._mtime = mtime
+            self.version += 1
+            # A replaced file gets a fresh record
+            self.consecutive_failures = 0
+            self.expiry_reported = False
+            logger.info(f"Loaded {len(self.cookies)} cookies from {self.path}")
+        return bool(self.cookies)
+
+    def expired(self, required: Sequence[str], now: Optional[float] = None) -> List[str]:
+        """Names of required cookies that have expired (session cookies never do)."""
+        now = now or time.time()
+        return [
+            c["name"] for c in self.cookies
+            if c["name"] in required and (c.get("expires") or -1) > 0 and c["expires"] < now
+        ]
+
+    def valid_cookies(self, now: Optional[float] = None) -> List[Dict]:
+        """Cookies that have not expired."""
+        now = now or time.time()
+        return [c for c in self.cookies if not ((c.get("expires") or -1) > 0 and c["expires"] < now)]
+
+    def to_dict(self) -> Dict:
+        return {
+            "path": str(self.path),
+            "cookies": len(self.cookies),
+            "successes": self.successes,
+            "failures": self.failures,
+            "consecutive_failures": self.consecutive_failures,
+            "last_success": self.last_success,
+        }
+
+
+class SessionManager:
+    """Pick, track and persist cookie sessions of one store."""
+
+    def __init__(
+        self,
+        cookie_files: Sequence[Union[str, Path]],
+        state_file: Optional[Union[str, Path]] = None,
+        required_cookies: Sequence[str] = (),
+        persist_interval: float = 300.0,
+    ):
+        """
+        Initialize session manager.
+
+        Args:
+            cookie_files: Candidate cookie files, preferred first
+            state_file: Where the storage state of successful scrapes is saved;
+                it becomes the first candidate (optional)
+            required_cookies: Cookies whose expiry makes a set unusable,
+                e.g. ["datadome"]
+            persist_interval: Minimum seconds between two state saves
+        """
+        self.state_file = Path(state_file) if state_file else None
+        paths = ([self.state_file] if self.state_file else []) + [Path(p) for p in cookie_files]
+        self.sets = [CookieSet(p) for p in dict.fromkeys(paths)]
+        self.required_cookies = tuple(required_cookies)
+        self.persist_interval = persist_interval
+        self._persisted_at = 0.0
+
+    def choose(self) -> Optional[CookieSet]:
+        """
+        Return the cookie set to use, or None if none is usable.
+
+        Sets that failed last come after the others, then the most recently
+        successful ones first, then in the configured order.
+        """
+        usable = []
+        for index, cookie_set in enumerate(self.sets):
+            if not cookie_set.load():
+                continue
+            expired = cookie_set.expired(self.required_cookies)
+            if expired:
+                if not cookie_set.expiry_reported:
+                    logger.warning(f"Skipping {cookie_set.path}: expired {', '.join(expired)}")
+                    cookie_set.expiry_reported = True
+                continue
+            usable.append((cookie_set.consecutive_failures, -(cookie_set.last_success or 0), index, cookie_set))
+        if not usable:
+            return None
+        return min(usable, key=lambda entry: entry[:3])[3]
+
+    def record(self, cookie_set: Optional[CookieSet], success: bool) -> None:
+        """Record the outcome of a scrape made with cookie_set."""
+        if cookie_set is None:
+            return
+        if success:
+            cookie_set.successes += 1
+            cookie_set.consecutive_failures = 0
+            cookie_set.last_success = time.time()
+        else:
+            cookie_set.failures += 1
+            cookie_set.consecutive_failures += 1
+
+    async def save_state(self, context, source: Optional[CookieSet] = None) -> Optional[Path]:
+        """
+        Persist the storage state of a context that just scraped successfully.
+
+        Args:
+            context: Playwright BrowserContext
+            source: Cookie set the context was created with; its record is
+                carried over to the state file
+
+        Returns:
+            The state file, or None if not configured or saved recently
+        """
+        if self.state_file is None or time.time() - self._persisted_at < self.persist_interval:
+            return None
+        self._persisted_at = time.time()
+        try:
+            state = await context.storage_state()
+            await asyncio.to_thread(self._write_state, state)
+        except Exception as e:
+            logger.warning(f"Could not save storage state: {e}")
+            return None
+
+        state_set = self.sets[0]
+        if source is not None and source is not state_set:
+            state_set.successes = max(state_set.successes, source.successes)
+            state_set.last_success = source.last_success
+        logger.info(f"Saved storage state to {self.state_file}")
+        return self.state_file
+
+    def _write_state(self, state: Dict) -> None:
+        temporary = self.state_file.with_suffix(".tmp")
+        with open(temporary, "w") as f:
+            json.dump(state, f, indent=2)
+        os.replace(temporary, self.state_file)
+
+    def stats(self) -> List[Dict]:
+        """Record of each cookie set."""
+        return [s.to_dict() for s in self.sets]
@@ -0,0 +1,289 @@
+"""Lightweight tracing of requests, searches and scrape phases.
+
+Spans follow the OpenTelemetry data model (128-bit trace ids, 64-bit span
+ids, parent links, unix-nanosecond timestamps, attributes, status) and
+propagate with the W3C ``traceparent`` header. Finished spans go to an
+exporter; the default one keeps recent traces in memory for offline use:
+
+    with start_trace("GET /compare", traceparent=header) as root:
+        await comparator.compare_prices("lait")
+    EXPORTER.get_trace(root.trace_id)  # spans as OTLP-style dicts
+
+Spans are only recorded inside a trace, so scrapes run outside one (CLI,
+benchmarks) pay nothing. The current span lives in a ContextVar and is
+inherited by tasks created inside it. A trace records at most
+MAX_SPANS_PER_TRACE spans; later ones are counted in the root span's
+``tracing.dropped_spans`` attribute.
+"""
+
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+import json
+import logging
+import queue
+import re
+import secrets
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+MAX_SPANS_PER_TRACE = 256
+
+_TRACEPARENT = re.compile(r"^([0-9a-f]{2})-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+
+
+class Span:
+    """One timed operation in a trace."""
+
+    def __init__(
+        self,
+        name: str,
+        trace_id: str,
+        parent_id: Optional[str] = None,
+        attributes: Optional[Dict[str, Any]] = None,
+        counts: Optional[Dict[str, int]] = None,
+    ):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.attributes: Dict[str, Any] = dict(attributes or {})
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.status = "unset"  # "unset", "ok" or "error"
+        # Spans recorded and dropped in this trace, shared with the children
+        self.counts = counts if counts is not None else {"spans": 1, "dropped": 0}
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def record_exception(self, error: BaseException) -> None:
+        self.status = "error"
+        self.attributes["exception.type"] = type(error).__name__
+        self.attributes["exception.message"] = str(error)
+
+    @property
+    def duration(self) -> Optional[float]:
+        """Duration in seconds, None while the span is open."""
+        if self.end_ns is None:
+            return None
+        return (self.end_ns - self.start_ns) / 1e9
+
+    @property
+    def traceparent(self) -> str:
+        """W3C traceparent header value for this span."""
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    def to_dict(self) -> Dict:
+        """OTLP/JSON-style representation."""
+        return {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "parentSpanId": self.parent_id,
+            "name": self.name,
+            "startTimeUnixNano": self.start_ns,
+            "endTimeUnixNano": self.end_ns,
+            "durationMs": None if self.duration is None else round(self.duration * 1000, 3),
+            "attributes": self.attributes,
+            "status": self.status,
+        }
+
+
+class InMemoryExporter:
+    """Keep the spans of the most recent traces in memory."""
+
+    def __init__(self, max_traces: int = 1000):
+        """
+        Initialize exporter.
+
+        Args:
+            max_traces: Traces kept before the oldest are dropped
+        """
+        self.max_traces = max_traces
+        self._traces: "OrderedDict[str, List[Span]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def export(self, span: Span) -> None:
+        with self._lock:
+            spans = self._traces.get(span.trace_id)
+            if spans is None:
+                spans = self._traces[span.trace_id] = []
+                while len(self._traces) > self.max_traces:
+                    self._traces.popitem(last=False)
+            spans.append(span)
+
+    def get_trace(self, trace_id: str) -> List[Dict]:
+        """Finished spans of a trace, in start order."""
+        with self._lock:
+            spans = list(self._traces.get(trace_id, []))
+        return [s.to_dict() for s in sorted(spans, key=lambda s: s.start_ns)]
+
+    def trace_ids(self) -> List[str]:
+        """Known trace ids, most recent last."""
+        with self._lock:
+            return list(self._traces)
+
+
+class JsonLinesExporter:
+    """
+    Append finished spans as JSON lines, e.g. for later import into a collector.
+
+    Spans are queued and written in batches by a background thread, so
+    exporting never blocks the event loop on file I/O. When the queue is
+    full, spans are dropped (and counted) rather than waited for.
+    """
+
+    def __init__(self, path: str, max_queue: int = 10000):
+        """
+        Initialize exporter and start its writer thread.
+
+        Args:
+            path: JSON-lines file spans are appended to
+            max_queue: Spans waiting to be written before new ones are dropped
+        """
+        self.path = path
+        self.dropped = 0
+        self._queue: "queue.Queue[Optional[Dict]]" = queue.Queue(max_queue)
+        self._thread = threading.Thread(target=self._write_loop, name="trace-exporter", daemon=True)
+        self._thread.start()
+
+    def export(self, span: Span) -> None:
+        try:
+            self._queue.put_nowait(span.to_dict())
+        except queue.Full:
+            self.dropped += 1
+
+    def _write_loop(self) -> None:
+        running = True
+        while running:
+            batch = [self._queue.get()]
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            running = None not in batch
+            lines = [json.dumps(s, ensure_ascii=False, default=str) + "\n" for s in batch if s is not None]
+            try:
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.writelines(lines)
+            except OSError as e:
+                logger.warning(f"Could not write {len(lines)} spans to {self.path}: {e}")
+            for _ in batch:
+                self._queue.task_done()
+
+    def flush(self) -> None:
+        """Wait until the queued spans are written."""
+        self._queue.join()
+
+    def close(self) -> None:
+        """Write the queued spans and stop the writer thread."""
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+
+
+EXPORTER = InMemoryExporter()
+_exporters: List = [EXPORTER]
+_current: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+def add_exporter(exporter) -> None:
+    """Also send finished spans to exporter (an object with export(span))."""
+    _exporters.append(exporter)
+
+
+def current_span() -> Optional[Span]:
+    return _current.get()
+
+
+def parse_traceparent(header: Optional[str]) -> Optional[Tuple[str, str]]:
+    """
+    Parse a W3C traceparent header.
+
+    Args:
+        header: Header value, e.g. "00-<trace id>-<parent span id>-01"
+
+    Returns:
+        (trace_id, parent_span_id), or None if absent or malformed
+    """
+    match = _TRACEPARENT.match((header or "").strip().lower())
+    if not match or match.group(2) == "0" * 32 or match.group(3) == "0" * 16:
+        return None
+    return match.group(2), match.group(3)
+
+
+def _export(span: Span) -> None:
+    for exporter in _exporters:
+        try:
+            exporter.export(span)
+        except Exception as e:
+            logger.warning(f"Span export failed: {e}")
+
+
+@contextmanager
+def _activate(span: Span) -> Iterator[Span]:
+    token = _current.set(span)
+    try:
+        yield span
+        if span.status == "unset":
+            span.status = "ok"
+    except BaseException as e:
+        span.record_exception(e)
+        raise
+    finally:
+        _current.reset(token)
+        span.end_ns = time.time_ns()
+        _export(span)
+
+
+@contextmanager
+def start_trace(name: str, traceparent: Optional[str] = None, **attributes) -> Iterator[Span]:
+    """
+    Open the root span of a trace (or continue a remote one).
+
+    Args:
+        name: Span name, e.g. "GET /compare"
+        traceparent: Incoming W3C traceparent header (optional)
+        **attributes: Span attributes
+
+    Yields:
+        The root Span
+    """
+    parent = parse_traceparent(traceparent)
+    trace_id, parent_id = parent if parent else (secrets.token_hex(16), None)
+    with _activate(Span(name, trace_id, parent_id, attributes)) as root:
+        try:
+            yield root
+        finally:
+            if root.counts["dropped"]:
+                root.set_attribute("tracing.dropped_spans", root.counts["dropped"])
+
+
+@contextmanager
+def span(name: str, **attributes) -> Iterator[Optional[Span]]:
+    """
+    Open a child span of the current one; a no-op outside a trace.
+
+    Args:
+        name: Span name, e.g. "goto"
+        **attributes: Span attributes
+
+    Yields:
+        The Span, or None when no trace is active
+    """
+    parent = _current.get()
+    if parent is None:
+        yield None
+        return
+    counts = parent.counts
+    if counts["spans"] >= MAX_SPANS_PER_TRACE:
+        counts["dropped"] += 1
+        yield None
+        return
+    counts["spans"] += 1
+    with _activate(Span(name, parent.trace_id, parent.span_id, attributes, counts)) as child:
+        yield child
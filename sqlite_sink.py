@@ -0,0 +1,133 @@
+"""Shared plumbing for SQLite-backed result sinks.
+
+Sinks receive freshly scraped products from ``BaseScraper.search_with_cache``
+and must not block the event loop, so rows are queued and committed by a
+background writer thread in batches.
+"""
+
+from abc import ABC, abstractmethod
+from typing import List, Optional, Sequence
+import logging
+import queue
+import re
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+
+def product_key(name: str) -> str:
+    """Normalize a product name into the key used to identify it per store."""
+    return re.sub(r"\s+", " ", name.casefold()).strip()
+
+
+def to_timestamp(scraped_at: Optional[str]) -> float:
+    """Convert a Product.scraped_at ISO string to a unix timestamp."""
+    if scraped_at:
+        try:
+            return datetime.fromisoformat(scraped_at).timestamp()
+        except ValueError:
+            pass
+    return time.time()
+
+
+class SQLiteSink(ABC):
+    """Result sink writing to SQLite from a background thread."""
+
+    SCHEMA = ""
+
+    def __init__(self, path: str, batch_size: int = 500, flush_interval: float = 2.0):
+        """
+        Initialize sink, create its schema and start the writer thread.
+
+        Args:
+            path: SQLite database file
+            batch_size: Rows buffered before a write transaction
+            flush_interval: Maximum seconds a row waits before being written
+        """
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+
+        conn = self._connect()
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._migrate(conn)
+            conn.executescript(self.SCHEMA)
+        finally:
+            conn.close()
+
+        self._queue: "queue.Queue" = queue.Queue()
+        self._stop = threading.Event()
+        self._writer = threading.Thread(
+            target=self._run, name=f"{self.__class__.__name__}-writer", daemon=True
+        )
+        self._writer.start()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _query(self, sql: str, params: Sequence = ()) -> List[sqlite3.Row]:
+        """Run a read query on a short-lived connection (safe from any thread)."""
+        conn = self._connect()
+        try:
+            return conn.execute(sql, params).fetchall()
+        finally:
+            conn.close()
+
+    def add(self, query: str, products: List) -> None:
+        """
+        Queue freshly scraped products for writing (non-blocking).
+
+        Args:
+            query: Search query that produced the products
+            products: Product objects
+        """
+        for p in products:
+            self._queue.put(self._row(p))
+
+    def _migrate(self, conn: sqlite3.Connection) -> None:
+        """Upgrade a database created by an older version, before SCHEMA runs."""
+
+    @abstractmethod
+    def _row(self, product) -> tuple:
+        """Convert a product to the tuple queued for the writer."""
+        pass
+
+    @abstractmethod
+    def _write_batch(self, conn: sqlite3.Connection, batch: List[tuple]) -> None:
+        """Write a batch of queued rows."""
+        pass
+
+    def _run(self) -> None:
+        """Writer thread: drain the queue in batches."""
+        conn = self._connect()
+        try:
+            while not (self._stop.is_set() and self._queue.empty()):
+                batch = []
+                deadline = time.monotonic() + self.flush_interval
+                while len(batch) < self.batch_size:
+                    timeout = deadline - time.monotonic()
+                    if timeout <= 0:
+                        break
+                    try:
+                        batch.append(self._queue.get(timeout=timeout))
+                    except queue.Empty:
+                        break
+                if batch:
+                    try:
+                        self._write_batch(conn, batch)
+                    except sqlite3.Error as e:
+                        logger.error(f"{self.__class__.__name__} failed to write {len(batch)} rows: {e}")
+        finally:
+            conn.close()
+
+    def close(self, timeout: float = 10.0) -> None:
+        """Flush pending rows and stop the writer thread."""
+        self._stop.set()
+        self._writer.join(timeout)
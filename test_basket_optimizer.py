@@ -0,0 +1,120 @@
+"""Test the multi-store basket optimizer against brute force.
+    
+    python -m pytest test_basket_optimizer.py   # or: python test_basket_optimizer.py
+"""
+
+from itertools import combinations
+import math
+import random
+import pytest
+from basket_optimizer import EXACT_SUBSETS, optimize_basket, price_matrix
+
+
+def random_matrix(stores: int, items: int, seed: int, coverage: float = 0.8):
+    """Item -> store -> offer, each store selling about coverage of the items."""
+    rng = random.Random(seed)
+    matrix = {}
+    for i in range(items):
+        offers = {
+            f"Store {j}": {"price": round(rng.uniform(1.0, 10.0), 2), "name": f"Item {i}", "url": None}
+            for j in range(stores)
+            if rng.random() < coverage
+        }
+        if offers:
+            matrix[f"item {i}"] = offers
+    return matrix
+
+
+def brute_force(matrix, max_stores=None, store_cost=0.0):
+    """(items left unpriced, total) of the best store subset, trying them all."""
+    stores = sorted({store for offers in matrix.values() for store in offers})
+    best = (math.inf, math.inf)
+    for size in range(1, min(max_stores or len(stores), len(stores)) + 1):
+        for subset in combinations(stores, size):
+            prices = [
+                min((offers[s]["price"] for s in subset if s in offers), default=None) for offers in matrix.values()
+            ]
+            total = sum(p for p in prices if p is not None) + store_cost * size
+            best = min(best, (prices.count(None), round(total, 2)))
+    return best
+
+
+def test_exact_search_matches_brute_force():
+    for seed in range(20):
+        matrix = random_matrix(6, 12, seed)
+        for max_stores, store_cost in [(None, 0.0), (None, 4.0), (2, 1.5), (1, 0.0)]:
+            result = optimize_basket(matrix, max_stores=max_stores, store_cost=store_cost)
+            assert result["exact"]
+            assert len(result["stores"]) <= (max_stores or 6)
+            missing, total = brute_force(matrix, max_stores, store_cost)
+            assert (len(result["unpriced"]), result["total"]) == (missing, pytest.approx(total, abs=0.011))
+
+
+def test_store_costs_quantities_and_unpriced_items():
+    matrix = {
+        "lait": {"A": {"price": 1.0, "name": "Lait"}, "B": {"price": 0.9, "name": "Lait"}},
+        "pain": {"A": {"price": 2.0, "name": "Pain"}, "B": {"price": 1.5, "name": "Pain"}},
+        "café": {"C": {"price": 3.0, "name": "Café"}},
+    }
+    # B is cheaper per item but not worth its trip; C is the only coffee seller
+    result = optimize_basket(matrix, store_cost={"A": 0.0, "B": 5.0, "C": 1.0}, quantities={"lait": 2})
+    assert set(result["stores"]) == {"A", "C"}
+    assert result["stores"]["A"]["subtotal"] == 4.0
+    assert result["items_total"] == 7.0
+    assert result["store_costs"] == 1.0
+    assert result["total"] == 8.0
+    assert result["unpriced"] == []
+    assert result["cheapest_everywhere"] == 12.3
+    
+    # One store only: the coffee cannot be bought with the milk and bread
+    single = optimize_basket(matrix, max_stores=1)
+    assert list(single["stores"]) == ["B"]
+    assert single["unpriced"] == ["café"]
+    assert single["total"] == 2.4
+    
+    with pytest.raises(ValueError):
+        optimize_basket(matrix, max_stores=0)
+    assert optimize_basket({})["stores"] == {}
+
+
+def test_local_search_above_exact_limit():
+    matrix = random_matrix(14, 40, seed=3)
+    assert 2 ** 14 > EXACT_SUBSETS
+    result = optimize_basket(matrix, store_cost=2.0)
+    assert not result["exact"]
+    missing, total = brute_force(matrix, store_cost=2.0)
+    assert len(result["unpriced"]) == missing
+    assert total <= result["total"] <= total * 1.05
+    assert result["total"] == pytest.approx(result["items_total"] + result["store_costs"], abs=0.011)
+    
+    limited = optimize_basket(matrix, max_stores=5, store_cost=2.0)
+    assert not limited["exact"]
+    assert len(limited["stores"]) <= 5
+    missing, total = brute_force(matrix, max_stores=5, store_cost=2.0)
+    assert total <= limited["total"] <= total * 1.05
+
+
+def test_price_matrix_keeps_cheapest_offer_per_store_location():
+    comparisons = {
+        "lait": {"best_deals": [
+            {"name": "Lait A", "all_prices": [
+                {"store": "Leclerc", "location": "drive-1", "price": 1.2, "url": "a"},
+                {"store": "Carrefour", "price": 1.1, "url": "b"},
+            ]},
+            {"name": "Lait B", "all_prices": [{"store": "Carrefour", "price": 0.95, "url": "c"}]},
+        ]},
+        "pain": {"error": "timeout"},
+        "beurre": {"best_deals": []},
+    }
+    matrix = price_matrix(comparisons)
+    assert list(matrix) == ["lait"]
+    assert matrix["lait"]["Leclerc @ drive-1"] == {"price": 1.2, "name": "Lait A", "url": "a"}
+    assert matrix["lait"]["Carrefour"] == {"price": 0.95, "name": "Lait B", "url": "c"}
+
+
+if __name__ == "__main__":
+    test_exact_search_matches_brute_force()
+    test_store_costs_quantities_and_unpriced_items()
+    test_local_search_above_exact_limit()
+    test_price_matrix_keeps_cheapest_offer_per_store_location()
+    print("✅ Basket optimizer tests passed")
@@ -0,0 +1,84 @@
+"""Test MemoryCache snapshots: round trip, expiry times and damaged files.
+    
+    python -m pytest test_cache_snapshot.py   # or: python test_cache_snapshot.py
+"""
+
+import tempfile
+import time
+from pathlib import Path
+import pytest
+from scrapers import cache as cache_module
+from scrapers.cache import MemoryCache, SnapshotError
+
+
+class Clock:
+    """Stand-in for the time module, moved forward by hand."""
+    
+    def __init__(self):
+        self.now = time.time()
+    
+    def time(self) -> float:
+        return self.now
+
+
+def test_round_trip_keeps_values_order_and_expiry(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cache_module, "time", clock)
+    with tempfile.TemporaryDirectory() as directory:
+        path = str(Path(directory) / "cache.bin")
+        cache = MemoryCache()
+        cache.set("short", "expires soon", ex=10)
+        cache.set("long", "é" * 1000, ex=3600)
+        cache.set("forever", '{"products": []}')
+        cache.set("gone", "already expired", ex=1)
+        clock.now += 2
+        assert cache.snapshot(path) == 3
+        
+        # An hour later minus a minute: the entries keep their absolute expiry
+        clock.now += 3600 - 60
+        restored = MemoryCache()
+        restored.set("forever", "newer value")
+        assert restored.restore(path) == 1
+        assert restored.get("short") is None
+        assert restored.exists("gone") == 0
+        assert 55 <= restored.ttl("long") <= 58
+        assert restored.get("long") == "é" * 1000
+        assert restored.get("forever") == "newer value"
+        assert restored.ttl("forever") == -1
+        
+        # Entries never read are written back still compressed
+        again = MemoryCache()
+        again.restore(path)
+        assert again.snapshot(path) == 2
+        final = MemoryCache(max_entries=1)
+        assert final.restore(path) == 1
+        assert final.get("forever") == '{"products": []}'
+
+
+def test_damaged_snapshots_are_rejected():
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / "cache.bin"
+        cache = MemoryCache()
+        for i in range(20):
+            cache.set(f"key{i}", f"value {i}" * 50, ex=3600)
+        cache.snapshot(str(path))
+        data = path.read_bytes()
+        
+        with pytest.raises(SnapshotError):
+            MemoryCache().restore(str(Path(directory) / "missing.bin"))
+        for damaged in (b"", b"not a snapshot", data[:len(data) // 2], data[:-1]):
+            path.write_bytes(damaged)
+            with pytest.raises(SnapshotError):
+                MemoryCache().restore(str(path))
+        
+        # Intact footer, garbled index
+        index_start = len(data) - 40
+        path.write_bytes(data[:index_start] + bytes(b ^ 0xFF for b in data[index_start:-24]) + data[-24:])
+        empty = MemoryCache()
+        with pytest.raises(SnapshotError):
+            empty.restore(str(path))
+        assert len(empty) == 0
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-q"])
@@ -0,0 +1,116 @@
+"""Test the job queue backends against fakeredis, a local Redis stand-in.
+    
+    pip install fakeredis
+    python -m pytest test_job_queue.py   # or: python test_job_queue.py
+"""
+
+import time
+import fakeredis
+from job_queue import (
+    JOB_DONE, JOB_FAILED, JOB_QUEUED, JOB_RUNNING, InMemoryJobBackend, Job, RedisStreamsJobBackend,
+)
+
+
+def redis_backends(**options):
+    """An API-side and a worker-side backend sharing one fake Redis server."""
+    server = fakeredis.FakeServer()
+    api = RedisStreamsJobBackend(client=fakeredis.FakeRedis(server=server, decode_responses=True), **options)
+    worker = RedisStreamsJobBackend(client=fakeredis.FakeRedis(server=server, decode_responses=True), **options)
+    return api, worker
+
+
+def test_submit_poll_retrieve():
+    api, worker = redis_backends()
+    job = api.submit(Job("compare", "lait", max_results=3, stores=["carrefour"], fields=["name", "price"]))
+    assert api.get(job.job_id).status == JOB_QUEUED
+    
+    running = worker.next_job("worker-1", timeout=0.1)
+    assert running.job_id == job.job_id
+    assert running.fields == ["name", "price"]
+    assert api.get(job.job_id).status == JOB_RUNNING
+    assert worker.next_job("worker-1", timeout=0.1) is None
+    
+    running.result = {"query": "lait", "results": []}
+    running.status = JOB_DONE
+    running.finished_at = time.time()
+    worker.update(running)
+    
+    done = api.get(job.job_id)
+    assert done.status == JOB_DONE
+    assert done.result == {"query": "lait", "results": []}
+    assert api.redis.xpending(api.STREAM, api.GROUP)["pending"] == 0
+    assert 0 < api.redis.ttl(api._job_key(job.job_id)) <= api.result_ttl
+    assert api.get("unknown") is None
+
+
+def test_abandoned_job_is_retried_then_failed():
+    api, worker = redis_backends(claim_idle=0.05, max_deliveries=2)
+    worker.RECLAIM_INTERVAL = 0.0
+    job = api.submit(Job("search", "pain"))
+    
+    assert worker.next_job("dead-worker", timeout=0.1).job_id == job.job_id
+    time.sleep(0.1)
+    retried = worker.next_job("worker-2", timeout=0.1)
+    assert retried.job_id == job.job_id
+    assert retried.status == JOB_RUNNING
+    
+    time.sleep(0.1)
+    assert worker.next_job("worker-3", timeout=0.1) is None
+    failed = api.get(job.job_id)
+    assert failed.status == JOB_FAILED
+    assert "2 attempts" in failed.error
+    assert api.redis.xpending(api.STREAM, api.GROUP)["pending"] == 0
+
+
+def test_memory_backend_evicts_finished_jobs():
+    backend = InMemoryJobBackend(result_ttl=3600, max_jobs=3)
+    try:
+        jobs = [backend.submit(Job("search", f"q{i}")) for i in range(3)]
+        for job in jobs[:2]:
+            job = backend.next_job("worker-1", timeout=1.0)
+            job.status = JOB_DONE
+            job.finished_at = time.time()
+            backend.update(job)
+        
+        backend.submit(Job("search", "q3"))
+        assert backend.get(jobs[0].job_id) is None
+        assert backend.get(jobs[1].job_id).status == JOB_DONE
+        assert backend.get(jobs[2].job_id).status == JOB_QUEUED
+        
+        backend.result_ttl = 0
+        backend._evicted_at = 0.0
+        backend.submit(Job("search", "q4"))
+        assert backend.get(jobs[1].job_id) is None
+        assert backend.get(jobs[2].job_id) is not None
+    finally:
+        backend._manager.shutdown()
+
+
+def test_memory_backend_retries_abandoned_job_then_fails():
+    backend = InMemoryJobBackend(claim_idle=0.05, max_deliveries=2)
+    backend.RECLAIM_INTERVAL = 0.0
+    try:
+        job = backend.submit(Job("search", "pain"))
+        assert backend.next_job("dead-worker", timeout=1.0).job_id == job.job_id
+        assert backend.next_job("worker-2", timeout=0.1) is None
+        
+        time.sleep(0.1)
+        retried = backend.next_job("worker-2", timeout=1.0)
+        assert retried.job_id == job.job_id
+        assert retried.status == JOB_RUNNING
+        
+        time.sleep(0.1)
+        assert backend.next_job("worker-3", timeout=0.1) is None
+        failed = backend.get(job.job_id)
+        assert failed.status == JOB_FAILED
+        assert "2 attempts" in failed.error
+    finally:
+        backend._manager.shutdown()
+
+
+if __name__ == "__main__":
+    test_submit_poll_retrieve()
+    test_abandoned_job_is_retried_then_failed()
+    test_memory_backend_evicts_finished_jobs()
+    test_memory_backend_retries_abandoned_job_then_fails()
+    print("✅ Job queue tests passed")
@@ -0,0 +1,35 @@
+"""Test the SQLite price history store.
+    
+    python -m pytest test_price_history.py   # or: python test_price_history.py
+"""
+
+from datetime import datetime, timedelta
+import tempfile
+from pathlib import Path
+from price_history import PriceHistoryStore, summarize_history
+from scrapers.base import Product
+
+
+def test_limited_history_keeps_latest_prices():
+    with tempfile.TemporaryDirectory() as directory:
+        store = PriceHistoryStore(str(Path(directory) / "history.db"), flush_interval=0.1)
+        start = datetime(2026, 1, 1)
+        for day in range(12):
+            scraped_at = (start + timedelta(days=day)).isoformat()
+            price = round(1.0 + day / 100, 2)
+            store.add("lait", [Product("Lait demi-écrémé 1L", price, "1L", "Carrefour", "", scraped_at=scraped_at)])
+        store.close()
+        
+        rows = store.product_history("Lait demi-écrémé 1L", limit=5)
+        assert [r["price"] for r in rows] == [1.07, 1.08, 1.09, 1.10, 1.11]
+        assert len(store.store_history("Carrefour", limit=3)) == 3
+        assert store.store_history("Carrefour", limit=3)[-1]["price"] == 1.11
+        
+        summary = summarize_history(rows)["Carrefour"]
+        assert summary["current"] == 1.11
+        assert summary["since"] == (start + timedelta(days=11)).isoformat()
+
+
+if __name__ == "__main__":
+    test_limited_history_keeps_latest_prices()
+    print("✅ Price history tests passed")
@@ -0,0 +1,92 @@
+"""Test the learned order of selector chains, layout-change alerts and saves.
+    
+    python -m pytest test_selector_stats.py   # or: python test_selector_stats.py
+"""
+
+import asyncio
+import json
+import tempfile
+from pathlib import Path
+from scrapers.selector_stats import SelectorStats, is_generic
+
+CHAIN = ["div.product-price__amount", "span[data-testid='price']", ".price", "span"]
+
+
+def test_generic_selectors():
+    assert is_generic("span")
+    assert is_generic(".price")
+    assert is_generic("[data-price]")
+    assert not is_generic("div.product-price__amount")
+    assert not is_generic("span[data-testid='price']")
+
+
+def test_order_promotes_specific_selectors_only():
+    stats = SelectorStats(None)
+    assert stats.order("Stub", "price", CHAIN) == CHAIN
+    
+    stats.record("Stub", "price", "span[data-testid='price']")
+    assert stats.order("Stub", "price", CHAIN) == [
+        "span[data-testid='price']", "div.product-price__amount", ".price", "span",
+    ]
+    
+    # A generic selector moves up to the nearest specific one, not past it
+    stats.record("Stub", "price", "span")
+    assert stats.order("Stub", "price", CHAIN) == [
+        "span[data-testid='price']", "div.product-price__amount", "span", ".price",
+    ]
+    
+    # Learned selectors missing from the chain are ignored
+    stats.record("Stub", "price", "b.old-price")
+    assert stats.order("Stub", "price", CHAIN[:2]) == ["span[data-testid='price']", "div.product-price__amount"]
+    assert stats.order("Other", "price", CHAIN) == CHAIN
+
+
+def test_alert_after_consecutive_misses():
+    stats = SelectorStats(None, alert_after=3)
+    for _ in range(2):
+        stats.record("Stub", "name", None)
+    stats.record("Stub", "name", "h2.title")
+    for _ in range(2):
+        stats.record("Stub", "name", None)
+    assert stats.alerts() == []
+    
+    stats.record("Stub", "name", None)
+    [alert] = stats.alerts()
+    assert alert["store"] == "Stub"
+    assert alert["field"] == "name"
+    assert alert["consecutive_misses"] == 3
+    assert alert["last_hit"] is not None
+    
+    stats.record("Stub", "name", "h2.title")
+    assert stats.alerts() == []
+    assert stats.stats()["Stub"]["name"]["misses"] == 5
+
+
+def test_saves_are_debounced_and_reloaded():
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / "selector_stats.json"
+        stats = SelectorStats(path)
+        for i in range(100):
+            stats.record("Stub", "price", CHAIN[i % 2])
+        assert not path.exists()
+        
+        stats.save()
+        assert json.loads(path.read_text())["chains"]["Stub"]["price"]["hits"] == {CHAIN[0]: 50, CHAIN[1]: 50}
+        assert SelectorStats(path).order("Stub", "price", CHAIN)[0] == CHAIN[1]
+        
+        # Once SAVE_INTERVAL has passed, the next record saves in a worker thread
+        async def record_later():
+            stats.SAVE_INTERVAL = 0.0
+            stats.record("Stub", "price", CHAIN[0])
+            await stats._saving
+        
+        asyncio.run(record_later())
+        assert SelectorStats(path).order("Stub", "price", CHAIN)[0] == CHAIN[0]
+
+
+if __name__ == "__main__":
+    test_generic_selectors()
+    test_order_promotes_specific_selectors_only()
+    test_alert_after_consecutive_misses()
+    test_saves_are_debounced_and_reloaded()
+    print("✅ Selector statistics tests passed")